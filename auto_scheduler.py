@@ -1,17 +1,7 @@
-import schedule
-import time
-import os
+from nba_warriors_analysis.scheduler import run_scheduler
 
-def run_all():
-    os.system("python main_analysis.py")
-    os.system("python email_summary.py")
-
-# Run every Monday at 9 AM
-#schedule.every().monday.at("09:00").do(run_all)
-schedule.every(1).minutes.do(run_all)
-
-
-print("🔄 Auto-scheduler running...")
-while True:
-    schedule.run_pending()
-    time.sleep(60)
+# Runs the pipeline in-process on SCHEDULE_CRON (default: Mondays at 09:00) for
+# SCHEDULE_TEAMS (default: LAST_TEAM_ABBR); same as `nba-analysis schedule`.
+if __name__ == "__main__":
+    print("🔄 Auto-scheduler running...")
+    run_scheduler()
@@ -0,0 +1,40 @@
+"""Benchmark: vectorized streak RLE vs the original per-row ``.iloc`` loop.
+
+Run with ``python benchmarks/bench_streaks.py [n_games]``.
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from nba_warriors_analysis.utils import compute_streaks
+
+
+def compute_streaks_loop(wl_series):
+    # Original implementation, kept here as the baseline
+    streaks = []
+    count = 1
+    if len(wl_series) == 0:
+        return streaks
+    for i in range(1, len(wl_series)):
+        if wl_series.iloc[i] == wl_series.iloc[i - 1]:
+            count += 1
+        else:
+            streaks.append((wl_series.iloc[i - 1], count))
+            count = 1
+    streaks.append((wl_series.iloc[-1], count))
+    return streaks
+
+
+def main(n: int = 6000, repeat: int = 5) -> None:
+    wl = pd.Series(np.random.default_rng(0).choice(["W", "L"], size=n))
+    assert compute_streaks(wl) == compute_streaks_loop(wl)
+
+    loop_s = min(timeit.repeat(lambda: compute_streaks_loop(wl), number=1, repeat=repeat))
+    vec_s = min(timeit.repeat(lambda: compute_streaks(wl), number=1, repeat=repeat))
+    print(f"games={n}  loop={loop_s * 1e3:.2f}ms  vectorized={vec_s * 1e3:.2f}ms  speedup={loop_s / vec_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6000)
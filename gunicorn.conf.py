@@ -0,0 +1,33 @@
+# Gunicorn settings for the web app (Dockerfile and Procfile start it with `-c gunicorn.conf.py`).
+import gc
+import os
+import socket
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Load the app (and the pandas/matplotlib/fpdf stack) once in the master; workers share it copy-on-write
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# One id per master start: seed copying and cache warming run once per deployment, not per worker
+os.environ.setdefault("DEPLOY_ID", f"{socket.gethostname()}-{os.getpid()}-{int(time.time())}")
+
+if preload_app:
+    from nba_warriors_analysis import webapp
+
+    webapp.preload()
+
+
+def pre_fork(server, worker):
+    # Keep the collector from touching (and so copying) the objects inherited from the master
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from nba_warriors_analysis.webapp import start_cache_warmer
+
+    start_cache_warmer()
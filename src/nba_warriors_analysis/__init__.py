@@ -1,7 +1,12 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from .utils import Settings, get_logger
-from .analysis import compute_summary, fetch_games
-from .plotting import generate_all_charts
-from .reporting import ReportBuilder
+
+if TYPE_CHECKING:
+    from .analysis import compute_summary, fetch_games
+    from .plotting import generate_all_charts
+    from .reporting import ReportBuilder
 
 __author__ = "N H Padma Priya"
 
@@ -13,3 +18,25 @@ __all__ = [
     "generate_all_charts",
     "ReportBuilder",
 ]
+
+# Public names resolved on first access, so importing the package (CLI --help, web workers,
+# /healthz) does not pull in pandas, nba_api, matplotlib, seaborn or fpdf
+_LAZY = {
+    "compute_summary": "analysis",
+    "fetch_games": "analysis",
+    "generate_all_charts": "plotting",
+    "ReportBuilder": "reporting",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
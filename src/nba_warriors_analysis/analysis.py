@@ -1,41 +1,113 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import Dict, Tuple, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Tuple, Optional
 import time
+from datetime import date
 from io import StringIO
 
 import pandas as pd
-import requests
-from nba_api.stats.static import teams
 from nba_api.stats.endpoints import leaguegamefinder
 
-from .utils import Settings, logger, compute_streaks
-
-
-@dataclass(frozen=True)
-class TeamContext:
-    id: int
-    abbr: str
-    name: str
-    nickname: str
+from .cache import (
+    CACHE_EXTENSIONS,
+    append_team_cache,
+    cache_age,
+    cache_format,
+    merge_games,
+    normalize_games,
+    read_team_cache,
+    team_cache_paths,
+    write_games,
+    write_team_cache,
+)
+from .breaker import get_breaker
+from .httpclient import get_session, stats_headers
+from .registry import TeamContext, get_registry
+from .singleflight import SingleFlight
+from .store import record_games
+from .summary import overall_summary, summarize
+from .utils import Settings, logger, streak_runs
 
 
 def list_teams_sorted():
-    nba_teams = teams.get_teams()
-    nba_teams = sorted(nba_teams, key=lambda x: x["full_name"])  # type: ignore
-    return nba_teams
+    # Shared, pre-sorted list from the process-wide registry; do not mutate
+    return get_registry().teams_sorted
 
 
 def find_team_context(choice_index: int) -> TeamContext:
-    team_info = list_teams_sorted()[choice_index]
-    return TeamContext(
-        id=team_info["id"],
-        abbr=team_info["abbreviation"],
-        name=team_info["full_name"],
-        nickname=team_info["nickname"],
-    )
+    return get_registry().contexts[choice_index]
+
+
+def _team_abbr(team_id: int) -> Optional[str]:
+    ctx = get_registry().by_id(team_id)
+    return ctx.abbr if ctx else None
+
+
+class FetchCancelled(RuntimeError):
+    """Raised by a fetch_games call whose ``cancel`` event was set before it finished."""
+
+
+def _check_cancelled(cancel: Optional[threading.Event], team_id: object) -> None:
+    if cancel is not None and cancel.is_set():
+        raise FetchCancelled(f"Fetch for team {team_id} was cancelled")
+
+
+def _find_games(
+    retries: int,
+    backoff_base: float,
+    timeout: int,
+    cancel: Optional[threading.Event] = None,
+    **params,
+) -> pd.DataFrame:
+    """Call LeagueGameFinder with retry/backoff; raises the last error when all attempts fail.
+
+    Attempts go through the shared circuit breaker (see breaker.get_breaker): while it is open
+    CircuitOpen is raised at once so callers fall back to the cache without waiting. Setting
+    ``cancel`` stops the retries: FetchCancelled is raised before the next attempt.
+    """
+    breaker = get_breaker()
+    last_exc: Exception | None = None
+    for attempt in range(1, retries + 1):
+        _check_cancelled(cancel, params.get("team_id_nullable"))
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            get_session()  # installs the pooled keep-alive session for nba_api
+            finder = leaguegamefinder.LeagueGameFinder(
+                timeout=timeout, headers=stats_headers(), **params
+            )
+            df = finder.get_data_frames()[0]
+            df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])  # type: ignore
+            if breaker is not None:
+                breaker.record_success()
+            return df.sort_values("GAME_DATE")
+        except Exception as e:
+            if breaker is not None:
+                breaker.record_failure()
+            last_exc = e
+            if attempt < retries:
+                wait = backoff_base ** (attempt - 1)
+                logger.warning(
+                    "fetch_games attempt %s/%s failed (timeout=%ss): %s; retrying in %.1fs",
+                    attempt, retries, timeout, e, wait,
+                )
+                if cancel is not None:
+                    cancel.wait(wait)
+                else:
+                    time.sleep(wait)
+            else:
+                logger.error("fetch_games failed after %s attempts: %s", retries, e)
+    assert last_exc is not None
+    raise last_exc
+
+
+# In-flight fetch_games calls keyed by (team id, cache dir, offline, may serve from cache, may serve
+# stale, cancel event). Forced refreshes (ttl=0, e.g. the background revalidation) and callers that
+# need fresh data never join a call that may return the stale cache, and nobody joins a call that
+# someone else may cancel.
+_FETCHES: SingleFlight[pd.DataFrame] = SingleFlight()
 
 
 def fetch_games(
@@ -45,10 +117,32 @@ def fetch_games(
     timeout: int = int(os.getenv("NBA_API_TIMEOUT", "90")),
     cache_dir: Optional[str] = os.getenv("NBA_API_CACHE_DIR", "data"),
     use_cache_on_failure: bool = os.getenv("NBA_API_USE_CACHE_ON_FAILURE", "1") == "1",
+    incremental: bool = os.getenv("NBA_API_INCREMENTAL", "0") == "1",
+    ttl: float = float(os.getenv("NBA_API_CACHE_TTL", "3600")),
+    offline: bool = os.getenv("NBA_API_OFFLINE", "0") == "1",
+    stale_while_revalidate: bool = False,
+    cancel: Optional[threading.Event] = None,
 ) -> pd.DataFrame:
     """
     Fetch games for a team with retry/backoff and longer timeout to reduce transient failures.
-    Caches results to CSV and reads from cache on failure. Also supports an optional remote fallback.
+    Caches results (Parquet by default, see cache.cache_format) and reads from cache on failure.
+    Also supports an optional remote fallback.
+
+    In incremental mode only games on or after the latest cached GAME_DATE are requested; they
+    are merged with the cache (de-duplicated on GAME_ID) and appended to the cache files instead
+    of rewriting the full history. Without a readable cache it behaves like a full fetch.
+
+    Cached data younger than ``ttl`` seconds is returned without touching the network; stale data
+    (including seeds without cache metadata) is refetched first. Long-lived processes such as the
+    web app pass ``stale_while_revalidate=True`` to get stale data immediately while a background
+    thread refreshes it; a one-shot CLI run must not, as it would exit before the refresh lands.
+    Offline mode only ever reads the cache.
+
+    Once ``cancel`` is set the fetch stops retrying and raises FetchCancelled instead of writing
+    the cache or falling back to it (see asyncfetch.fetch_many's deadline).
+
+    Concurrent calls for the same team are coalesced into one fetch (see singleflight) and
+    cache files are replaced atomically under a file lock.
 
     Optional env vars:
       - NBA_API_RETRIES (int)
@@ -57,61 +151,105 @@ def fetch_games(
       - NBA_API_CACHE_DIR (str)
       - NBA_API_USE_CACHE_ON_FAILURE (1/0)
       - NBA_API_REMOTE_CACHE_BASEURL (HTTP(S) base URL to fetch cached CSV if upstream down)
+      - NBA_API_INCREMENTAL (1/0, default 0)
+      - NBA_API_CACHE_TTL (float seconds a cache entry stays fresh, default 3600; 0 disables)
+      - NBA_API_OFFLINE (1/0, serve only from the local cache)
     """
-    last_exc: Exception | None = None
+    # Concurrent callers for the same team (web runs, warmer, background refresh) share one fetch
+    key = (
+        int(team_id), os.path.abspath(cache_dir) if cache_dir else None, bool(offline), ttl > 0,
+        bool(stale_while_revalidate), cancel,
+    )
+    df, shared = _FETCHES.do(
+        key, _fetch_games, team_id, retries, backoff_base, timeout, cache_dir,
+        use_cache_on_failure, incremental, ttl, offline, stale_while_revalidate, cancel,
+    )
+    if shared:
+        logger.debug("Joined in-flight fetch for team %s", team_id)
+        return df.copy()  # callers may mutate their frame
+    return df
+
 
+def _fetch_games(
+    team_id: int,
+    retries: int,
+    backoff_base: float,
+    timeout: int,
+    cache_dir: Optional[str],
+    use_cache_on_failure: bool,
+    incremental: bool,
+    ttl: float,
+    offline: bool,
+    stale_while_revalidate: bool,
+    cancel: Optional[threading.Event],
+) -> pd.DataFrame:
     # Determine abbreviation for better cache naming and remote fallback
-    try:
-        team_meta = next(t for t in teams.get_teams() if t.get("id") == team_id)
-        team_abbr = team_meta.get("abbreviation")
-    except StopIteration:
-        team_abbr = None
-
-    cache_path_id: Optional[str] = None
-    cache_path_abbr: Optional[str] = None
-    if cache_dir:
-        os.makedirs(cache_dir, exist_ok=True)
-        cache_path_id = os.path.join(cache_dir, f"games_{team_id}.csv")
-        if team_abbr:
-            cache_path_abbr = os.path.join(cache_dir, f"{team_abbr}_games.csv")
+    team_abbr = _team_abbr(team_id)
+    cache_path_abbr, cache_path_id = team_cache_paths(team_id, team_abbr, cache_dir)
+    cache_paths = (cache_path_abbr, cache_path_id)
 
-    for attempt in range(1, retries + 1):
-        try:
-            finder = leaguegamefinder.LeagueGameFinder(team_id_nullable=team_id, timeout=timeout)
-            df = finder.get_data_frames()[0]
-            df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])  # type: ignore
-            df = df.sort_values("GAME_DATE")
+    cached: Optional[pd.DataFrame] = None
+    if ttl > 0 or offline or incremental:
+        cached, cpath = read_team_cache(cache_paths)
+        if cached is not None and (ttl > 0 or offline):
+            cached = cached.sort_values("GAME_DATE").reset_index(drop=True)
+            cached.attrs["cache_paths"] = [cpath]
+            age = cache_age(cpath, rows=len(cached))  # type: ignore[arg-type]
+            if offline or age <= ttl:
+                logger.debug(
+                    "Serving cached games for team %s from %s (age %.0fs)", team_id, cpath, age
+                )
+                return cached
+            if stale_while_revalidate:
+                logger.info(
+                    "Serving stale cache %s for team %s; refreshing in background", cpath, team_id
+                )
+                _revalidate_in_background(
+                    team_id, retries=retries, backoff_base=backoff_base, timeout=timeout,
+                    cache_dir=cache_dir, incremental=incremental,
+                )
+                return cached
+    if offline:
+        raise FileNotFoundError(f"Offline mode: no cached games for team {team_id} in {cache_dir}")
+
+    existing = cached if incremental else None
+    params: Dict[str, object] = {"team_id_nullable": team_id}
+    if existing is not None and not existing.empty:
+        since = pd.to_datetime(existing["GAME_DATE"]).max()  # type: ignore
+        params["date_from_nullable"] = since.strftime("%m/%d/%Y")
 
+    try:
+        df = _find_games(retries, backoff_base, timeout, cancel=cancel, **params)
+        _check_cancelled(cancel, team_id)  # the caller gave up: leave the cache alone
+        if "date_from_nullable" in params:
+            assert existing is not None
+            known_ids = set(existing["GAME_ID"])
+            new_rows = df[~df["GAME_ID"].astype(str).str.zfill(10).isin(known_ids)]
+            logger.info(
+                "Incremental fetch since %s: %d new game(s)",
+                params["date_from_nullable"], len(new_rows),
+            )
+            df = merge_games(existing, new_rows)
+            append_team_cache(new_rows, df, existing, cache_paths)
+            record_games(new_rows, team_id, cache_dir)
+        else:
             # Cache successful fetch to both id and abbr paths
-            for cpath in (cache_path_abbr, cache_path_id):
-                if cpath:
-                    try:
-                        df.to_csv(cpath, index=False)
-                    except Exception as cache_err:
-                        logger.debug("Failed to write cache %s: %s", cpath, cache_err)
-
-            return df
-        except Exception as e:
-            last_exc = e
-            if attempt < retries:
-                wait = backoff_base ** (attempt - 1)
-                logger.warning(
-                    "fetch_games attempt %s/%s failed (timeout=%ss): %s; retrying in %.1fs",
-                    attempt, retries, timeout, e, wait,
-                )
-                time.sleep(wait)
-            else:
-                logger.error("fetch_games failed after %s attempts: %s", retries, e)
+            write_team_cache(df, cache_paths)
+            record_games(df, team_id, cache_dir)
+        df.attrs["cache_paths"] = [p for p in cache_paths if p]
+        return df
+    except FetchCancelled:
+        raise
+    except Exception as e:
+        last_exc = e
+    _check_cancelled(cancel, team_id)
 
-    # Local cache fallback: prefer abbr-named, then id-named
+    # Local cache fallback: prefer abbr-named, then id-named (typed, so GAME_DATE stays datetime)
     if use_cache_on_failure:
-        for cpath in (cache_path_abbr, cache_path_id):
-            if cpath and os.path.isfile(cpath):
-                try:
-                    logger.warning("Using local cached data at %s due to upstream failure.", cpath)
-                    return pd.read_csv(cpath)
-                except Exception as cache_read_err:
-                    logger.debug("Failed to read cache %s: %s", cpath, cache_read_err)
+        cached, cpath = read_team_cache(cache_paths)
+        if cached is not None:
+            logger.warning("Using local cached data at %s due to upstream failure.", cpath)
+            return cached.sort_values("GAME_DATE").reset_index(drop=True)
 
     # Remote cache fallback
     baseurl = os.getenv("NBA_API_REMOTE_CACHE_BASEURL")
@@ -123,57 +261,169 @@ def fetch_games(
         candidates.append(f"{baseurl}/games_{team_id}.csv")
         for url in candidates:
             try:
-                resp = requests.get(url, timeout=15)
+                resp = get_session().get(url, timeout=15)
                 if resp.status_code == 200 and resp.text:
                     logger.warning("Using remote cached data from %s due to upstream failure.", url)
-                    df = pd.read_csv(StringIO(resp.text))
-                    # Save to local cache for next time
-                    for cpath in (cache_path_abbr, cache_path_id):
-                        if cpath:
-                            try:
-                                df.to_csv(cpath, index=False)
-                            except Exception:
-                                pass
+                    df = normalize_games(pd.read_csv(
+                        StringIO(resp.text), dtype={"GAME_ID": str, "SEASON_ID": str}
+                    ))
+                    # Save to local cache for next time, but leave it stale so upstream is retried
+                    write_team_cache(df, cache_paths, fresh=False)
                     return df
             except Exception as re:
                 logger.debug("Remote cache fetch failed %s: %s", url, re)
 
-    assert last_exc is not None
     raise last_exc
 
 
+# Team ids with a background cache refresh in flight (stale-while-revalidate)
+_REFRESHING: set = set()
+_REFRESH_LOCK = threading.Lock()
+
+
+def _revalidate_in_background(team_id: int, **fetch_kwargs: Any) -> None:
+    with _REFRESH_LOCK:
+        if team_id in _REFRESHING:
+            return
+        _REFRESHING.add(team_id)
+
+    def _refresh():
+        try:
+            fetch_games(team_id, ttl=0, offline=False, use_cache_on_failure=False, **fetch_kwargs)
+        except Exception as e:
+            logger.warning("Background cache refresh failed for team %s: %s", team_id, e)
+        finally:
+            with _REFRESH_LOCK:
+                _REFRESHING.discard(team_id)
+
+    # Not a daemon: a worker shutting down waits for the refresh instead of dropping the cache write
+    threading.Thread(target=_refresh, name=f"cache-refresh-{team_id}").start()
+
+
+def recent_seasons(count: int = 2, today: Optional[date] = None) -> List[str]:
+    """The last ``count`` NBA seasons up to the current one, oldest first.
+
+    E.g. ["2024-25", "2025-26"]; a season is named after the year it tips off in October.
+    """
+    today = today or date.today()
+    current = today.year if today.month >= 10 else today.year - 1
+    return [f"{y}-{(y + 1) % 100:02d}" for y in range(current - count + 1, current + 1)]
+
+
+def fetch_league_games(
+    team_ids: Optional[Iterable[int]] = None,
+    seasons: Optional[List[str]] = None,
+    retries: int = int(os.getenv("NBA_API_RETRIES", "5")),
+    backoff_base: float = float(os.getenv("NBA_API_BACKOFF_BASE", "2.5")),
+    timeout: int = int(os.getenv("NBA_API_TIMEOUT", "90")),
+    cache_dir: Optional[str] = os.getenv("NBA_API_CACHE_DIR", "data"),
+) -> Dict[int, pd.DataFrame]:
+    """
+    Fetch games for many teams with league-wide LeagueGameFinder calls and partition by TEAM_ID.
+
+    Issues one upstream call per season in ``seasons`` (default: NBA_API_LEAGUE_SEASONS, else the
+    current and previous season) instead of one call per team; an unscoped league-wide call
+    would hit the endpoint's result cap and truncate histories. Each team's partition is merged
+    into its existing cache entry (de-duplicated on GAME_ID), so the cache keeps the full history.
+
+    Teams without a cached history reaching back to the first requested season are left out of
+    the result and their cache is not touched: the recent seasons alone would pass for a full
+    history. Callers fetch those teams with fetch_games().
+
+    Optional env vars:
+      - NBA_API_LEAGUE_SEASONS (comma-separated seasons, e.g. 2024-25,2025-26)
+    """
+    if not seasons:
+        env_seasons = os.getenv("NBA_API_LEAGUE_SEASONS", "")
+        seasons = [x.strip() for x in env_seasons.split(",") if x.strip()] or recent_seasons()
+    registry = get_registry()
+    wanted = set(team_ids) if team_ids is not None else {c.id for c in registry.contexts}
+
+    frames = [
+        _find_games(retries, backoff_base, timeout, league_id_nullable="00", season_nullable=season)
+        for season in seasons
+    ]
+    league = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    logger.info("League-wide fetch returned %d rows in %d call(s)", len(league), len(frames))
+    # Every team, so league averages cover the whole league
+    record_games(league, cache_dir=cache_dir)
+
+    # A cache whose last game predates the off-season before the first fetched season leaves a gap
+    covered_from = pd.Timestamp(int(min(seasons)[:4]), 7, 1)
+    result: Dict[int, pd.DataFrame] = {}
+    uncached: List[int] = []
+    for team_id, team_df in league.groupby("TEAM_ID", sort=False):
+        team_id = int(team_id)
+        if team_id not in wanted:
+            continue
+        cache_paths = team_cache_paths(team_id, _team_abbr(team_id), cache_dir)
+        cached = read_team_cache(cache_paths)[0]
+        if (
+            cached is None
+            or cached.empty
+            or pd.to_datetime(cached["GAME_DATE"]).max() < covered_from
+        ):
+            uncached.append(team_id)
+            continue
+        df = merge_games(cached, team_df)
+        write_team_cache(df, cache_paths)
+        result[team_id] = df
+    if uncached:
+        logger.info(
+            "League-wide fetch: no cached history to extend for team ids %s", sorted(uncached)
+        )
+    missing = wanted - set(result) - set(uncached)
+    if missing:
+        logger.warning("League-wide fetch had no games for team ids: %s", sorted(missing))
+    return result
+
+
 def compute_summary(df: pd.DataFrame) -> Dict[str, float]:
-    streaks = compute_streaks(df["WL"])  # type: ignore
-    max_win_streak = max((s[1] for s in streaks if s[0] == "W"), default=0)
-    max_loss_streak = max((s[1] for s in streaks if s[0] == "L"), default=0)
-
-    avg_fg_pct = float(df["FG_PCT"].mean() * 100)
-    avg_3p_pct = float(df["FG3_PCT"].mean() * 100)
-    avg_rebounds = float(df["REB"].mean())
-    avg_points = float(df["PTS"].mean())
-    wins = int((df["WL"] == "W").sum())
-    losses = int((df["WL"] == "L").sum())
-
-    return {
-        "Wins": wins,
-        "Losses": losses,
-        "Win Streak": max_win_streak,
-        "Loss Streak": max_loss_streak,
-        "FG%": round(avg_fg_pct, 2),
-        "3P%": round(avg_3p_pct, 2),
-        "Rebounds": round(avg_rebounds, 2),
-        "Avg Points": round(avg_points, 2),
-    }
-
-
-def persist_outputs(df: pd.DataFrame, summary: Dict[str, float], abbr: str, settings: Settings) -> Tuple[str, str]:
+    return overall_summary(summarize(df, groupings=("all",)))
+
+
+def season_streaks(df: pd.DataFrame, season_col: str = "SEASON_ID") -> pd.DataFrame:
+    """Longest win/loss and current (season-ending) streak per season, in one vectorized pass."""
+    ordered = df.sort_values("GAME_DATE", kind="stable") if "GAME_DATE" in df.columns else df
+    values, lengths, starts = streak_runs(ordered["WL"], groups=ordered[season_col])
+    runs = pd.DataFrame({
+        season_col: ordered[season_col].to_numpy()[starts],
+        "WL": values,
+        "LENGTH": lengths,
+    })
+    by_season = runs.groupby(season_col, sort=True)
+    out = pd.DataFrame({
+        "Win Streak": runs[runs["WL"] == "W"].groupby(season_col)["LENGTH"].max(),
+        "Loss Streak": runs[runs["WL"] == "L"].groupby(season_col)["LENGTH"].max(),
+        "Current Streak": by_season["WL"].last() + by_season["LENGTH"].last().astype(str),
+    })
+    out[["Win Streak", "Loss Streak"]] = out[["Win Streak", "Loss Streak"]].fillna(0).astype(int)
+    return out.reset_index().rename(columns={"index": season_col})
+
+
+def persist_outputs(
+    df: pd.DataFrame,
+    summary: Dict[str, float],
+    abbr: str,
+    settings: Settings,
+    breakdown: Optional[pd.DataFrame] = None,
+) -> Tuple[str, str]:
+    """Write the summary, optional summarize() breakdown and games export under DATA_DIR."""
     os.makedirs(settings.data_dir, exist_ok=True)
     os.makedirs(settings.plots_dir, exist_ok=True)
 
+    # Games are exported as CSV unless EXPORT_GAMES_CSV=0, in which case the cache format is used
+    games_ext = CACHE_EXTENSIONS["csv" if settings.export_games_csv else cache_format()]
     summary_path = os.path.join(settings.data_dir, f"{abbr}_summary.csv")
-    games_path = os.path.join(settings.data_dir, f"{abbr}_games.csv")
+    games_path = os.path.join(settings.data_dir, f"{abbr}_games{games_ext}")
 
     pd.Series(summary).to_csv(summary_path)
-    df.to_csv(games_path, index=False)
+    if breakdown is not None:
+        breakdown_path = os.path.join(settings.data_dir, f"{abbr}_summary_breakdown.csv")
+        breakdown.to_csv(breakdown_path, index=False)
+    # fetch_games already keeps its cache files in sync; skip rewriting the same file
+    cache_paths = {os.path.abspath(p) for p in df.attrs.get("cache_paths", ())}
+    if os.path.abspath(games_path) not in cache_paths:
+        write_games(df, games_path)
 
     return summary_path, games_path
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .utils import Settings, logger
+
+
+@dataclass
+class ArtifactBundle:
+    """Everything one pipeline run produces, held in memory.
+
+    Stages hand the bundle to each other directly: charts are rendered into ``charts``, the PDF
+    is built from it into ``pdf`` and the emailer attaches from it. ``write()`` is the optional
+    disk sink for data/, plots/ and reports/.
+    """
+
+    team_abbr: str
+    team_name: str
+    summary: Dict[str, float]
+    breakdown: Optional[pd.DataFrame] = None
+    games: Optional[pd.DataFrame] = None
+    charts: Dict[str, bytes] = field(default_factory=dict)  # chart name -> PNG bytes
+    # Chart cache manifest entries
+    chart_entries: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    pdf: Optional[bytes] = None
+    # Digest of what the PDF was built from (see ReportBuilder.build_pdf_bytes)
+    pdf_inputs: Optional[str] = None
+
+    @property
+    def report_filename(self) -> str:
+        return f"{self.team_abbr}_report.pdf"
+
+    def chart_files(self) -> Dict[str, bytes]:
+        """Charts keyed by the file name they are persisted under (``<ABBR>_<name>.png``)."""
+        return {f"{self.team_abbr}_{name}.png": data for name, data in self.charts.items()}
+
+    def chart_buffers(self) -> Dict[str, io.BytesIO]:
+        """Charts as named ``BytesIO`` buffers, e.g. for attachments."""
+        return {fname: _named_buffer(data, fname) for fname, data in self.chart_files().items()}
+
+    def pdf_buffer(self) -> Optional[io.BytesIO]:
+        return _named_buffer(self.pdf, self.report_filename) if self.pdf is not None else None
+
+    def write(self, settings: Settings) -> Dict[str, Optional[str]]:
+        """Persist the bundle: summary/breakdown/games to data/, charts to plots/, PDF to reports/.
+
+        The PDF's input digest goes to ``<report>.meta.json``, and a report already recorded with
+        the same digest is left untouched. Returns the written paths (``summary``, ``games``,
+        ``report``, ``trend``).
+        """
+        from .analysis import persist_outputs
+        from .plotting import save_charts
+        from .reporting import ReportBuilder, report_lock, write_report_meta
+
+        paths: Dict[str, Optional[str]] = dict.fromkeys(("summary", "games", "report", "trend"))
+        if self.games is not None:
+            paths["summary"], paths["games"] = persist_outputs(
+                self.games, self.summary, self.team_abbr, settings, breakdown=self.breakdown
+            )
+        if self.charts:
+            chart_paths = save_charts(self.charts, self.chart_entries, self.team_abbr, settings)
+            paths["trend"] = next((p for p in chart_paths if p.endswith("_trend.png")), None)
+        if self.pdf is not None:
+            os.makedirs(settings.reports_dir, exist_ok=True)
+            report = os.path.join(settings.reports_dir, self.report_filename)
+            with report_lock(report):
+                recorded = ReportBuilder._read_report_meta(report).get("inputs")
+                if self.pdf_inputs and recorded == self.pdf_inputs and os.path.isfile(report):
+                    logger.debug("Report %s is up to date; not rewriting it", report)
+                else:
+                    # Drop the old record first so it is never paired with the new PDF
+                    if os.path.exists(f"{report}.meta.json"):
+                        os.remove(f"{report}.meta.json")
+                    # Replaced atomically: concurrent runs or a download in progress never see
+                    # a partial PDF
+                    tmp = f"{report}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as fh:
+                        fh.write(self.pdf)
+                    os.replace(tmp, report)
+                    if self.pdf_inputs:
+                        meta = {"inputs": self.pdf_inputs, "charts": len(self.charts)}
+                        write_report_meta(report, meta)
+            paths["report"] = report
+        logger.debug("Artifact bundle for %s written: %s", self.team_abbr, paths)
+        return paths
+
+    def attachment_names(self) -> List[str]:
+        return ([self.report_filename] if self.pdf is not None else []) + sorted(self.chart_files())
+
+
+def _named_buffer(data: bytes, name: str) -> io.BytesIO:
+    buf = io.BytesIO(data)
+    buf.name = name
+    return buf
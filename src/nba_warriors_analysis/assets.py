@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import io
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Union
+
+from .utils import logger
+
+
+# Supported output formats: palette-quantized PNG, full-colour PNG, JPEG, or the rendered file as-is
+ASSET_FORMATS = {"png8": ".png", "png": ".png", "jpeg": ".jpg", "original": ""}
+
+
+@dataclass(frozen=True)
+class AssetProfile:
+    """How a chart is re-encoded for one target (PDF embedding, email attachment)."""
+
+    name: str
+    fmt: str = "png8"
+    max_width: int = 0  # pixels; 0 keeps the rendered width
+    quality: int = 85  # JPEG only
+    colors: int = 256  # png8 only
+
+    def __post_init__(self):
+        if self.fmt not in ASSET_FORMATS:
+            expected = ", ".join(ASSET_FORMATS)
+            raise ValueError(f"Unsupported asset format: {self.fmt} (expected one of {expected})")
+
+
+def pdf_profile() -> AssetProfile:
+    """Profile for images embedded in the PDF report.
+
+    Optional env vars:
+      - PDF_IMAGE_FORMAT (png8 | png | jpeg | original; default png8)
+      - PDF_IMAGE_MAX_WIDTH (default 1200 px, ~160 dpi across the page width)
+      - PDF_IMAGE_QUALITY (default 85, JPEG only)
+    """
+    return AssetProfile(
+        name="pdf",
+        fmt=os.getenv("PDF_IMAGE_FORMAT", "png8").strip().lower(),
+        max_width=int(os.getenv("PDF_IMAGE_MAX_WIDTH", "1200")),
+        quality=int(os.getenv("PDF_IMAGE_QUALITY", "85")),
+    )
+
+
+def email_profile() -> AssetProfile:
+    """Profile for chart thumbnails attached to emails (EMAIL_CHARTS=thumbnails).
+
+    Optional env vars:
+      - EMAIL_THUMB_WIDTH (default 480 px)
+      - EMAIL_THUMB_QUALITY (default 70)
+    """
+    return AssetProfile(
+        name="email",
+        fmt="jpeg",
+        max_width=int(os.getenv("EMAIL_THUMB_WIDTH", "480")),
+        quality=int(os.getenv("EMAIL_THUMB_QUALITY", "70")),
+    )
+
+
+def optimized_path(src: str, profile: AssetProfile) -> str:
+    """Location of ``src`` re-encoded for ``profile``: ``<dir>/<profile>/<stem><ext>``."""
+    folder, fname = os.path.split(src)
+    stem = os.path.splitext(fname)[0]
+    return os.path.join(folder, profile.name, stem + ASSET_FORMATS[profile.fmt])
+
+
+def _reencode(src: Union[str, BinaryIO], dest: Union[str, BinaryIO], profile: AssetProfile) -> None:
+    from PIL import Image
+
+    with Image.open(src) as img:
+        # Matplotlib figures are opaque; flatten onto white before dropping the alpha channel
+        if img.mode in ("RGBA", "LA", "P"):
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            img = img.convert("RGB")
+        if profile.max_width and img.width > profile.max_width:
+            height = max(1, round(img.height * profile.max_width / img.width))
+            img = img.resize((profile.max_width, height), Image.LANCZOS)
+        if profile.fmt == "jpeg":
+            img.save(dest, "JPEG", quality=profile.quality, optimize=True)
+        elif profile.fmt == "png8":
+            img = img.quantize(colors=profile.colors, method=Image.Quantize.FASTOCTREE)
+            img.save(dest, "PNG", optimize=True)
+        else:
+            img.save(dest, "PNG", optimize=True)
+
+
+def optimize_image(src: str, profile: AssetProfile, dest: Optional[str] = None) -> str:
+    """Re-encode ``src`` for ``profile`` and return the output path.
+
+    The output is reused while it is newer than ``src``, so unchanged charts (chart-cache hits)
+    are not re-encoded. Falls back to ``src`` when the image cannot be processed.
+    """
+    if profile.fmt == "original":
+        return src
+    dest = dest or optimized_path(src, profile)
+    try:
+        if os.path.isfile(dest) and os.stat(dest).st_mtime_ns >= os.stat(src).st_mtime_ns:
+            return dest
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            _reencode(src, fh, profile)
+        os.replace(tmp, dest)
+        return dest
+    except Exception as err:
+        logger.warning("Could not optimize %s for %s: %s", src, profile.name, err)
+        return src
+
+
+def optimize_bytes(data: bytes, profile: AssetProfile) -> bytes:
+    """In-memory counterpart of optimize_image(); returns ``data`` unchanged on failure."""
+    if profile.fmt == "original":
+        return data
+    out = io.BytesIO()
+    try:
+        _reencode(io.BytesIO(data), out, profile)
+    except Exception as err:
+        logger.warning("Could not optimize in-memory image for %s: %s", profile.name, err)
+        return data
+    return out.getvalue()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Iterable, Optional
+
+from .breaker import CircuitOpen
+from .cache import fresh_cache_path, team_cache_paths
+from .utils import backoff_delay, logger
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second with bursts of up to ``burst``.
+
+    A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(frozen=True)
+class FetchOutcome:
+    team_id: int
+    status: str  # fresh | fetched | failed | cancelled
+    attempts: int = 0
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+
+
+async def _fetch_team(
+    team_id: int,
+    bucket: TokenBucket,
+    executor: ThreadPoolExecutor,
+    retries: int,
+    backoff_base: float,
+    max_backoff: float,
+    timeout: int,
+    cache_dir: Optional[str],
+    ttl: float,
+    incremental: bool,
+    cancel: threading.Event,
+) -> FetchOutcome:
+    from . import analysis
+
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    paths = team_cache_paths(team_id, analysis._team_abbr(team_id), cache_dir)
+    if fresh_cache_path(paths, ttl):
+        return FetchOutcome(team_id, "fresh")
+
+    fetch = partial(
+        analysis.fetch_games, team_id, retries=1, timeout=timeout, cache_dir=cache_dir,
+        use_cache_on_failure=False, incremental=incremental, ttl=0, offline=False,
+        stale_while_revalidate=False, cancel=cancel,
+    )
+    error: Optional[str] = None
+    for attempt in range(1, retries + 1):
+        await bucket.acquire()
+        try:
+            await loop.run_in_executor(executor, fetch)
+            return FetchOutcome(
+                team_id, "fetched", attempt, round(time.perf_counter() - started, 3)
+            )
+        except CircuitOpen as e:
+            # Upstream is known to be down; retrying would only wait out the cool-down
+            return FetchOutcome(
+                team_id, "failed", attempt, round(time.perf_counter() - started, 3), str(e)
+            )
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            if attempt < retries:
+                delay = backoff_delay(attempt, backoff_base, max_backoff)
+                logger.warning("Async fetch for team %s failed (%s/%s): %s; retrying in %.1fs",
+                               team_id, attempt, retries, error, delay)
+                await asyncio.sleep(delay)
+    return FetchOutcome(team_id, "failed", retries, round(time.perf_counter() - started, 3), error)
+
+
+async def fetch_many(
+    team_ids: Iterable[int],
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+    retries: Optional[int] = None,
+    backoff_base: Optional[float] = None,
+    max_backoff: Optional[float] = None,
+    timeout: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    ttl: Optional[float] = None,
+    incremental: Optional[bool] = None,
+    deadline: Optional[float] = None,
+) -> Dict[int, FetchOutcome]:
+    """Fetch many teams concurrently into the regular cache layout.
+
+    Upstream calls share one token bucket and retry with jittered exponential backoff. Teams
+    whose cache is still fresh are skipped. After ``deadline`` seconds, or when the caller
+    cancels, unfinished fetches are cancelled and reported as ``cancelled``: their worker threads
+    stop retrying and do not write the cache (an upstream request already in progress still runs
+    to its timeout).
+
+    Optional env vars:
+      - NBA_API_CONCURRENCY (parallel fetches, default 8)
+      - NBA_API_RATE (upstream requests per second, default 2; 0 disables the limit)
+      - NBA_API_BURST (default 4)
+      - NBA_API_MAX_BACKOFF (seconds, default 30)
+      - NBA_API_RETRIES, NBA_API_BACKOFF_BASE, NBA_API_TIMEOUT, NBA_API_CACHE_DIR,
+        NBA_API_CACHE_TTL, NBA_API_INCREMENTAL (as for fetch_games)
+    """
+    concurrency = concurrency or int(os.getenv("NBA_API_CONCURRENCY", "8"))
+    bucket = TokenBucket(
+        rate if rate is not None else float(os.getenv("NBA_API_RATE", "2")),
+        burst or int(os.getenv("NBA_API_BURST", "4")),
+    )
+    options = dict(
+        retries=retries or int(os.getenv("NBA_API_RETRIES", "5")),
+        backoff_base=backoff_base or float(os.getenv("NBA_API_BACKOFF_BASE", "2.5")),
+        max_backoff=max_backoff or float(os.getenv("NBA_API_MAX_BACKOFF", "30")),
+        timeout=timeout or int(os.getenv("NBA_API_TIMEOUT", "90")),
+        cache_dir=cache_dir if cache_dir is not None else os.getenv("NBA_API_CACHE_DIR", "data"),
+        ttl=ttl if ttl is not None else float(os.getenv("NBA_API_CACHE_TTL", "3600")),
+        incremental=(
+            incremental if incremental is not None
+            else os.getenv("NBA_API_INCREMENTAL", "0") == "1"
+        ),
+    )
+
+    ids = list(dict.fromkeys(int(t) for t in team_ids))
+    outcomes: Dict[int, FetchOutcome] = {}
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(ids) or 1)), thread_name_prefix="async-fetch"
+    )
+    tasks = {
+        asyncio.create_task(_fetch_team(tid, bucket, executor, cancel=cancel, **options)): tid
+        for tid in ids
+    }
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        # Also reached when the caller cancels us: stop everything still in flight
+        cancel.set()
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for task, tid in tasks.items():
+        if task.cancelled():
+            outcomes[tid] = FetchOutcome(tid, "cancelled")
+        elif task.exception() is not None:
+            outcomes[tid] = FetchOutcome(tid, "failed", error=str(task.exception()))
+        else:
+            outcomes[tid] = task.result()
+    return outcomes
+
+
+def warm_teams(team_ids: Iterable[int], **kwargs) -> Dict[int, FetchOutcome]:
+    """Blocking fetch_many() for threads without an event loop (e.g. the web warmer)."""
+    started = time.perf_counter()
+    outcomes = asyncio.run(fetch_many(team_ids, **kwargs))
+    counts: Dict[str, int] = {}
+    for outcome in outcomes.values():
+        counts[outcome.status] = counts.get(outcome.status, 0) + 1
+    logger.info("Warmed %d team(s) in %.1fs: %s", len(outcomes), time.perf_counter() - started,
+                ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    return outcomes
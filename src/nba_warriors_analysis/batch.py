@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .analysis import fetch_league_games
+from .registry import TeamContext, get_registry
+from .utils import Settings, logger
+
+
+def resolve_team_contexts(teams_arg: str) -> List[TeamContext]:
+    """Resolve a ``--teams`` value ("ALL" or comma-separated abbreviations) to team contexts."""
+    registry = get_registry()
+    if teams_arg.strip().upper() == "ALL":
+        return list(registry.contexts)
+    selected: List[TeamContext] = []
+    for abbr in (a.strip() for a in teams_arg.split(",")):
+        if not abbr:
+            continue
+        ctx = registry.by_abbr(abbr)
+        if ctx is None:
+            raise SystemExit(f"Team abbr not found: {abbr}")
+        selected.append(ctx)
+    return selected
+
+
+def _init_worker() -> None:
+    # Pay the pandas/matplotlib/seaborn/fpdf import cost once per worker, not once per team
+    from . import pipeline  # noqa: F401
+
+
+def _run_team(ctx: TeamContext, settings: Settings, games=None) -> Dict[str, Any]:
+    from .pipeline import run_team_pipeline
+
+    started = time.perf_counter()
+    entry: Dict[str, Any] = {"team_abbr": ctx.abbr, "team_name": ctx.name}
+    try:
+        result = run_team_pipeline(
+            ctx, settings, include_trend=True, update_env=False, games=games, persist=True
+        )
+        entry.update(result.to_dict())
+        entry["status"] = "ok" if result.report_path else "failed"
+        if not result.report_path:
+            entry["error"] = "PDF report was not generated"
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = str(e) or e.__class__.__name__
+    entry["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def _email_reports(entries: List[Dict[str, Any]], settings: Settings) -> None:
+    from .emailer import BatchMailer, compose_summary_email
+
+    if not settings.email_user or not settings.email_pass:
+        logger.error("Missing EMAIL_USER or EMAIL_PASS; not emailing batch reports.")
+        return
+    emails = []
+    for entry in entries:
+        if entry["status"] != "ok":
+            continue
+        try:
+            emails.append(compose_summary_email(settings, entry["team_abbr"], entry["team_name"]))
+        except Exception as e:  # e.g. EmailError for a missing summary or recipients
+            error = str(e) or e.__class__.__name__
+            entry["email"] = {"delivered": [], "failed": {}, "error": error}
+    if not emails:
+        return
+    with BatchMailer(settings.email_user, settings.email_pass) as mailer:
+        deliveries = mailer.send_all(emails)
+    by_team = {e["team_abbr"]: e for e in entries}
+    for d in deliveries:
+        result = by_team[d.team_abbr].setdefault("email", {"delivered": [], "failed": {}})
+        if d.status == "delivered":
+            result["delivered"].append(d.recipient)
+        else:
+            result["failed"][d.recipient] = d.error
+
+
+def _write_league_table(contexts: List[TeamContext], settings: Settings) -> Optional[str]:
+    """Write ``<REPORTS_DIR>/league_table.csv`` comparing the batch's teams from the store."""
+    from .store import league_table, store_enabled
+
+    if not store_enabled() or len(contexts) < 2:
+        return None
+    try:
+        table = league_table([c.id for c in contexts])
+    except Exception as e:
+        logger.warning("League table unavailable: %s", e)
+        return None
+    if table.empty:
+        return None
+    os.makedirs(settings.reports_dir, exist_ok=True)
+    path = os.path.join(settings.reports_dir, "league_table.csv")
+    table.to_csv(path, index=False)
+    return path
+
+
+def run_batch(
+    contexts: List[TeamContext],
+    jobs: Optional[int] = None,
+    manifest_path: Optional[str] = None,
+    settings: Optional[Settings] = None,
+    league_fetch: bool = True,
+    send_email: bool = False,
+) -> Dict[str, Any]:
+    """Run the team pipeline for many teams across a process pool and write a JSON manifest.
+
+    ``jobs`` defaults to the CPU count. With ``league_fetch`` and more than one team, games
+    are pulled with league-wide calls up front and handed to the workers; teams missing from
+    that result (or all teams, if it fails) fall back to per-team fetches. The manifest
+    (default ``<REPORTS_DIR>/batch_manifest.json``) records per-team status, artifact paths,
+    errors and elapsed time, plus the path of the cross-team ``league_table.csv`` built from the
+    analytics store (see store.league_table). With ``send_email`` the successful teams'
+    summaries are emailed afterwards through one BatchMailer, and per-recipient delivery results
+    are added to the manifest.
+    """
+    settings = settings or Settings()
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(contexts) or 1))
+    manifest_path = manifest_path or os.path.join(settings.reports_dir, "batch_manifest.json")
+
+    logger.info("Batch run: %d teams across %d worker(s)", len(contexts), jobs)
+    started = time.perf_counter()
+    prefetched: Dict[int, Any] = {}
+    if league_fetch and len(contexts) > 1:
+        try:
+            prefetched = fetch_league_games(team_ids=[c.id for c in contexts])
+        except Exception as e:
+            logger.warning("League-wide fetch failed (%s); falling back to per-team fetches", e)
+
+    entries: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_run_team, ctx, settings, prefetched.get(ctx.id)): ctx for ctx in contexts
+        }
+        for fut in as_completed(futures):
+            ctx = futures[fut]
+            try:
+                entry = fut.result()
+            except (Exception, SystemExit) as e:  # worker process died, or sys.exit() inside it
+                entry = {"team_abbr": ctx.abbr, "team_name": ctx.name, "status": "failed",
+                         "error": str(e) or e.__class__.__name__}
+            if entry["status"] == "ok":
+                logger.info("Batch: %s done in %ss", ctx.abbr, entry.get("elapsed_s"))
+            else:
+                logger.error("Batch: %s failed: %s", ctx.abbr, entry.get("error"))
+            entries.append(entry)
+
+    entries.sort(key=lambda e: e["team_abbr"])
+    if send_email:
+        _email_reports(entries, settings)
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "jobs": jobs,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "succeeded": sum(1 for e in entries if e["status"] == "ok"),
+        "failed": sum(1 for e in entries if e["status"] != "ok"),
+        "league_table": _write_league_table(contexts, settings),
+        "teams": entries,
+    }
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    logger.info(
+        "Batch complete: %d ok, %d failed in %ss → %s",
+        manifest["succeeded"], manifest["failed"], manifest["elapsed_s"], manifest_path,
+    )
+    return manifest
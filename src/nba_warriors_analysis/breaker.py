@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .locks import file_lock
+from .utils import logger
+
+T = TypeVar("T")
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker whose state lives in a small JSON file.
+
+    Every thread and process pointing at the same ``state_path`` (e.g. all gunicorn workers)
+    shares one breaker. After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with CircuitOpen. Once ``cooldown`` seconds have passed, a single caller is
+    let through as a probe (half-open): success closes the circuit, failure re-opens it. A probe
+    that never reports back is replaced after ``probe_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        state_path: str,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        probe_timeout: float = 120.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.state_path = state_path
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+
+    # State file helpers (writers hold the lock)
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {"state": "closed", "failures": 0}
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        tmp = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, self.state_path)
+
+    def _lock(self):
+        return file_lock(f"{self.state_path}.lock")
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock():
+            return self._read()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpen unless a call may go upstream now (possibly as the half-open probe)."""
+        # Lock-free fast path: the state file is replaced atomically, so a closed circuit costs
+        # one read
+        if self._read()["state"] == "closed":
+            return
+        with self._lock():
+            state = self._read()
+            now = self._clock()
+            if state["state"] == "closed":
+                return
+            if state["state"] == "open" and now - state.get("opened_at", 0) < self.cooldown:
+                raise CircuitOpen(
+                    f"Upstream circuit open after {state['failures']} consecutive failures"
+                )
+            probing_for = now - state.get("probe_started", 0)
+            if state["state"] == "half_open" and probing_for < self.probe_timeout:
+                raise CircuitOpen("Upstream circuit half-open; probe in flight")
+            state.update(state="half_open", probe_started=now)
+            self._write(state)
+            logger.info("Circuit half-open: probing upstream")
+
+    def record_success(self) -> None:
+        current = self._read()
+        if current["state"] == "closed" and not current.get("failures"):
+            return
+        with self._lock():
+            state = self._read()
+            if state["state"] != "closed" or state.get("failures"):
+                if state["state"] != "closed":
+                    logger.info("Circuit closed: upstream recovered")
+                self._write({"state": "closed", "failures": 0})
+
+    def record_failure(self) -> None:
+        with self._lock():
+            state = self._read()
+            failures = int(state.get("failures", 0)) + 1
+            if state["state"] == "half_open" or failures >= self.failure_threshold:
+                if state["state"] != "open":
+                    logger.warning(
+                        "Circuit open after %d consecutive failure(s); serving from cache "
+                        "for %.0fs",
+                        failures, self.cooldown,
+                    )
+                self._write({"state": "open", "failures": failures, "opened_at": self._clock()})
+            else:
+                self._write({**state, "failures": failures})
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+@lru_cache(maxsize=None)
+def _breaker_for(
+    state_path: str, threshold: int, cooldown: float, probe_timeout: float
+) -> CircuitBreaker:
+    return CircuitBreaker(state_path, threshold, cooldown, probe_timeout)
+
+
+def get_breaker() -> Optional[CircuitBreaker]:
+    """Breaker guarding stats.nba.com, or None when disabled.
+
+    Optional env vars:
+      - NBA_API_BREAKER (default 1)
+      - NBA_API_BREAKER_THRESHOLD (consecutive failures before opening, default 3)
+      - NBA_API_BREAKER_COOLDOWN (seconds before a probe is allowed, default 60)
+      - NBA_API_BREAKER_PROBE_TIMEOUT (seconds before a silent probe is replaced, default 120)
+      - NBA_API_BREAKER_STATE (default <NBA_API_CACHE_DIR>/.nba_api_breaker.json)
+    """
+    if os.getenv("NBA_API_BREAKER", "1") != "1":
+        return None
+    state_path = os.getenv("NBA_API_BREAKER_STATE") or os.path.join(
+        os.getenv("NBA_API_CACHE_DIR", "data"), ".nba_api_breaker.json"
+    )
+    return _breaker_for(
+        os.path.abspath(state_path),
+        int(os.getenv("NBA_API_BREAKER_THRESHOLD", "3")),
+        float(os.getenv("NBA_API_BREAKER_COOLDOWN", "60")),
+        float(os.getenv("NBA_API_BREAKER_PROBE_TIMEOUT", "120")),
+    )
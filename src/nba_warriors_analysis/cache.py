@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .locks import file_lock
+from .utils import logger
+
+
+# Supported on-disk formats for per-team game caches, keyed by NBA_API_CACHE_FORMAT value
+CACHE_EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cache_format(fmt: Optional[str] = None) -> str:
+    """Resolve the cache format (parquet by default), falling back to CSV without pyarrow.
+
+    Optional env vars:
+      - NBA_API_CACHE_FORMAT (parquet | feather | csv)
+    """
+    fmt = (fmt or os.getenv("NBA_API_CACHE_FORMAT", "parquet")).strip().lower()
+    if fmt not in CACHE_EXTENSIONS:
+        expected = ", ".join(CACHE_EXTENSIONS)
+        raise ValueError(f"Unsupported cache format: {fmt} (expected one of {expected})")
+    if fmt != "csv" and not _has_pyarrow():
+        logger.debug("pyarrow not installed; using CSV cache instead of %s", fmt)
+        return "csv"
+    return fmt
+
+
+def _format_of(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in CACHE_EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Unrecognised cache file extension: {path}")
+
+
+def team_cache_paths(
+    team_id: int, team_abbr: Optional[str], cache_dir: Optional[str], fmt: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (abbr-named, id-named) cache paths for a team; either may be None."""
+    cache_path_id: Optional[str] = None
+    cache_path_abbr: Optional[str] = None
+    if cache_dir:
+        ext = CACHE_EXTENSIONS[cache_format(fmt)]
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path_id = os.path.join(cache_dir, f"games_{team_id}{ext}")
+        if team_abbr:
+            cache_path_abbr = os.path.join(cache_dir, f"{team_abbr}_games{ext}")
+    return cache_path_abbr, cache_path_id
+
+
+def normalize_games(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the typed schema: datetime GAME_DATE and zero-padded string GAME_ID/SEASON_ID."""
+    if "GAME_DATE" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["GAME_DATE"]):
+        df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])  # type: ignore
+    if "GAME_ID" in df.columns:
+        df["GAME_ID"] = df["GAME_ID"].astype(str).str.zfill(10)
+    if "SEASON_ID" in df.columns:
+        df["SEASON_ID"] = df["SEASON_ID"].astype(str)
+    return df
+
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def cache_lock(path: str):
+    """Exclusive lock guarding writes to one cache file and its metadata."""
+    return file_lock(f"{path}.lock")
+
+
+def write_games(df: pd.DataFrame, path: str) -> None:
+    """Write ``df`` atomically: readers see the previous file or the complete new one."""
+    fmt = _format_of(path)
+    tmp = _tmp_path(path)
+    try:
+        if fmt == "csv":
+            df.to_csv(tmp, index=False)
+        else:
+            typed = normalize_games(df.reset_index(drop=True).copy())
+            if fmt == "parquet":
+                typed.to_parquet(tmp, index=False)
+            else:
+                # Uncompressed Feather can be memory-mapped without a decode step
+                typed.to_feather(tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read_games(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a cache file; ``columns`` projects only the named columns (memory-mapped for Arrow)."""
+    fmt = _format_of(path)
+    cols = list(columns) if columns is not None else None
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=cols, memory_map=True)
+    elif fmt == "feather":
+        from pyarrow import feather
+
+        df = feather.read_table(path, columns=cols, memory_map=True).to_pandas()
+    else:
+        df = pd.read_csv(path, usecols=cols, dtype={"GAME_ID": str, "SEASON_ID": str})
+    return normalize_games(df)
+
+
+def meta_path(path: str) -> str:
+    return f"{path}.meta.json"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_cache_meta(path: str, rows: int) -> None:
+    """Record fetch time, row count and checksum next to a cache file (``<path>.meta.json``)."""
+    now = time.time()
+    meta = {
+        "fetched_at": now,
+        "fetched_at_iso": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+        "rows": int(rows),
+        "sha256": _file_sha256(path),
+        "format": _format_of(path),
+    }
+    tmp = _tmp_path(meta_path(path))
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, meta_path(path))
+
+
+def read_cache_meta(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(meta_path(path), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_age(path: str, rows: Optional[int] = None) -> float:
+    """Seconds since the cache file was fetched.
+
+    Infinite (stale) without metadata (e.g. seeds), on a row count mismatch, or when the file's
+    checksum no longer matches the one recorded at fetch time (the file was replaced or edited
+    behind the cache's back).
+    """
+    meta = read_cache_meta(path)
+    if not meta or (rows is not None and meta.get("rows") != rows):
+        return float("inf")
+    try:
+        if meta.get("sha256") != _file_sha256(path):
+            logger.info("Cache %s does not match its recorded checksum; treating it as stale", path)
+            return float("inf")
+    except OSError:
+        return float("inf")
+    return max(0.0, time.time() - float(meta.get("fetched_at", 0)))
+
+
+def fresh_cache_path(cache_paths: Iterable[Optional[str]], ttl: float) -> Optional[str]:
+    """First cache file fetched within ``ttl`` seconds, judged from metadata alone."""
+    if ttl <= 0:
+        return None
+    for cpath in _candidate_paths(cache_paths):
+        if os.path.isfile(cpath) and cache_age(cpath) <= ttl:
+            return cpath
+    return None
+
+
+def write_team_cache(
+    df: pd.DataFrame, cache_paths: Iterable[Optional[str]], fresh: bool = True
+) -> None:
+    """Write ``df`` to every cache path; ``fresh=False`` drops the metadata so it reads as stale."""
+    for cpath in cache_paths:
+        if cpath:
+            try:
+                with cache_lock(cpath):
+                    write_games(df, cpath)
+                    if fresh:
+                        write_cache_meta(cpath, len(df))
+                    elif os.path.exists(meta_path(cpath)):
+                        os.remove(meta_path(cpath))
+            except Exception as cache_err:
+                logger.debug("Failed to write cache %s: %s", cpath, cache_err)
+
+
+def append_team_cache(
+    new_rows: pd.DataFrame,
+    merged: pd.DataFrame,
+    existing: pd.DataFrame,
+    cache_paths: Iterable[Optional[str]],
+) -> None:
+    """Append only ``new_rows`` to existing cache files, else rewrite them with ``merged``.
+
+    CSV caches are appended to (on a copy that atomically replaces the file). Parquet and
+    Feather files cannot be appended to, so they are rewritten from ``merged``.
+    """
+    can_append = set(new_rows.columns) <= set(existing.columns)
+    for cpath in cache_paths:
+        if not cpath:
+            continue
+        try:
+            with cache_lock(cpath):
+                if can_append and os.path.isfile(cpath) and _format_of(cpath) == "csv":
+                    if not new_rows.empty:
+                        # Append to a copy and swap it in, so readers never see a half-written row
+                        tmp = _tmp_path(cpath)
+                        shutil.copyfile(cpath, tmp)
+                        new_rows.reindex(columns=existing.columns).to_csv(
+                            tmp, mode="a", header=False, index=False
+                        )
+                        os.replace(tmp, cpath)
+                else:
+                    write_games(merged, cpath)
+                write_cache_meta(cpath, len(merged))
+        except Exception as cache_err:
+            logger.debug("Failed to update cache %s: %s", cpath, cache_err)
+
+
+def _candidate_paths(cache_paths: Iterable[Optional[str]]) -> List[str]:
+    # Preferred-format paths first, then the same stems in every other format
+    # (e.g. legacy CSV seeds)
+    preferred = [p for p in cache_paths if p]
+    candidates = list(preferred)
+    for path in preferred:
+        stem = os.path.splitext(path)[0]
+        candidates.extend(
+            stem + ext for ext in CACHE_EXTENSIONS.values() if stem + ext not in candidates
+        )
+    return candidates
+
+
+def read_team_cache(
+    cache_paths: Iterable[Optional[str]], columns: Optional[Sequence[str]] = None
+) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """Return the first readable cached frame and its path, or (None, None)."""
+    for cpath in _candidate_paths(cache_paths):
+        if not os.path.isfile(cpath):
+            continue
+        if _format_of(cpath) != "csv" and not _has_pyarrow():
+            continue
+        try:
+            return read_games(cpath, columns=columns), cpath
+        except Exception as cache_read_err:
+            logger.debug("Failed to read cache %s: %s", cpath, cache_read_err)
+    return None, None
+
+
+def merge_games(existing: Optional[pd.DataFrame], new: pd.DataFrame) -> pd.DataFrame:
+    """Union two game frames, keeping the newest row per GAME_ID, sorted by GAME_DATE."""
+    if existing is None or existing.empty:
+        merged = new.copy()
+    else:
+        merged = pd.concat(
+            [normalize_games(existing.copy()), normalize_games(new.copy())], ignore_index=True
+        )
+        if "GAME_ID" in merged.columns:
+            merged = merged.drop_duplicates(subset="GAME_ID", keep="last")
+    merged = normalize_games(merged)
+    return merged.sort_values("GAME_DATE").reset_index(drop=True)
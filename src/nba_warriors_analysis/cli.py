@@ -3,17 +3,14 @@ from __future__ import annotations
 import argparse
 import os
 
-import matplotlib.pyplot as plt
-import pandas as pd
-from dotenv import set_key
-
-from .analysis import find_team_context, list_teams_sorted, fetch_games, compute_summary, persist_outputs
-from .plotting import generate_all_charts
-from .reporting import ReportBuilder
 from .utils import Settings, logger
 
+# Subcommand modules are imported where they are used, so `--help` and `schedule` start quickly
+
 
 def choose_team_interactive() -> int:
+    from .analysis import list_teams_sorted
+
     teams = list_teams_sorted()
     print("\nAvailable NBA Teams:")
     for i, t in enumerate(teams, 1):
@@ -28,68 +25,99 @@ def choose_team_interactive() -> int:
             print("Enter a valid number.")
 
 
-def run_pipeline(team_abbr: str | None, non_interactive: bool = False) -> None:
+def run_pipeline(
+    team_abbr: str | None, non_interactive: bool = False, profile: bool = False
+) -> None:
+    from .analysis import find_team_context
+    from .pipeline import run_team_pipeline
+    from .registry import get_registry
+    from .tracing import profiled
+
     settings = Settings()
 
     # Resolve team selection
+    registry = get_registry()
     if team_abbr:
-        teams_sorted = list_teams_sorted()
-        idx = next((i for i, t in enumerate(teams_sorted) if t["abbreviation"].lower() == team_abbr.lower()), None)
-        if idx is None:
+        ctx = registry.by_abbr(team_abbr)
+        if ctx is None:
             raise SystemExit(f"Team abbr not found: {team_abbr}")
     elif non_interactive:
         # Use LAST_TEAM_ABBR if present
-        teams_sorted = list_teams_sorted()
         env_abbr = settings.last_team_abbr
-        idx = next((i for i, t in enumerate(teams_sorted) if t["abbreviation"].lower() == env_abbr.lower()), None)
-        if idx is None:
+        ctx = registry.by_abbr(env_abbr)
+        if ctx is None:
             raise SystemExit(f"Team abbr not found in env: {env_abbr}")
     else:
-        idx = choose_team_interactive()
+        ctx = find_team_context(choose_team_interactive())
 
-    ctx = find_team_context(idx)
     logger.info("Analyzing %s (%s)", ctx.name, ctx.abbr)
 
-    # Fetch data
-    df = fetch_games(ctx.id)
-
-    # Persist summary and raw games
-    summary = compute_summary(df)
-    summary_path, games_path = persist_outputs(df, summary, ctx.abbr, settings)
-
-    # Scoring trend (single chart similar to original behavior)
-    df["PTS_ROLLING_AVG_5"] = df["PTS"].rolling(5).mean()
-    plt.figure(figsize=(10, 5))
-    plt.plot(df["GAME_DATE"], df["PTS"], label="Points", alpha=0.4)
-    plt.plot(df["GAME_DATE"], df["PTS_ROLLING_AVG_5"], label="Rolling Avg (5)", linewidth=2)
-    plt.title(f"{ctx.name} Scoring Trend")
-    plt.xlabel("Date"); plt.ylabel("Points"); plt.legend(); plt.grid(True); plt.tight_layout()
-    trend_path = os.path.join(settings.plots_dir, f"{ctx.abbr}_trend.png")
-    os.makedirs(settings.plots_dir, exist_ok=True)
-    plt.savefig(trend_path)
-    plt.close()
-
-    # Update .env with selected team info for downstream scripts
-    set_key(".env", "LAST_TEAM_ABBR", ctx.abbr)
-    set_key(".env", "LAST_TEAM_NAME", ctx.name)
+    # Fetch → summary → trend + extended charts → PDF; also records LAST_TEAM_* in .env
+    if profile:
+        with profiled(os.path.join(settings.reports_dir, f"{ctx.abbr}_profile")):
+            result = run_team_pipeline(ctx, settings, include_trend=True)
+    else:
+        result = run_team_pipeline(ctx, settings, include_trend=True)
     logger.info("Saved LAST_TEAM_ABBR=%s and LAST_TEAM_NAME=%s", ctx.abbr, ctx.name)
 
-    # Generate extended charts
-    generate_all_charts(df, ctx.abbr, settings)
-
-    # Build PDF report
-    report_path = ReportBuilder(settings).build_pdf(ctx.abbr, ctx.name)
-
-    logger.info("Analysis complete. Summary=%s, Games=%s, Trend=%s, Report=%s", summary_path, games_path, trend_path, report_path)
+    logger.info(
+        "Analysis complete. Summary=%s, Games=%s, Trend=%s, Report=%s, Run report=%s",
+        result.summary_path, result.games_path, result.trend_path, result.report_path,
+        result.run_report_path,
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(description="NBA Warriors Analysis Pipeline")
+    parser.add_argument("command", nargs="?", choices=("run", "schedule"), default="run",
+                        help="run (default) or schedule: run the pipeline in-process on "
+                             "SCHEDULE_CRON")
     parser.add_argument("--team", help="Team abbreviation, e.g., GSW, LAL", default=None)
-    parser.add_argument("--non-interactive", action="store_true", help="Use env LAST_TEAM_ABBR and skip prompts")
+    parser.add_argument("--non-interactive", action="store_true",
+                        help="Use env LAST_TEAM_ABBR and skip prompts")
+    parser.add_argument("--teams", default=None,
+                        help="Batch mode: ALL or comma-separated abbreviations, e.g., GSW,LAL")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Batch mode worker processes (default: CPU count)")
+    parser.add_argument("--manifest", default=None,
+                        help="Batch mode manifest path (default: reports/batch_manifest.json)")
+    parser.add_argument("--no-league-fetch", action="store_true",
+                        help="Batch mode: fetch each team separately")
+    parser.add_argument("--email", action="store_true",
+                        help="Batch mode: email every report (shared SMTP connections)")
+    parser.add_argument("--cron", default=None,
+                        help="Schedule: cron expression (default: SCHEDULE_CRON)")
+    parser.add_argument("--once", action="store_true",
+                        help="Schedule: run the scheduled teams now and exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="Single-team runs: profile into reports/<ABBR>_profile.prof "
+                             "(PROFILER=pyinstrument for HTML)")
     args = parser.parse_args()
-
-    run_pipeline(args.team, non_interactive=args.non_interactive)
+    # Batch and scheduled runs work in pool processes/threads a profile of this thread would miss
+    if args.profile and (args.command == "schedule" or args.teams):
+        parser.error(
+            "--profile only applies to single-team runs, not to --teams or the schedule command"
+        )
+
+    if args.command == "schedule":
+        from .scheduler import run_scheduler
+
+        run_scheduler(cron=args.cron, teams=args.teams or args.team, once=args.once)
+        return
+
+    if args.teams:
+        from .batch import resolve_team_contexts, run_batch
+
+        manifest = run_batch(
+            resolve_team_contexts(args.teams),
+            jobs=args.jobs,
+            manifest_path=args.manifest,
+            league_fetch=not args.no_league_fetch,
+            send_email=args.email,
+        )
+        raise SystemExit(1 if manifest["failed"] else 0)
+
+    run_pipeline(args.team, non_interactive=args.non_interactive, profile=args.profile)
 
 
 if __name__ == "__main__":
@@ -1,34 +1,122 @@
 from __future__ import annotations
 
+import io
 import os
-from typing import List
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import pandas as pd
 import yagmail
 
-from .utils import Settings, logger
+from .assets import email_profile, optimize_bytes, optimize_image
+from .utils import Settings, backoff_delay, logger
 
+if TYPE_CHECKING:
+    from .artifacts import ArtifactBundle
 
-def _gather_attachments(team_abbr: str, settings: Settings) -> List[str]:
+
+class EmailError(RuntimeError):
+    """Raised when the summary email cannot be built or sent.
+
+    E.g. missing credentials, summary or recipients.
+    """
+
+
+# What to attach besides the PDF, which already contains every chart
+EMAIL_CHART_MODES = ("none", "thumbnails", "full")
+
+
+def _email_chart_mode() -> str:
+    mode = os.getenv("EMAIL_CHARTS", "none").strip().lower()
+    if mode not in EMAIL_CHART_MODES:
+        expected = ", ".join(EMAIL_CHART_MODES)
+        raise ValueError(f"Unsupported EMAIL_CHARTS: {mode} (expected one of {expected})")
+    return mode
+
+
+def _gather_attachments(
+    team_abbr: str, settings: Settings, charts: Optional[str] = None
+) -> List[str]:
+    """Return the PDF report plus, depending on ``charts`` (EMAIL_CHARTS env, default none),
+    no chart images, JPEG thumbnails (see ``assets.email_profile``) or the full-size PNGs.
+    """
+    charts = charts or _email_chart_mode()
     attachments: List[str] = []
     pdf_path = os.path.join(settings.reports_dir, f"{team_abbr}_report.pdf")
     plots_dir = settings.plots_dir
     if os.path.exists(pdf_path):
         attachments.append(pdf_path)
-    if os.path.isdir(plots_dir):
-        for fname in os.listdir(plots_dir):
+    if charts != "none" and os.path.isdir(plots_dir):
+        profile = email_profile()
+        for fname in sorted(os.listdir(plots_dir)):
             if fname.startswith(team_abbr) and fname.lower().endswith((".png", ".jpg", ".jpeg")):
-                attachments.append(os.path.join(plots_dir, fname))
+                path = os.path.join(plots_dir, fname)
+                if charts == "thumbnails":
+                    path = optimize_image(path, profile)
+                attachments.append(path)
+    return attachments
+
+
+def _bundle_attachments(bundle: "ArtifactBundle", charts: Optional[str] = None) -> List[io.BytesIO]:
+    """In-memory counterpart of _gather_attachments(): named buffers built from the bundle."""
+    charts = charts or _email_chart_mode()
+    attachments: List[io.BytesIO] = []
+    pdf = bundle.pdf_buffer()
+    if pdf is not None:
+        attachments.append(pdf)
+    if charts != "none":
+        profile = email_profile()
+        for fname, buf in sorted(bundle.chart_buffers().items()):
+            if charts == "thumbnails":
+                buf = io.BytesIO(optimize_bytes(buf.getvalue(), profile))
+                buf.name = os.path.splitext(fname)[0] + ".jpg"
+            attachments.append(buf)
     return attachments
 
 
-def send_summary_email(settings: Settings, team_abbr: str, team_name: str) -> None:
-    summary_csv = os.path.join(settings.data_dir, f"{team_abbr}_summary.csv")
-    if not os.path.exists(summary_csv):
-        logger.error("Summary CSV not found: %s", summary_csv)
-        raise SystemExit(1)
+@dataclass(frozen=True)
+class SummaryEmail:
+    team_abbr: str
+    recipients: Tuple[str, ...]
+    subject: str
+    html: str
+    attachments: Tuple[Union[str, io.BytesIO], ...] = ()
 
-    summary = pd.read_csv(summary_csv, index_col=0).squeeze("columns")
+
+@dataclass(frozen=True)
+class Delivery:
+    team_abbr: str
+    recipient: str
+    status: str  # delivered | failed
+    attempts: int
+    error: Optional[str] = None
+
+
+def compose_summary_email(
+    settings: Settings, team_abbr: str, team_name: str, bundle: Optional["ArtifactBundle"] = None
+) -> SummaryEmail:
+    """Build the summary email with the PDF (and optionally charts) attached.
+
+    With ``bundle`` the summary and attachments come straight from memory; otherwise they are
+    read from data/, reports/ and plots/.
+    """
+    if bundle is not None:
+        summary = bundle.summary
+    else:
+        summary_csv = os.path.join(settings.data_dir, f"{team_abbr}_summary.csv")
+        if not os.path.exists(summary_csv):
+            raise EmailError(f"Summary CSV not found: {summary_csv}")
+        summary = pd.read_csv(summary_csv, index_col=0).squeeze("columns")
+
+    attached_note = {
+        "none": "Attached: full PDF report with all charts.",
+        "thumbnails": "Attached: full PDF report and chart previews.",
+        "full": "Attached: full PDF report and all charts.",
+    }[_email_chart_mode()]
 
     html_body = f"""
 <h2>🏀 {team_name} – Weekly Summary</h2>
@@ -42,28 +130,218 @@ def send_summary_email(settings: Settings, team_abbr: str, team_name: str) -> No
   <li><b>🏀 Avg Rebounds:</b> {summary['Rebounds']}</li>
   <li><b>📈 Avg Points:</b> {summary['Avg Points']}</li>
 </ul>
-<p>Attached: full PDF report and all charts.</p>
+<p>{attached_note}</p>
 """
 
-    sender = settings.email_user
-    app_pass = settings.email_pass
     recipients = settings.recipients()
-
-    if not sender or not app_pass:
-        logger.error("Missing EMAIL_USER or EMAIL_PASS; cannot send email.")
-        raise SystemExit(1)
     if not recipients:
-        logger.error("No recipients configured. Set EMAIL_RECEIVER or EMAIL_RECIPIENTS in .env.")
-        raise SystemExit(1)
+        raise EmailError(
+            "No recipients configured. Set EMAIL_RECEIVER or EMAIL_RECIPIENTS in .env."
+        )
 
-    attachments = _gather_attachments(team_abbr, settings)
+    attachments: List[Union[str, io.BytesIO]]
+    if bundle is not None:
+        attachments = _bundle_attachments(bundle)
+    else:
+        attachments = _gather_attachments(team_abbr, settings)
     if not attachments:
         logger.warning("No attachments found; sending body only.")
+    subject = f"🏀 {team_name} – Weekly Report"
+    return SummaryEmail(team_abbr, tuple(recipients), subject, html_body, tuple(attachments))
+
+
+def _smtp_options() -> Dict[str, Any]:
+    """yagmail.SMTP connection options; yagmail's Gmail defaults unless overridden.
+
+    Optional env vars:
+      - EMAIL_SMTP_HOST, EMAIL_SMTP_PORT
+      - EMAIL_SMTP_SSL (implicit TLS, default 1; 0 uses STARTTLS)
+    """
+    options: Dict[str, Any] = {}
+    if os.getenv("EMAIL_SMTP_HOST"):
+        options["host"] = os.getenv("EMAIL_SMTP_HOST")
+    if os.getenv("EMAIL_SMTP_PORT"):
+        options["port"] = int(os.getenv("EMAIL_SMTP_PORT", "0"))
+    if os.getenv("EMAIL_SMTP_SSL", "1") != "1":
+        options["smtp_ssl"] = False
+    return options
+
+
+def _smtp_error(error: Any) -> str:
+    if isinstance(error, tuple) and len(error) == 2:  # (code, message) from the server
+        code, message = error
+        if isinstance(message, bytes):
+            message = message.decode(errors="replace")
+        return f"{code} {message}"
+    return str(error) or error.__class__.__name__
+
+
+class BatchMailer:
+    """Send many emails across a small thread pool, reusing one SMTP login per worker thread.
+
+    yagmail reconnects on every ``send()``, so each worker logs in once and then hands messages
+    built by yagmail straight to the open connection. Transient failures (dropped connection,
+    4xx replies) reconnect and retry with jittered backoff; permanent ones (5xx, refused
+    recipients) do not. Results are reported per recipient.
+
+    Optional env vars:
+      - EMAIL_WORKERS (concurrent SMTP connections, default 3)
+      - EMAIL_RETRIES (attempts per message, default 3)
+      - EMAIL_BACKOFF_BASE (seconds, default 2)
+      - EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_SSL (see _smtp_options)
+    """
+
+    def __init__(
+        self,
+        user: Optional[str],
+        password: Optional[str],
+        workers: Optional[int] = None,
+        retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        smtp_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.user = user
+        self.password = password
+        self.retries = max(1, retries or int(os.getenv("EMAIL_RETRIES", "3")))
+        if backoff_base is None:
+            backoff_base = float(os.getenv("EMAIL_BACKOFF_BASE", "2"))
+        self.backoff_base = backoff_base
+        self.smtp_options = smtp_options if smtp_options is not None else _smtp_options()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers or int(os.getenv("EMAIL_WORKERS", "3"))),
+            thread_name_prefix="smtp-send",
+        )
+        self._local = threading.local()
+        self._clients: List[yagmail.SMTP] = []
+        self._clients_lock = threading.Lock()
+        self.logins = 0
+
+    def _client(self) -> yagmail.SMTP:
+        client = getattr(self._local, "client", None)
+        if client is not None and time.monotonic() - self._local.used_at > 60:
+            # Servers drop idle sessions; check before reusing one that sat unused
+            # (e.g. between scheduled runs)
+            try:
+                client.smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                self._drop_client()
+                client = None
+        if client is None:
+            client = yagmail.SMTP(user=self.user, password=self.password, **self.smtp_options)
+            client.login()
+            self._local.client = client
+            with self._clients_lock:
+                self._clients.append(client)
+                self.logins += 1
+        self._local.used_at = time.monotonic()
+        return client
+
+    def _drop_client(self) -> None:
+        client = getattr(self._local, "client", None)
+        self._local.client = None
+        if client is not None:
+            client.close()
+            with self._clients_lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+
+    def _deliver(self, email: SummaryEmail) -> List[Delivery]:
+        error = "not sent"
+        for attempt in range(1, self.retries + 1):
+            try:
+                client = self._client()
+                for attachment in email.attachments:
+                    if hasattr(attachment, "seek"):
+                        attachment.seek(0)
+                recipients, message = client.prepare_send(
+                    to=list(email.recipients), subject=email.subject, contents=[email.html],
+                    attachments=list(email.attachments) or None,
+                )
+                refused = client.smtp.sendmail(client.user, recipients, message) or {}
+                return [
+                    Delivery(email.team_abbr, r, "failed", attempt, _smtp_error(refused[r]))
+                    if r in refused
+                    else Delivery(email.team_abbr, r, "delivered", attempt)
+                    for r in recipients
+                ]
+            except smtplib.SMTPRecipientsRefused as e:
+                return [
+                    Delivery(email.team_abbr, r, "failed", attempt, _smtp_error(err))
+                    for r, err in e.recipients.items()
+                ]
+            except smtplib.SMTPResponseException as e:
+                error = _smtp_error((e.smtp_code, e.smtp_error))
+                self._drop_client()
+                if e.smtp_code >= 500:
+                    break  # permanent (bad credentials, message rejected)
+            except (smtplib.SMTPException, OSError) as e:
+                error = _smtp_error(e)
+                self._drop_client()
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, 30.0)
+                logger.warning("Email for %s failed (%s/%s): %s; retrying in %.1fs",
+                               email.team_abbr, attempt, self.retries, error, delay)
+                time.sleep(delay)
+        return [Delivery(email.team_abbr, r, "failed", attempt, error) for r in email.recipients]
+
+    def send_all(self, emails: Iterable[SummaryEmail]) -> List[Delivery]:
+        """Send every email and return one Delivery per recipient, in input order."""
+        futures = [self._executor.submit(self._deliver, email) for email in emails]
+        deliveries = [d for future in futures for d in future.result()]
+        failed = [d for d in deliveries if d.status != "delivered"]
+        logger.info("Email batch: %d delivered, %d failed over %d login(s)",
+                    len(deliveries) - len(failed), len(failed), self.logins)
+        for d in failed:
+            logger.error("Email for %s to %s failed: %s", d.team_abbr, d.recipient, d.error)
+        return deliveries
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._clients_lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+
+    def __enter__(self) -> "BatchMailer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def send_summary_email(
+    settings: Settings,
+    team_abbr: str,
+    team_name: str,
+    bundle: Optional["ArtifactBundle"] = None,
+    mailer: Optional[BatchMailer] = None,
+) -> None:
+    """Email the summary with the PDF (and optionally charts) attached.
+
+    Pass a shared ``mailer`` to reuse its SMTP connections across teams; otherwise this call
+    logs in once and sends on its own connection.
+    """
+    sender = settings.email_user
+    app_pass = settings.email_pass
+    if not sender or not app_pass:
+        raise EmailError("Missing EMAIL_USER or EMAIL_PASS; cannot send email.")
+    email = compose_summary_email(settings, team_abbr, team_name, bundle=bundle)
+
+    if mailer is not None:
+        deliveries = mailer.send_all([email])
+        if all(d.status != "delivered" for d in deliveries):
+            raise EmailError(f"Failed to send email: {deliveries[0].error}")
+        return
 
     try:
-        yag = yagmail.SMTP(user=sender, password=app_pass)
-        yag.send(to=recipients, subject=f"🏀 {team_name} – Weekly Report", contents=[html_body], attachments=attachments)
-        logger.info("Email sent successfully to %s", ", ".join(recipients))
+        yag = yagmail.SMTP(user=sender, password=app_pass, **_smtp_options())
+        yag.send(
+            to=list(email.recipients),
+            subject=email.subject,
+            contents=[email.html],
+            attachments=list(email.attachments),
+        )
+        logger.info("Email sent successfully to %s", ", ".join(email.recipients))
     except Exception as err:
         logger.error("Failed to send email: %s", err)
         raise
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .utils import logger
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def accept_encoding(gzip: Optional[bool] = None) -> str:
+    """Accept-Encoding sent to upstreams; gzip/deflate unless HTTP_GZIP=0."""
+    gzip = gzip if gzip is not None else os.getenv("HTTP_GZIP", "1") == "1"
+    return "gzip, deflate" if gzip else "identity"
+
+
+def build_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None,
+    gzip: Optional[bool] = None,
+) -> requests.Session:
+    """Create a keep-alive session with bounded per-host connection pools.
+
+    Optional env vars:
+      - HTTP_POOL_CONNECTIONS (hosts kept pooled, default 4)
+      - HTTP_POOL_MAXSIZE (connections kept per host, default 8)
+      - HTTP_POOL_BLOCK (default 1; wait for a free connection instead of opening extra ones)
+      - HTTP_GZIP (default 1)
+    """
+    if pool_block is None:
+        pool_block = os.getenv("HTTP_POOL_BLOCK", "1") == "1"
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or int(os.getenv("HTTP_POOL_CONNECTIONS", "4")),
+        pool_maxsize=pool_maxsize or int(os.getenv("HTTP_POOL_MAXSIZE", "8")),
+        pool_block=pool_block,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = accept_encoding(gzip)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide pooled session, also installed as nba_api's stats session."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            from nba_api.stats.library.http import NBAStatsHTTP
+
+            _SESSION = build_session()
+            NBAStatsHTTP.set_session(_SESSION)
+            logger.debug("Created pooled HTTP session")
+        return _SESSION
+
+
+def reset_session() -> None:
+    """Close and drop the shared session (the next get_session() builds a fresh one)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            from nba_api.stats.library.http import NBAStatsHTTP
+
+            NBAStatsHTTP.set_session(None)
+            _SESSION.close()
+        _SESSION = None
+
+
+def stats_headers() -> Dict[str, str]:
+    """nba_api's stats headers with Accept-Encoding limited to what requests can decode."""
+    from nba_api.stats.library.http import STATS_HEADERS
+
+    return {**STATS_HEADERS, "Accept-Encoding": accept_encoding()}
+
+
+def _drop_session_in_child() -> None:
+    # Pooled sockets must not be shared with forked workers (e.g. batch process pools)
+    global _SESSION, _SESSION_LOCK
+    _SESSION = None
+    _SESSION_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_drop_session_in_child)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from .locks import file_lock
+from .utils import logger
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when too many jobs are already queued or running."""
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    status: str = "queued"  # queued | running | succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "key": self.key,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded background executor for pipeline runs.
+
+    Jobs submitted with the same key while one is still queued or running are
+    deduplicated: the caller gets the existing job back instead of a new one.
+
+    With ``state_dir`` (the web app passes DATA_DIR) job records are also kept in
+    ``<state_dir>/jobs/<id>.json`` and in-flight keys in ``<state_dir>/jobs/inflight.json`` under
+    a file lock, so every process sharing the directory (e.g. gunicorn workers) answers status
+    polls for any job and deduplicates across processes. A job left queued or running by a
+    process that has exited is reported as failed.
+
+    Optional env vars:
+      - JOB_WORKERS (int, concurrent jobs; default 2)
+      - JOB_MAX_PENDING (int, queued + running jobs before rejecting; default 16)
+      - JOB_HISTORY (int, finished jobs kept for status polling; default 100)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = int(os.getenv("JOB_WORKERS", "2")),
+        max_pending: int = int(os.getenv("JOB_MAX_PENDING", "16")),
+        max_history: int = int(os.getenv("JOB_HISTORY", "100")),
+        state_dir: Optional[str] = None,
+    ):
+        self.max_pending = max_pending
+        self.max_history = max_history
+        self._dir = os.path.join(state_dir, "jobs") if state_dir else None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pipeline-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[str, str] = {}
+
+    def submit(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        with self._lock:
+            existing_id = self._inflight.get(key)
+            if existing_id is not None:
+                logger.info("Job %s already in flight for %s; reusing", existing_id, key)
+                return self._jobs[existing_id]
+            if self._dir is None:
+                job = self._new_job(key, len(self._inflight))
+            else:
+                with file_lock(os.path.join(self._dir, "inflight.lock")):
+                    inflight = self._shared_inflight()
+                    existing = self._load(inflight[key]["id"]) if key in inflight else None
+                    if existing is not None and not existing.done:
+                        logger.info(
+                            "Job %s already in flight for %s in another process; reusing",
+                            existing.id, key,
+                        )
+                        return existing
+                    job = self._new_job(key, len(inflight))
+                    inflight[key] = {"id": job.id, "pid": os.getpid()}
+                    self._write_json("inflight.json", inflight)
+                self._save(job)
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.info("Queued job %s for %s", job.id, key)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self._dir is not None and _JOB_ID.fullmatch(job_id):
+            job = self._load(job_id)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _new_job(self, key: str, pending: int) -> Job:
+        # Caller holds the lock
+        if pending >= self.max_pending:
+            raise JobQueueFull(f"Too many pending jobs ({pending}); try again later.")
+        job = Job(id=uuid.uuid4().hex, key=key)
+        self._jobs[job.id] = job
+        self._inflight[key] = job.id
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args, kwargs) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        self._save(job)
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = "succeeded"
+        except Exception as e:
+            logger.exception("Job %s (%s) failed: %s", job.id, job.key, e)
+            job.error = str(e) or e.__class__.__name__
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            with self._lock:
+                self._inflight.pop(job.key, None)
+            if self._dir is not None:
+                with file_lock(os.path.join(self._dir, "inflight.lock")):
+                    inflight = self._shared_inflight()
+                    if inflight.get(job.key, {}).get("id") == job.id:
+                        del inflight[job.key]
+                        self._write_json("inflight.json", inflight)
+
+    # Shared records (state_dir only)
+    def _write_json(self, name: str, data: Any) -> None:
+        assert self._dir is not None
+        os.makedirs(self._dir, exist_ok=True)
+        path = os.path.join(self._dir, name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, default=str)
+        os.replace(tmp, path)
+
+    def _read_json(self, name: str) -> Any:
+        assert self._dir is not None
+        try:
+            with open(os.path.join(self._dir, name), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _shared_inflight(self) -> Dict[str, Dict[str, Any]]:
+        """In-flight keys across processes, minus entries whose job finished or owner died."""
+        inflight = self._read_json("inflight.json") or {}
+        return {
+            key: entry for key, entry in inflight.items()
+            if _alive(entry.get("pid"))
+            and (entry.get("pid") != os.getpid() or self._inflight.get(key) == entry.get("id"))
+        }
+
+    def _save(self, job: Job) -> None:
+        if self._dir is None:
+            return
+        record = job.to_dict()
+        record["pid"] = os.getpid()
+        if job.done:
+            result = job.result
+            record["result"] = result.to_dict() if hasattr(result, "to_dict") else result
+        self._write_json(f"{job.id}.json", record)
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        record = self._read_json(f"{job_id}.json")
+        if not record:
+            return None
+        pid = record.pop("pid", None)
+        job = Job(**{k: v for k, v in record.items() if k in Job.__dataclass_fields__})
+        if not job.done and not _alive(pid):
+            job.status, job.error = "failed", "The worker running this job exited."
+        return job
+
+    def _prune(self) -> None:
+        # Drop the oldest finished jobs beyond the history limit; caller holds the lock
+        excess = len(self._jobs) - self.max_history
+        if excess > 0:
+            for job_id in [j.id for j in self._jobs.values() if j.done][:excess]:
+                del self._jobs[job_id]
+        if self._dir is None:
+            return
+        records = sorted(
+            (e for e in os.scandir(self._dir) if _JOB_ID.fullmatch(e.name[:-len(".json")])),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        # Queued or running jobs, here or in another process, are still being polled
+        active = set(self._inflight.values())
+        active |= {e.get("id") for e in self._shared_inflight().values()}
+        for entry in records[:max(0, len(records) - self.max_history)]:
+            if entry.name[:-len(".json")] not in active:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists but owned by another user
+    return True
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None  # type: ignore[assignment]
+
+
+# One thread lock per lock file: flock() does not exclude threads sharing a process reliably
+_THREAD_LOCKS: Dict[str, threading.Lock] = {}
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    with _THREAD_LOCKS_GUARD:
+        return _THREAD_LOCKS.setdefault(path, threading.Lock())
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on ``path`` across threads and processes (advisory ``flock`` on POSIX)."""
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _thread_lock(path):
+        if fcntl is None:
+            yield
+            return
+        with open(path, "a+") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def deployment_id() -> str:
+    """Identifier of the current deployment.
+
+    DEPLOY_ID (set once by gunicorn.conf.py), else this process.
+    """
+    return os.getenv("DEPLOY_ID") or f"pid-{os.getpid()}"
+
+
+def run_once(task: str, fn: Callable[[], Any], state_dir: str) -> bool:
+    """Run ``fn`` once per deployment across every process sharing ``state_dir``.
+
+    The first caller runs ``fn`` under a file lock and records the deployment id in
+    ``<state_dir>/.deploy/<task>.done``; concurrent callers wait for it and then skip. A failing
+    ``fn`` leaves no marker, so the next caller retries. Returns True if this call ran ``fn``.
+    """
+    marker = os.path.join(state_dir, ".deploy", f"{task}.done")
+    current = deployment_id()
+    with file_lock(f"{marker}.lock"):
+        try:
+            with open(marker, "r", encoding="utf-8") as fh:
+                if fh.read().strip() == current:
+                    return False
+        except OSError:
+            pass
+        fn()
+        with open(marker, "w", encoding="utf-8") as fh:
+            fh.write(current)
+    return True
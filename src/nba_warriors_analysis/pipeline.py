@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from dotenv import set_key
+
+from .analysis import TeamContext, fetch_games
+from .artifacts import ArtifactBundle
+from .emailer import BatchMailer, send_summary_email
+from .plotting import render_charts
+from .reporting import ReportBuilder
+from . import tracing
+from .summary import overall_summary, summarize
+from .utils import Settings, logger
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    team_abbr: str
+    team_name: str
+    summary_path: Optional[str]
+    games_path: Optional[str]
+    report_path: Optional[str]
+    trend_path: Optional[str] = None
+    emailed: bool = False
+    run_report_path: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None  # wall seconds per stage
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def build_artifacts(
+    ctx: TeamContext, settings: Settings, df: pd.DataFrame, include_trend: bool = False
+) -> ArtifactBundle:
+    """Compute the summary, charts and PDF for ``df`` entirely in memory."""
+    # One grouped aggregation yields the all-time summary plus season/home-away/last-N splits
+    with tracing.stage("summary", rows=len(df)):
+        breakdown = summarize(df)
+        bundle = ArtifactBundle(
+            ctx.abbr, ctx.name, overall_summary(breakdown), breakdown=breakdown, games=df
+        )
+    with tracing.stage("charts"):
+        bundle.charts, bundle.chart_entries = render_charts(
+            df, ctx.abbr, settings, team_name=ctx.name if include_trend else None
+        )
+    with tracing.stage("pdf"):
+        # An unchanged report already on disk is reused instead of rendered again
+        report_path = os.path.join(settings.reports_dir, bundle.report_filename)
+        bundle.pdf = ReportBuilder(settings).build_pdf_bytes(bundle, reuse_path=report_path)
+    return bundle
+
+
+def run_team_pipeline(
+    ctx: TeamContext,
+    settings: Settings,
+    send_email: bool = False,
+    include_trend: bool = False,
+    update_env: bool = True,
+    games: Optional[pd.DataFrame] = None,
+    persist: Optional[bool] = None,
+    mailer: Optional[BatchMailer] = None,
+    stale_while_revalidate: bool = False,
+) -> PipelineResult:
+    """Run fetch → summary → charts → PDF (→ email) for one team and return the artifact paths.
+
+    Stages exchange an in-memory ArtifactBundle; writing it to data/, plots/ and reports/ is the
+    final step unless ``persist`` is False (default: PIPELINE_PERSIST env, 1), in which case no
+    paths are returned. ``update_env`` writes LAST_TEAM_ABBR/LAST_TEAM_NAME to .env for the
+    legacy scripts; batch runs disable it since concurrent workers would race on the file. Pass
+    ``games`` to skip the fetch when the caller already has the team's games (e.g. from a
+    league-wide fetch). A shared ``mailer`` lets many runs reuse the same SMTP connections.
+    ``stale_while_revalidate`` is passed to fetch_games; only long-lived processes should set it.
+
+    Each stage is timed (see tracing.RunTrace); the timings are logged, returned and, when
+    persisting, written to ``<REPORTS_DIR>/<ABBR>_run.json`` unless TRACE_REPORT=0.
+    """
+    logger.info("Pipeline run: %s (%s)", ctx.name, ctx.abbr)
+    persist = persist if persist is not None else os.getenv("PIPELINE_PERSIST", "1") == "1"
+
+    trace = tracing.RunTrace(ctx.abbr)
+    report_path = None
+    try:
+        with tracing.activate(trace):
+            with tracing.stage("fetch", prefetched=games is not None) as record:
+                if games is not None:
+                    df = games
+                else:
+                    df = fetch_games(ctx.id, stale_while_revalidate=stale_while_revalidate)
+                record["rows"] = len(df)
+            bundle = build_artifacts(ctx, settings, df, include_trend=include_trend)
+            with tracing.stage("write", persist=persist):
+                paths = bundle.write(settings) if persist else {}
+
+            # Update .env context for downstream compatibility
+            if update_env:
+                set_key(".env", "LAST_TEAM_ABBR", ctx.abbr)
+                set_key(".env", "LAST_TEAM_NAME", ctx.name)
+
+            # Optionally send email
+            if send_email:
+                with tracing.stage("email"):
+                    send_summary_email(settings, ctx.abbr, ctx.name, bundle=bundle, mailer=mailer)
+    finally:
+        # Written on failure too, so a slow or failing run can be diagnosed from the report
+        if persist and os.getenv("TRACE_REPORT", "1") == "1":
+            try:
+                report_path = trace.write(
+                    os.path.join(settings.reports_dir, f"{ctx.abbr}_run.json")
+                )
+            except OSError as e:
+                logger.warning("Could not write run report for %s: %s", ctx.abbr, e)
+
+    return PipelineResult(
+        team_abbr=ctx.abbr,
+        team_name=ctx.name,
+        summary_path=paths.get("summary"),
+        games_path=paths.get("games"),
+        report_path=paths.get("report"),
+        trend_path=paths.get("trend"),
+        emailed=send_email,
+        run_report_path=report_path,
+        timings={r["stage"]: r["wall_s"] for r in trace.stages},
+    )
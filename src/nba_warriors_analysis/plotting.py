@@ -1,20 +1,28 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import os
-from typing import List
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 
+from . import tracing
+from .locks import file_lock
 from .utils import Settings, extract_opponent, logger
 
 
 sns.set_style("whitegrid")
-plt.rcParams["figure.autolayout"] = True
+matplotlib.rcParams["figure.autolayout"] = True
 
 
 def ensure_dir(path: str):
@@ -31,99 +39,366 @@ def radar(ax, stats: List[float], labels: List[str], title="Radar"):
     ax.set_title(title, y=1.08)
 
 
-def generate_all_charts(df: pd.DataFrame, abbr: str, settings: Settings) -> List[str]:
-    ensure_dir(settings.plots_dir)
-    saved: List[str] = []
+# Chart builders: each takes the prepared games frame and returns a standalone Figure.
+# They never touch pyplot's global state, so they are safe in threads and worker processes.
+
+def _line_points(df: pd.DataFrame) -> Figure:
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.plot(df["GAME_DATE"], df["PTS"], label="Points", color="navy")
+    ax.set_title("Points per Game")
+    ax.set_ylabel("PTS")
+    return fig
+
+
+def _bar_winloss(df: pd.DataFrame) -> Figure:
+    fig = Figure()
+    ax = fig.subplots()
+    df["WL"].value_counts().plot(kind="bar", color=["green", "red"], ax=ax)  # type: ignore
+    ax.set_title("Wins vs Losses")
+    ax.set_ylabel("Count")
+    return fig
+
+
+def _area_3pct(df: pd.DataFrame) -> Figure:
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.fill_between(df["GAME_DATE"], df["FG3_PCT"] * 100, color="skyblue", alpha=0.5)
+    ax.set_title("3-Point % Over Time")
+    ax.set_ylabel("3P %")
+    return fig
 
-    df = df[df["WL"].isin(["W", "L"])].copy()
-    if "OPPONENT" not in df.columns:
-        df["OPPONENT"] = df["MATCHUP"].apply(extract_opponent)
 
-    # 1 Line Points
-    plt.figure(figsize=(10, 4))
-    plt.plot(df["GAME_DATE"], df["PTS"], label="Points", color="navy")
-    plt.title("Points per Game")
-    plt.ylabel("PTS")
-    out = os.path.join(settings.plots_dir, f"{abbr}_line_points.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 2 Bar Win/Loss
-    df["WL"].value_counts().plot(kind="bar", color=["green", "red"])  # type: ignore
-    plt.title("Wins vs Losses")
-    plt.ylabel("Count")
-    out = os.path.join(settings.plots_dir, f"{abbr}_bar_winloss.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 3 Area 3P%
-    plt.figure(figsize=(10, 4))
-    plt.fill_between(df["GAME_DATE"], df["FG3_PCT"] * 100, color="skyblue", alpha=0.5)
-    plt.title("3-Point % Over Time")
-    plt.ylabel("3P %")
-    out = os.path.join(settings.plots_dir, f"{abbr}_area_3pct.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 4 Histogram Points
-    plt.hist(df["PTS"], bins=12, color="purple", edgecolor="black")
-    plt.title("Points Distribution")
-    plt.xlabel("PTS")
-    out = os.path.join(settings.plots_dir, f"{abbr}_hist_points.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 5 HBar Top10
+def _hist_points(df: pd.DataFrame) -> Figure:
+    fig = Figure()
+    ax = fig.subplots()
+    ax.hist(df["PTS"], bins=12, color="purple", edgecolor="black")
+    ax.set_title("Points Distribution")
+    ax.set_xlabel("PTS")
+    return fig
+
+
+def _hbar_top10(df: pd.DataFrame) -> Figure:
+    fig = Figure()
+    ax = fig.subplots()
     top10 = df.nlargest(10, "PTS").sort_values("PTS")
-    plt.barh(top10["GAME_DATE"].dt.strftime("%Y-%m-%d"), top10["PTS"], color="orange")
-    plt.title("Top 10 Highest-Scoring Games")
-    plt.xlabel("PTS")
-    out = os.path.join(settings.plots_dir, f"{abbr}_hbar_top10.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 6 Scatter PTS vs REB
-    plt.scatter(df["REB"], df["PTS"], alpha=0.7)
-    plt.xlabel("Rebounds")
-    plt.ylabel("Points")
-    plt.title("Points vs Rebounds")
-    out = os.path.join(settings.plots_dir, f"{abbr}_scatter_pts_reb.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 7 Dot WL timeline
+    ax.barh(top10["GAME_DATE"].dt.strftime("%Y-%m-%d"), top10["PTS"], color="orange")
+    ax.set_title("Top 10 Highest-Scoring Games")
+    ax.set_xlabel("PTS")
+    return fig
+
+
+def _scatter_pts_reb(df: pd.DataFrame) -> Figure:
+    fig = Figure()
+    ax = fig.subplots()
+    ax.scatter(df["REB"], df["PTS"], alpha=0.7)
+    ax.set_xlabel("Rebounds")
+    ax.set_ylabel("Points")
+    ax.set_title("Points vs Rebounds")
+    return fig
+
+
+def _dot_wl(df: pd.DataFrame) -> Figure:
+    fig = Figure()
+    ax = fig.subplots()
     colors = df["WL"].map({"W": "green", "L": "red"})
-    plt.scatter(df["GAME_DATE"], df["PTS"], c=colors)
-    plt.title("Game Results Over Time")
-    plt.ylabel("PTS")
-    out = os.path.join(settings.plots_dir, f"{abbr}_dot_wl.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 8 Box Rebounds by Opponent
-    plt.figure(figsize=(12, 5))
-    sns.boxplot(x="OPPONENT", y="REB", data=df)
-    plt.xticks(rotation=90)
-    plt.title("Rebounds by Opponent")
-    out = os.path.join(settings.plots_dir, f"{abbr}_box_reb_opp.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
-
-    # 9 Radar FG% vs 3P%
-    fig = plt.figure(figsize=(6, 6))
+    ax.scatter(df["GAME_DATE"], df["PTS"], c=colors)
+    ax.set_title("Game Results Over Time")
+    ax.set_ylabel("PTS")
+    return fig
+
+
+def _box_reb_opp(df: pd.DataFrame) -> Figure:
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots()
+    sns.boxplot(x="OPPONENT", y="REB", data=df, ax=ax)
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_title("Rebounds by Opponent")
+    return fig
+
+
+def _radar_shooting(df: pd.DataFrame) -> Figure:
+    fig = Figure(figsize=(6, 6))
     ax = fig.add_subplot(111, polar=True)
-    radar(ax, [df["FG_PCT"].mean() * 100, df["FG3_PCT"].mean() * 100], ["FG %", "3P %"], title="Shooting Accuracy")
-    out = os.path.join(settings.plots_dir, f"{abbr}_radar_shooting.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
+    shooting = [df["FG_PCT"].mean() * 100, df["FG3_PCT"].mean() * 100]
+    radar(ax, shooting, ["FG %", "3P %"], title="Shooting Accuracy")
+    return fig
 
-    # 10 Pie Win%
+
+def _pie_winpct(df: pd.DataFrame) -> Figure:
+    fig = Figure()
+    ax = fig.subplots()
     wins = int((df["WL"] == "W").sum())
     losses = int((df["WL"] == "L").sum())
-    plt.pie([wins, losses], labels=["Wins", "Losses"], autopct="%1.1f%%", colors=["green", "red"], startangle=90)
-    plt.title("Win Percentage")
-    out = os.path.join(settings.plots_dir, f"{abbr}_pie_winpct.png")
-    plt.savefig(out)
-    plt.close(); saved.append(out)
+    ax.pie(
+        [wins, losses], labels=["Wins", "Losses"], autopct="%1.1f%%", colors=["green", "red"],
+        startangle=90,
+    )
+    ax.set_title("Win Percentage")
+    return fig
+
+
+# (file suffix, builder) in the order generate_all_charts returns them
+CHART_BUILDERS: List[Tuple[str, Callable[[pd.DataFrame], Figure]]] = [
+    ("line_points", _line_points),
+    ("bar_winloss", _bar_winloss),
+    ("area_3pct", _area_3pct),
+    ("hist_points", _hist_points),
+    ("hbar_top10", _hbar_top10),
+    ("scatter_pts_reb", _scatter_pts_reb),
+    ("dot_wl", _dot_wl),
+    ("box_reb_opp", _box_reb_opp),
+    ("radar_shooting", _radar_shooting),
+    ("pie_winpct", _pie_winpct),
+]
+_BUILDERS_BY_NAME: Dict[str, Callable[[pd.DataFrame], Figure]] = dict(CHART_BUILDERS)
+
+# Input columns each chart reads; only these feed its cache key
+CHART_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "line_points": ("GAME_DATE", "PTS"),
+    "bar_winloss": ("WL",),
+    "area_3pct": ("GAME_DATE", "FG3_PCT"),
+    "hist_points": ("PTS",),
+    "hbar_top10": ("GAME_DATE", "PTS"),
+    "scatter_pts_reb": ("REB", "PTS"),
+    "dot_wl": ("GAME_DATE", "PTS", "WL"),
+    "box_reb_opp": ("OPPONENT", "REB"),
+    "radar_shooting": ("FG_PCT", "FG3_PCT"),
+    "pie_winpct": ("WL",),
+    "trend": ("GAME_DATE", "PTS"),
+}
+
+# Bump when a builder's drawing code changes so cached PNGs are re-rendered
+CHART_CACHE_VERSION = 1
+
+
+def chart_key(
+    name: str,
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Content hash of a chart's input columns, parameters and plotting library versions."""
+    digest = hashlib.sha256()
+    header = {
+        "chart": name,
+        "cache_version": CHART_CACHE_VERSION,
+        "params": params or {},
+        "versions": [matplotlib.__version__, sns.__version__, pd.__version__, np.__version__],
+        "columns": list(columns),
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _chart_cache_enabled(use_cache: Optional[bool]) -> bool:
+    return use_cache if use_cache is not None else os.getenv("CHART_CACHE", "1") == "1"
+
+
+def _manifest_path(plots_dir: str, abbr: str) -> str:
+    return os.path.join(plots_dir, f"{abbr}_charts.json")
+
+
+def load_chart_manifest(plots_dir: str, abbr: str) -> Dict[str, Any]:
+    try:
+        with open(_manifest_path(plots_dir, abbr), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"charts": {}}
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    # Concurrent runs for the same team (e.g. two web jobs) never leave a torn file behind
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _update_chart_manifest(plots_dir: str, abbr: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    path = _manifest_path(plots_dir, abbr)
+    with file_lock(os.path.join(plots_dir, f".{abbr}_charts.lock")):
+        manifest = load_chart_manifest(plots_dir, abbr)
+        charts = manifest.setdefault("charts", {})
+        charts.update(entries)
+        # Each entry's "hit" reflects the most recent render of that chart
+        manifest["last_run"] = {
+            "hits": sorted(n for n, e in charts.items() if e.get("hit")),
+            "misses": sorted(n for n, e in charts.items() if not e.get("hit")),
+        }
+        _atomic_write(path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+
+def _is_cache_hit(manifest: Dict[str, Any], name: str, key: str, out: str) -> bool:
+    entry = manifest.get("charts", {}).get(name)
+    return bool(entry) and entry.get("key") == key and os.path.isfile(out)
+
+
+def chart_dpi() -> int:
+    """Resolution charts are saved at.
+
+    Optional env vars:
+      - CHART_DPI (default 100)
+    """
+    return int(os.getenv("CHART_DPI", "100"))
+
+
+def render_chart_bytes(
+    name: str, df: pd.DataFrame, dpi: Optional[int] = None, team_name: str = ""
+) -> bytes:
+    """Build one chart by name and return it as PNG bytes; usable from any thread or process."""
+    fig = _trend(df, team_name) if name == "trend" else _BUILDERS_BY_NAME[name](df)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi or chart_dpi())
+    return buf.getvalue()
+
+
+def _trend(df: pd.DataFrame, team_name: str) -> Figure:
+    rolling = df["PTS"].rolling(5).mean()
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.plot(df["GAME_DATE"], df["PTS"], label="Points", alpha=0.4)
+    ax.plot(df["GAME_DATE"], rolling, label="Rolling Avg (5)", linewidth=2)
+    ax.set_title(f"{team_name} Scoring Trend")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Points")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    # Runs in chart worker processes too, so the timings are the renderer's own
+    wall, cpu = time.perf_counter(), time.thread_time()
+    result = fn(*args)
+    return result, time.perf_counter() - wall, time.thread_time() - cpu
+
+
+def _record_timings(
+    trace: Optional["tracing.RunTrace"], name: str, wall_s: float, cpu_s: float
+) -> None:
+    if trace is not None:
+        trace.record_chart(name, wall_s, cpu_s)
+
+
+def _chart_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[df["WL"].isin(["W", "L"])].copy()
+    if "OPPONENT" not in df.columns:
+        df["OPPONENT"] = df["MATCHUP"].apply(extract_opponent)
+    return df
+
+
+def render_charts(
+    df: pd.DataFrame,
+    abbr: str,
+    settings: Settings,
+    team_name: Optional[str] = None,
+    workers: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+) -> Tuple[Dict[str, bytes], Dict[str, Dict[str, Any]]]:
+    """Render the ten standard charts (plus the trend chart when ``team_name`` is given) in memory.
+
+    Returns ``({name: png_bytes}, cache_entries)`` in CHART_BUILDERS order, trend first. With
+    ``workers`` > 1 (default: CHART_WORKERS env, 1) charts are rendered in a process pool.
+    Unless disabled (``use_cache=False`` or CHART_CACHE=0), each chart is keyed by a hash of its
+    input columns, parameters and library versions; when the key matches the one recorded in
+    ``<PLOTS_DIR>/<ABBR>_charts.json`` and the PNG exists, its bytes are loaded instead of
+    rendering. Nothing is written here: save_charts() persists the charts and the manifest.
+    Charts are rendered at CHART_DPI (default 100).
+    """
+    workers = workers if workers is not None else int(os.getenv("CHART_WORKERS", "1"))
+    dpi = chart_dpi()
+    chart_df = _chart_frame(df)
+
+    specs: List[Tuple[str, pd.DataFrame, Dict[str, Any]]] = []
+    if team_name is not None:
+        specs.append(("trend", df, {"team_name": team_name, "dpi": dpi}))
+    specs.extend((name, chart_df, {"dpi": dpi}) for name, _ in CHART_BUILDERS)
+
+    charts: Dict[str, bytes] = {}
+    entries: Dict[str, Dict[str, Any]] = {}
+    cached = _chart_cache_enabled(use_cache)
+    manifest = load_chart_manifest(settings.plots_dir, abbr) if cached else {"charts": {}}
+    trace = tracing.current()
+    jobs = []
+    for name, frame, params in specs:
+        out = os.path.join(settings.plots_dir, f"{abbr}_{name}.png")
+        if cached:
+            key = chart_key(name, frame, CHART_COLUMNS[name], params=params)
+            hit = _is_cache_hit(manifest, name, key, out)
+            entries[name] = {"key": key, "path": out, "hit": hit}
+            if hit:
+                started = time.perf_counter()
+                try:
+                    with open(out, "rb") as fh:
+                        charts[name] = fh.read()
+                except OSError:  # removed since the manifest was read: render it after all
+                    entries[name]["hit"] = False
+                else:
+                    if trace is not None:
+                        trace.record_chart(name, time.perf_counter() - started, cached=True)
+                    continue
+        charts[name] = b""  # keeps the CHART_BUILDERS order
+        jobs.append((name, frame))
+    if cached:
+        logger.info(
+            "Chart cache for %s: %d hit(s), %d to render", abbr, len(specs) - len(jobs), len(jobs)
+        )
+
+    title = team_name or ""
+    if workers > 1 and len(jobs) > 1:
+        logger.debug("Rendering %d charts across %d processes", len(jobs), workers)
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {
+                name: pool.submit(_timed, render_chart_bytes, name, frame, dpi, title)
+                for name, frame in jobs
+            }
+            for name, fut in futures.items():
+                charts[name], wall_s, cpu_s = fut.result()
+                _record_timings(trace, name, wall_s, cpu_s)
+    else:
+        for name, frame in jobs:
+            charts[name], wall_s, cpu_s = _timed(render_chart_bytes, name, frame, dpi, title)
+            _record_timings(trace, name, wall_s, cpu_s)
+    return charts, entries
+
+
+def save_charts(
+    charts: Dict[str, bytes], entries: Dict[str, Dict[str, Any]], abbr: str, settings: Settings
+) -> List[str]:
+    """Write rendered charts to ``<PLOTS_DIR>/<ABBR>_<name>.png`` and update the manifest.
+
+    Cache hits are not rewritten. PNGs and the manifest are replaced atomically and the manifest
+    is updated under a file lock, so concurrent runs for the same team cannot corrupt either.
+    """
+    ensure_dir(settings.plots_dir)
+    paths = []
+    for name, data in charts.items():
+        out = os.path.join(settings.plots_dir, f"{abbr}_{name}.png")
+        if not entries.get(name, {}).get("hit") or not os.path.isfile(out):
+            _atomic_write(out, data)
+        paths.append(out)
+    if entries:
+        _update_chart_manifest(settings.plots_dir, abbr, entries)
+    return paths
+
+
+def generate_all_charts(
+    df: pd.DataFrame,
+    abbr: str,
+    settings: Settings,
+    workers: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+) -> List[str]:
+    """Render the ten standard charts to ``<PLOTS_DIR>/<ABBR>_<name>.png`` and return their paths.
 
-    return saved
+    A thin disk wrapper around render_charts() and save_charts(); paths are in CHART_BUILDERS order.
+    """
+    charts, entries = render_charts(df, abbr, settings, workers=workers, use_cache=use_cache)
+    return save_charts(charts, entries, abbr, settings)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from nba_api.stats.static import teams
+
+
+@dataclass(frozen=True)
+class TeamContext:
+    id: int
+    abbr: str
+    name: str
+    nickname: str
+
+
+class TeamRegistry:
+    """Immutable team index with O(1) lookup by id, abbreviation and nickname.
+
+    Build it once per process through ``get_registry()``; ``teams_sorted`` and ``contexts``
+    are shared and must not be mutated by callers.
+    """
+
+    def __init__(self, team_dicts: Sequence[dict]):
+        self.teams_sorted: List[dict] = sorted(
+            team_dicts, key=lambda x: x["full_name"]  # type: ignore
+        )
+        self.contexts: List[TeamContext] = [
+            TeamContext(
+                id=t["id"], abbr=t["abbreviation"], name=t["full_name"], nickname=t["nickname"]
+            )
+            for t in self.teams_sorted
+        ]
+        self._by_id: Dict[int, TeamContext] = {c.id: c for c in self.contexts}
+        self._by_abbr: Dict[str, TeamContext] = {c.abbr.lower(): c for c in self.contexts}
+        self._by_nickname: Dict[str, TeamContext] = {c.nickname.lower(): c for c in self.contexts}
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    def by_id(self, team_id: int) -> Optional[TeamContext]:
+        return self._by_id.get(int(team_id))
+
+    def by_abbr(self, abbr: Optional[str]) -> Optional[TeamContext]:
+        return self._by_abbr.get((abbr or "").strip().lower())
+
+    def by_nickname(self, nickname: Optional[str]) -> Optional[TeamContext]:
+        return self._by_nickname.get((nickname or "").strip().lower())
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> TeamRegistry:
+    return TeamRegistry(teams.get_teams())
@@ -1,27 +1,138 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import os
+import threading
 from datetime import datetime
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import pandas as pd
 from fpdf import FPDF
 
+from .assets import AssetProfile, optimize_bytes, optimize_image, pdf_profile
+from .locks import file_lock
 from .utils import Settings, logger
 
+if TYPE_CHECKING:
+    from .artifacts import ArtifactBundle
+
+
+# Bump when the page layout changes so cached reports are rebuilt
+REPORT_CACHE_VERSION = 1
+
+
+def _file_signature(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+def report_lock(path: str):
+    """Exclusive lock guarding a report and its ``.meta.json`` (a hidden file beside the report)."""
+    return file_lock(os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.lock"))
+
+
+def write_report_meta(path: str, meta: Dict[str, Any]) -> None:
+    """Atomically write the inputs record ``<report>.meta.json`` for ``path``."""
+    meta_file = f"{path}.meta.json"
+    tmp = f"{meta_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, meta_file)
+
+
+def _embed_image(
+    pdf: FPDF, source: Union[str, bytes], profile: AssetProfile, **kwargs: Any
+) -> None:
+    """Place a chart (file path or PNG bytes) on the current page, re-encoded for ``profile``.
+
+    Goes through ``pdf.image()`` only: fpdf2 embeds an image once per document and reuses it for
+    later placements under the same name (the file path, or a hash of in-memory data).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        pdf.image(io.BytesIO(optimize_bytes(bytes(source), profile)), **kwargs)
+    else:
+        pdf.image(optimize_image(source, profile), **kwargs)
+
 
 class ReportBuilder:
-    def __init__(self, settings: Settings):
+    """Assemble the weekly PDF report from the summary CSVs and chart PNGs.
+
+    Charts are re-encoded for the PDF first (see ``assets.pdf_profile``), and the whole build is
+    skipped when the output's recorded inputs (``<report>.meta.json``) match. Reuse is all or
+    nothing: fpdf2 has no public API to splice cached pages into a new document, so a report
+    whose inputs changed is rebuilt in full.
+
+    Optional env vars:
+      - REPORT_CACHE (default 1; 0 always rebuilds the PDF)
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        use_cache: Optional[bool] = None,
+        profile: Optional[AssetProfile] = None,
+    ):
         self.settings = settings
+        self.profile = profile or pdf_profile()
+        if use_cache is None:
+            use_cache = os.getenv("REPORT_CACHE", "1") == "1"
+        self.use_cache = use_cache
+        self._font_family: Optional[str] = None
+
+    def _set_font(self, pdf: FPDF, style: str, size: int) -> None:
+        # Resolve the font family on first use instead of retrying Arial for every cell
+        if self._font_family is None:
+            try:
+                pdf.set_font("Arial", style, size)
+                self._font_family = "Arial"
+                return
+            except Exception:
+                self._font_family = "helvetica"
+        pdf.set_font(self._font_family, style, size)
+
+    def _bundle_digest(self, bundle: "ArtifactBundle", date_line: str) -> str:
+        digest = hashlib.sha256()
+        header = [REPORT_CACHE_VERSION, bundle.team_name, date_line, repr(self.profile)]
+        digest.update(json.dumps(header).encode("utf-8"))
+        digest.update(json.dumps(bundle.summary, sort_keys=True, default=str).encode("utf-8"))
+        if bundle.breakdown is not None:
+            digest.update(bundle.breakdown.to_csv(index=False).encode("utf-8"))
+        for name, data in sorted(bundle.charts.items()):
+            # The chart cache key describes the chart's inputs; hash the PNG when caching is off
+            key = bundle.chart_entries.get(name, {}).get("key") or hashlib.sha256(data).hexdigest()
+            digest.update(json.dumps([name, key]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _inputs_digest(self, team_name: str, date_line: str, inputs: List[str]) -> str:
+        digest = hashlib.sha256()
+        header = [REPORT_CACHE_VERSION, team_name, date_line, repr(self.profile)]
+        digest.update(json.dumps(header).encode("utf-8"))
+        for path in inputs:
+            digest.update(json.dumps(_file_signature(path)).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_report_meta(output_path: str) -> Dict[str, Any]:
+        try:
+            with open(f"{output_path}.meta.json", "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
 
     def build_pdf(self, team_abbr: str | None = None, team_name: str | None = None,
                   summary_file: str | None = None, plots_dir: str | None = None,
-                  output_path: str | None = None) -> str | None:
+                  output_path: str | None = None, breakdown_file: str | None = None) -> str | None:
         team_abbr = team_abbr or self.settings.last_team_abbr
         team_name = team_name or self.settings.last_team_name
         plots_dir = plots_dir or self.settings.plots_dir
-        output_path = output_path or os.path.join(self.settings.reports_dir, f"{team_abbr}_report.pdf")
-        summary_file = summary_file or os.path.join(self.settings.data_dir, f"{team_abbr}_summary.csv")
+        reports_dir, data_dir = self.settings.reports_dir, self.settings.data_dir
+        output_path = output_path or os.path.join(reports_dir, f"{team_abbr}_report.pdf")
+        summary_file = summary_file or os.path.join(data_dir, f"{team_abbr}_summary.csv")
+        breakdown_file = breakdown_file or os.path.join(
+            data_dir, f"{team_abbr}_summary_breakdown.csv"
+        )
 
         # Load summary
         try:
@@ -43,62 +154,125 @@ class ReportBuilder:
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
+        date_line = datetime.now().strftime("Date: %B %d, %Y")
+        has_breakdown = os.path.exists(breakdown_file)
+        inputs = [summary_file] + ([breakdown_file] if has_breakdown else []) + graph_files
+        digest = self._inputs_digest(team_name, date_line, inputs)
+        if (
+            self.use_cache
+            and os.path.isfile(output_path)
+            and self._read_report_meta(output_path).get("inputs") == digest
+        ):
+            logger.info("PDF report inputs unchanged; reusing %s", output_path)
+            return output_path
+
+        breakdown = pd.read_csv(breakdown_file, dtype={"group": str}) if has_breakdown else None
+        charts = [(os.path.basename(g), g) for g in graph_files]
+        pdf = self._render(team_name, date_line, summary.items(), breakdown, charts)
+        pdf.output(output_path)
+        write_report_meta(output_path, {"inputs": digest, "charts": len(graph_files)})
+        logger.info("PDF report generated with %d charts → %s", len(graph_files), output_path)
+        return output_path
+
+    def build_pdf_bytes(self, bundle: "ArtifactBundle", reuse_path: Optional[str] = None) -> bytes:
+        """Build the report straight from an in-memory bundle, without touching data/ or plots/.
+
+        The digest of the bundle's summary, breakdown and chart keys is stored in
+        ``bundle.pdf_inputs`` (ArtifactBundle.write() records it in ``<report>.meta.json``). When
+        ``reuse_path`` holds a report recorded with the same digest, its bytes are returned instead
+        of rendering.
+        """
+        date_line = datetime.now().strftime("Date: %B %d, %Y")
+        charts = sorted(bundle.chart_files().items())
+        if not charts:
+            raise ValueError(f"No charts in the artifact bundle for {bundle.team_abbr}")
+        bundle.pdf_inputs = self._bundle_digest(bundle, date_line)
+        if self.use_cache and reuse_path and os.path.isfile(reuse_path):
+            with report_lock(reuse_path):
+                if self._read_report_meta(reuse_path).get("inputs") == bundle.pdf_inputs:
+                    try:
+                        with open(reuse_path, "rb") as fh:
+                            data = fh.read()
+                    except OSError:
+                        pass
+                    else:
+                        logger.info("PDF report inputs unchanged; reusing %s", reuse_path)
+                        return data
+        pdf = self._render(
+            bundle.team_name, date_line, bundle.summary.items(), bundle.breakdown, charts
+        )
+        data = bytes(pdf.output())
+        logger.info("PDF report built in memory with %d charts (%d bytes)", len(charts), len(data))
+        return data
+
+    def _render(
+        self,
+        team_name: str,
+        date_line: str,
+        summary_items: Iterable[Tuple[str, Any]],
+        breakdown: Optional[pd.DataFrame],
+        charts: List[Tuple[str, Union[str, bytes]]],
+    ) -> FPDF:
+        """Lay out the report; ``charts`` are (label, file path or PNG bytes) in page order."""
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=15)
         pdf.set_author("N H Padma Priya")
         pdf.set_title(f"{team_name} Weekly Report")
         pdf.add_page()
-        try:
-            pdf.set_font("Arial", "B", 20)
-        except Exception:
-            pdf.set_font("helvetica", "B", 20)
+        self._set_font(pdf, "B", 20)
         pdf.set_text_color(0, 102, 204)
-        pdf.cell(0, 10, f"{team_name} Weekly Report", ln=True, align="C")
+        pdf.cell(0, 10, f"{team_name} Weekly Report", new_x="LMARGIN", new_y="NEXT", align="C")
 
-        try:
-            pdf.set_font("Arial", "", 12)
-        except Exception:
-            pdf.set_font("helvetica", "", 12)
+        self._set_font(pdf, "", 12)
         pdf.set_text_color(100, 100, 100)
-        pdf.cell(0, 10, datetime.now().strftime("Date: %B %d, %Y"), ln=True, align="C")
+        pdf.cell(0, 10, date_line, new_x="LMARGIN", new_y="NEXT", align="C")
         pdf.ln(8)
 
         pdf.set_text_color(0, 0, 0)
-        for key, value in summary.items():
-            try:
-                pdf.set_font("Arial", "B", 12)
-            except Exception:
-                pdf.set_font("helvetica", "B", 12)
-            pdf.cell(50, 10, f"{key}:", ln=0)
-            try:
-                pdf.set_font("Arial", "", 12)
-            except Exception:
-                pdf.set_font("helvetica", "", 12)
-            pdf.cell(0, 10, str(value), ln=1)
+        for key, value in summary_items:
+            self._set_font(pdf, "B", 12)
+            pdf.cell(50, 10, f"{key}:")
+            self._set_font(pdf, "", 12)
+            pdf.cell(0, 10, str(value), new_x="LMARGIN", new_y="NEXT")
 
         pdf.ln(5)
 
-        first_chart = next((g for g in graph_files if "trend" in g.lower()), graph_files[0])
-        if os.path.exists(first_chart):
-            try:
-                pdf.set_font("Arial", "B", 12)
-            except Exception:
-                pdf.set_font("helvetica", "B", 12)
-            pdf.cell(0, 10, "Scoring Trend Chart:", ln=True)
-            pdf.image(first_chart, x=10, w=190)
+        # Optional per-season / home-away / last-N breakdown table from summary.summarize()
+        if breakdown is not None:
+            self._breakdown_page(pdf, breakdown)
+
+        first_label, first_source = next((c for c in charts if "trend" in c[0].lower()), charts[0])
+        self._set_font(pdf, "B", 12)
+        pdf.cell(0, 10, "Scoring Trend Chart:", new_x="LMARGIN", new_y="NEXT")
+        _embed_image(pdf, first_source, self.profile, x=10, w=190)
         pdf.ln(5)
 
-        for g in graph_files:
-            if g == first_chart:
+        for label, source in charts:
+            if label == first_label:
                 continue
             pdf.add_page()
-            try:
-                pdf.set_font("Arial", "B", 14)
-            except Exception:
-                pdf.set_font("helvetica", "B", 14)
-            pdf.cell(0, 10, os.path.basename(g), ln=True)
-            pdf.image(g, x=10, w=190)
+            self._set_font(pdf, "B", 14)
+            pdf.cell(0, 10, label, new_x="LMARGIN", new_y="NEXT")
+            _embed_image(pdf, source, self.profile, x=10, w=190)
+        return pdf
 
-        pdf.output(output_path)
-        logger.info("PDF report generated with %d charts → %s", len(graph_files), output_path)
-        return output_path
+    def _breakdown_page(self, pdf: FPDF, breakdown: pd.DataFrame) -> None:
+        columns = [("grouping", "Split", 26), ("group", "Group", 26), ("Games", "G", 14),
+                   ("Wins", "W", 14), ("Losses", "L", 14), ("Win Streak", "W Str", 18),
+                   ("Loss Streak", "L Str", 18), ("FG%", "FG%", 16), ("3P%", "3P%", 16),
+                   ("Rebounds", "REB", 16), ("Avg Points", "PTS", 16)]
+        pdf.add_page()
+        self._set_font(pdf, "B", 14)
+        pdf.cell(
+            0, 10, "Breakdown by Season, Home/Away and Recent Games",
+            new_x="LMARGIN", new_y="NEXT",
+        )
+        self._set_font(pdf, "B", 9)
+        for _, label, width in columns:
+            pdf.cell(width, 7, label, border=1, align="C")
+        pdf.ln()
+        self._set_font(pdf, "", 9)
+        for row in breakdown.to_dict("records"):
+            for key, _, width in columns:
+                pdf.cell(width, 6, str(row.get(key, "")), border=1, align="C")
+            pdf.ln()
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional
+
+from .locks import file_lock
+from .utils import Settings, logger
+
+
+_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_WEEKDAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+
+def _parse_value(token: str, names: Optional[List[str]], offset: int) -> int:
+    lowered = token.lower()
+    if names and lowered in names:
+        return names.index(lowered) + offset
+    return int(token)
+
+
+def _parse_field(expr: str, lo: int, hi: int, names: Optional[List[str]] = None) -> FrozenSet[int]:
+    values = set()
+    for part in expr.split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {step_s}")
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = _parse_value(a, names, lo), _parse_value(b, names, lo)
+        else:
+            start = _parse_value(part, names, lo)
+            end = hi if step > 1 else start
+        if not (lo <= start <= hi and lo <= end <= hi) or start > end:
+            raise ValueError(f"Cron value out of range {lo}-{hi}: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """Standard five-field cron expression (minute hour day-of-month month day-of-week).
+
+    Supports ``*``, lists, ranges, steps, month/weekday names and the ``@hourly``-style aliases.
+    As in cron, when both day fields are restricted a day matches if either does.
+    """
+
+    expr: str
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expr: str) -> "CronSchedule":
+        fields = _ALIASES.get(expr.strip().lower(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        minute, hour, day, month, weekday = fields
+        weekdays = _parse_field(weekday, 0, 7, _WEEKDAYS)
+        return cls(
+            expr=expr.strip(),
+            minutes=_parse_field(minute, 0, 59),
+            hours=_parse_field(hour, 0, 23),
+            days=_parse_field(day, 1, 31),
+            months=_parse_field(month, 1, 12, _MONTHS),
+            weekdays=frozenset(d % 7 for d in weekdays),  # 7 is also Sunday
+            any_day=day == "*",
+            any_weekday=weekday == "*",
+        )
+
+    def _day_matches(self, dt: datetime) -> bool:
+        in_days = dt.day in self.days
+        in_weekdays = (dt.weekday() + 1) % 7 in self.weekdays
+        if not self.any_day and not self.any_weekday:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def matches(self, dt: datetime) -> bool:
+        return (
+            dt.minute in self.minutes and dt.hour in self.hours
+            and dt.month in self.months and self._day_matches(dt)
+        )
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after ``dt``."""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=5 * 366)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(
+                    year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+class Scheduler:
+    """Run named jobs in-process whenever a cron schedule fires.
+
+    Jobs run on a thread pool of ``workers``. A job still running from an earlier fire is not
+    started again (the tick is recorded as ``skipped``). The last fire time and per-job outcomes
+    are persisted to ``state_path``, so a restarted scheduler knows which fires it missed: the
+    most recent missed fire is run once if it is at most ``misfire_grace`` seconds old, older
+    ones are dropped. A scheduler without saved state starts from the current time.
+    """
+
+    def __init__(
+        self,
+        schedule: CronSchedule,
+        jobs: Mapping[str, Callable[[], Any]],
+        state_path: str,
+        workers: int = 1,
+        misfire_grace: float = 3600.0,
+        clock: Callable[[], datetime] = datetime.now,
+        on_shutdown: Optional[Callable[[], None]] = None,
+    ):
+        self.schedule = schedule
+        self.jobs = dict(jobs)
+        self.state_path = state_path
+        self.misfire_grace = misfire_grace
+        self._clock = clock
+        self._on_shutdown = on_shutdown
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="scheduled-job"
+        )
+        self._lock = threading.Lock()
+        self._running: Dict[str, Any] = {}
+        state = self.state()
+        last = state.get("last_fire") if state.get("cron") == schedule.expr else None
+        self._last_fire = (
+            datetime.fromisoformat(last) if last else clock().replace(second=0, microsecond=0)
+        )
+
+    # Persisted state
+    def state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_state(self, **changes: Any) -> None:
+        with file_lock(f"{self.state_path}.lock"):
+            state = self.state()
+            jobs = changes.pop("jobs", None)
+            state.update(changes)
+            if jobs:
+                for key, entry in jobs.items():
+                    state.setdefault("jobs", {}).setdefault(key, {}).update(entry)
+            tmp = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(state, fh, indent=2)
+            os.replace(tmp, self.state_path)
+
+    # Scheduling
+    def next_fire(self) -> datetime:
+        return self.schedule.next_after(self._last_fire)
+
+    def _due(self, now: datetime) -> Optional[datetime]:
+        """Fire time to run at ``now`` (coalescing missed fires), or None."""
+        fire, missed = None, 0
+        candidate = self.schedule.next_after(self._last_fire)
+        while candidate <= now:
+            fire, missed = candidate, missed + 1
+            candidate = self.schedule.next_after(candidate)
+        if fire is None:
+            return None
+        self._last_fire = fire
+        if (now - fire).total_seconds() > self.misfire_grace:
+            logger.warning(
+                "Skipping %d missed run(s); last was due %s (grace %.0fs)",
+                missed, fire, self.misfire_grace,
+            )
+            self._update_state(cron=self.schedule.expr, last_fire=fire.isoformat())
+            return None
+        if missed > 1:
+            logger.info("Coalescing %d missed run(s) into one", missed)
+        return fire
+
+    def tick(self, now: Optional[datetime] = None) -> List[str]:
+        """Start the jobs if the schedule fired since the last tick; returns the started names."""
+        fire = self._due(now or self._clock())
+        if fire is None:
+            return []
+        self._update_state(cron=self.schedule.expr, last_fire=fire.isoformat())
+        return self.run_now(fire)
+
+    def run_now(self, fire: Optional[datetime] = None) -> List[str]:
+        """Submit every job that is not already running."""
+        fire = fire or self._clock()
+        started, skipped = [], {}
+        with self._lock:
+            for key, fn in self.jobs.items():
+                if key in self._running:
+                    logger.warning(
+                        "Scheduled job %s is still running; skipping the %s run", key, fire
+                    )
+                    skipped[key] = {"status": "skipped", "skipped_at": fire.isoformat()}
+                    continue
+                self._running[key] = self._executor.submit(self._run, key, fn)
+                started.append(key)
+        if skipped:
+            self._update_state(jobs=skipped)
+        return started
+
+    def _run(self, key: str, fn: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        entry: Dict[str, Any] = {"last_started": self._clock().isoformat(), "error": None}
+        try:
+            fn()
+            entry["status"] = "succeeded"
+        except Exception as e:
+            logger.exception("Scheduled job %s failed: %s", key, e)
+            entry.update(status="failed", error=str(e) or e.__class__.__name__)
+        finally:
+            entry.update(
+                last_finished=self._clock().isoformat(),
+                elapsed_s=round(time.perf_counter() - started, 3),
+            )
+            self._update_state(jobs={key: entry})
+            with self._lock:
+                self._running.pop(key, None)
+
+    def wait(self) -> None:
+        """Block until every running job has finished."""
+        with self._lock:
+            futures = list(self._running.values())
+        for future in futures:
+            future.result()
+
+    def run_forever(self, stop: Optional[threading.Event] = None, poll: float = 30.0) -> None:
+        stop = stop or threading.Event()
+        logger.info(
+            "Scheduler running %r for %s; next run at %s",
+            self.schedule.expr, ", ".join(self.jobs), self.next_fire(),
+        )
+        while not stop.is_set():
+            self.tick()
+            delay = (self.next_fire() - self._clock()).total_seconds()
+            stop.wait(min(max(delay, 1.0), poll))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+        if self._on_shutdown is not None:
+            self._on_shutdown()
+
+
+def _pipeline_job(ctx, settings: Settings, mailer=None) -> Callable[[], Any]:
+    def _job():
+        from .analysis import fetch_games
+        from .pipeline import run_team_pipeline
+
+        # A scheduled report is built from fresh data, never from a cache entry still within its TTL
+        games = fetch_games(ctx.id, ttl=0)
+        return run_team_pipeline(
+            ctx, settings, send_email=mailer is not None, include_trend=True, update_env=False,
+            games=games, mailer=mailer,
+        )
+
+    return _job
+
+
+def build_scheduler(
+    cron: Optional[str] = None,
+    teams: Optional[str] = None,
+    settings: Optional[Settings] = None,
+) -> Scheduler:
+    """Scheduler running the team pipeline for each scheduled team.
+
+    Optional env vars:
+      - SCHEDULE_CRON (default "0 9 * * 1", Mondays at 09:00)
+      - SCHEDULE_TEAMS (ALL or comma-separated abbreviations; default LAST_TEAM_ABBR)
+      - SCHEDULE_WORKERS (concurrent team runs, default 1)
+      - SCHEDULE_MISFIRE_GRACE (seconds a missed run may still be caught up, default 3600)
+      - SCHEDULE_EMAIL (send the summary email after each run; default 1 when EMAIL_USER and
+        EMAIL_PASS are set, else 0)
+      - SCHEDULE_STATE (default <DATA_DIR>/schedule_state.json)
+    """
+    from .batch import resolve_team_contexts
+
+    settings = settings or Settings()
+    schedule = CronSchedule.parse(cron or settings.schedule_cron or "0 9 * * 1")
+    contexts = resolve_team_contexts(
+        teams or os.getenv("SCHEDULE_TEAMS") or settings.last_team_abbr
+    )
+    mailer = None
+    has_credentials = bool(settings.email_user and settings.email_pass)
+    if os.getenv("SCHEDULE_EMAIL", "1" if has_credentials else "0") == "1":
+        from .emailer import BatchMailer
+
+        # Logs in on the first send; every scheduled team reuses its connections
+        mailer = BatchMailer(settings.email_user, settings.email_pass)
+    state_path = os.getenv("SCHEDULE_STATE") or os.path.join(
+        settings.data_dir, "schedule_state.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    return Scheduler(
+        schedule,
+        {ctx.abbr: _pipeline_job(ctx, settings, mailer) for ctx in contexts},
+        state_path,
+        workers=int(os.getenv("SCHEDULE_WORKERS", "1")),
+        misfire_grace=float(os.getenv("SCHEDULE_MISFIRE_GRACE", "3600")),
+        on_shutdown=mailer.close if mailer is not None else None,
+    )
+
+
+def run_scheduler(
+    cron: Optional[str] = None, teams: Optional[str] = None, once: bool = False
+) -> None:
+    """Entry point for ``nba-analysis schedule``; ``once`` runs every job immediately and exits."""
+    scheduler = build_scheduler(cron, teams)
+    try:
+        if once:
+            scheduler.run_now()
+            scheduler.wait()
+        else:
+            scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped")
+    finally:
+        scheduler.shutdown(wait=True)
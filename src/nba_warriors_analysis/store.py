@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .utils import extract_opponent, logger
+
+
+# LeagueGameFinder columns kept in the store; absent columns are stored as NULL
+TEXT_COLUMNS = [
+    "SEASON_ID", "TEAM_ABBREVIATION", "TEAM_NAME", "GAME_ID", "GAME_DATE", "MATCHUP", "WL",
+    "OPPONENT",
+]
+NUMERIC_COLUMNS = [
+    "MIN", "PTS", "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+    "OREB", "DREB", "REB", "AST", "STL", "BLK", "TOV", "PF", "PLUS_MINUS",
+]
+STORE_COLUMNS = ["TEAM_ID", "HOME"] + TEXT_COLUMNS + NUMERIC_COLUMNS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS games (
+    TEAM_ID INTEGER NOT NULL,
+    HOME INTEGER,
+    {", ".join(f"{c} TEXT" for c in TEXT_COLUMNS)},
+    {", ".join(f"{c} REAL" for c in NUMERIC_COLUMNS)},
+    PRIMARY KEY (TEAM_ID, GAME_ID)
+);
+CREATE INDEX IF NOT EXISTS idx_games_season_team ON games (SEASON_ID, TEAM_ID);
+CREATE INDEX IF NOT EXISTS idx_games_team_opponent ON games (TEAM_ID, OPPONENT, GAME_DATE);
+CREATE INDEX IF NOT EXISTS idx_games_date ON games (GAME_DATE);
+"""
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+
+def store_path(cache_dir: Optional[str] = None) -> str:
+    """Location of the analytics store.
+
+    Optional env vars:
+      - NBA_STORE_PATH (default <cache_dir or NBA_API_CACHE_DIR>/games.sqlite)
+    """
+    return os.getenv("NBA_STORE_PATH") or os.path.join(
+        cache_dir or os.getenv("NBA_API_CACHE_DIR", "data"), "games.sqlite"
+    )
+
+
+def store_enabled() -> bool:
+    """NBA_STORE=0 stops fetches from populating the store (default 1)."""
+    return os.getenv("NBA_STORE", "1") == "1"
+
+
+def _iso(value: Optional[DateLike]) -> Optional[str]:
+    return None if value is None else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class GameStore:
+    """SQLite store of team game logs, indexed by team, season, date and opponent.
+
+    Populated from fetch_games()/fetch_league_games() output (upserted on TEAM_ID + GAME_ID) and
+    queried with indexed lookups instead of rescanning per-team files. Each operation opens its
+    own connection, so one store can be used from many threads and processes (WAL journal).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or store_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql, conn, params=list(params))
+        if "GAME_DATE" in df.columns:
+            df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])
+        return df
+
+    # Writes
+    def upsert_games(self, df: pd.DataFrame, team_id: Optional[int] = None) -> int:
+        """Insert or replace game rows; ``team_id`` fills TEAM_ID when the frame lacks it."""
+        if df.empty:
+            return 0
+        rows = pd.DataFrame(index=df.index)
+        if "TEAM_ID" in df.columns:
+            rows["TEAM_ID"] = df["TEAM_ID"].astype(int)
+        elif team_id is not None:
+            rows["TEAM_ID"] = int(team_id)
+        else:
+            raise ValueError("Games need a TEAM_ID column or an explicit team_id")
+        for col in TEXT_COLUMNS + NUMERIC_COLUMNS:
+            rows[col] = df[col] if col in df.columns else None
+        rows["GAME_ID"] = rows["GAME_ID"].astype(str).str.zfill(10)
+        rows["GAME_DATE"] = pd.to_datetime(rows["GAME_DATE"]).dt.strftime("%Y-%m-%d")
+        if "SEASON_ID" in df.columns:
+            rows["SEASON_ID"] = rows["SEASON_ID"].astype(str)
+        if "MATCHUP" in df.columns:
+            matchup = df["MATCHUP"].astype(str)
+            rows["HOME"] = (~matchup.str.contains("@", regex=False)).astype(int)
+            if "OPPONENT" not in df.columns:
+                rows["OPPONENT"] = matchup.map(extract_opponent)
+        else:
+            rows["HOME"] = None
+        rows = rows[STORE_COLUMNS].astype(object).where(rows[STORE_COLUMNS].notna(), None)
+        columns = ", ".join(STORE_COLUMNS)
+        placeholders = ", ".join("?" for _ in STORE_COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO games ({columns}) VALUES ({placeholders})",
+                rows.itertuples(index=False, name=None),
+            )
+        return len(rows)
+
+    # Queries
+    def head_to_head(
+        self, team_id: int, opponent: str, since: Optional[DateLike] = None
+    ) -> pd.DataFrame:
+        """Games of ``team_id`` against the ``opponent`` abbreviation, optionally since a date."""
+        sql = "SELECT * FROM games WHERE TEAM_ID = ? AND OPPONENT = ?"
+        params = [int(team_id), opponent.upper()]
+        if since is not None:
+            sql += " AND GAME_DATE >= ?"
+            params.append(_iso(since))
+        return self._query(sql + " ORDER BY GAME_DATE", params)
+
+    def season_summary(
+        self, team_ids: Optional[Iterable[int]] = None, season: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Per team and season: games, wins, losses and average points, rebounds and shooting."""
+        sql = """
+            SELECT TEAM_ID, MAX(TEAM_ABBREVIATION) AS TEAM_ABBREVIATION, SEASON_ID,
+                   COUNT(*) AS GAMES, SUM(WL = 'W') AS WINS, SUM(WL = 'L') AS LOSSES,
+                   AVG(PTS) AS PTS, AVG(REB) AS REB, AVG(FG_PCT) AS FG_PCT, AVG(FG3_PCT) AS FG3_PCT
+            FROM games WHERE 1 = 1"""
+        params: List = []
+        ids = [int(t) for t in team_ids] if team_ids is not None else None
+        if ids:
+            sql += f" AND TEAM_ID IN ({', '.join('?' for _ in ids)})"
+            params.extend(ids)
+        if season is not None:
+            sql += " AND SEASON_ID = ?"
+            params.append(str(season))
+        return self._query(sql + " GROUP BY TEAM_ID, SEASON_ID ORDER BY SEASON_ID, TEAM_ID", params)
+
+    def league_averages(self, season: Optional[str] = None) -> pd.DataFrame:
+        """League-wide per-game averages per season (every team-game counts once)."""
+        sql = """
+            SELECT SEASON_ID, COUNT(*) AS TEAM_GAMES, COUNT(DISTINCT TEAM_ID) AS TEAMS,
+                   AVG(PTS) AS PTS, AVG(REB) AS REB, AVG(AST) AS AST,
+                   AVG(FG_PCT) AS FG_PCT, AVG(FG3_PCT) AS FG3_PCT
+            FROM games"""
+        params: List = []
+        if season is not None:
+            sql += " WHERE SEASON_ID = ?"
+            params.append(str(season))
+        return self._query(sql + " GROUP BY SEASON_ID ORDER BY SEASON_ID", params)
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return int(conn.execute("SELECT COUNT(*) FROM games").fetchone()[0])
+
+
+# One GameStore per path and process, so the WAL pragma and schema script run once
+_STORES: Dict[str, GameStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(path: Optional[str] = None) -> GameStore:
+    """The process-wide GameStore at ``path`` (default: store_path())."""
+    path = os.path.abspath(path or store_path())
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = GameStore(path)
+    return store
+
+
+def league_table(
+    team_ids: Optional[Iterable[int]] = None, store: Optional[GameStore] = None
+) -> pd.DataFrame:
+    """Latest regular season's standings-style comparison of ``team_ids`` (default: all teams).
+
+    One grouped, indexed query over the store instead of reading each team's games; rows are
+    ordered by win percentage.
+    """
+    table = (store or get_store()).season_summary(team_ids)
+    regular = table[table["SEASON_ID"].astype(str).str.startswith("2")]  # 2xxxx = regular season
+    if regular.empty:
+        return regular
+    latest = regular[regular["SEASON_ID"] == regular["SEASON_ID"].max()].copy()
+    win_pct = (latest["WINS"] / latest["GAMES"]).round(3)
+    latest.insert(latest.columns.get_loc("LOSSES") + 1, "WIN_PCT", win_pct)
+    return latest.sort_values(["WIN_PCT", "PTS"], ascending=False).reset_index(drop=True)
+
+
+def record_games(
+    df: pd.DataFrame, team_id: Optional[int] = None, cache_dir: Optional[str] = None
+) -> None:
+    """Best-effort upsert of fetched games into the store; never fails the fetch."""
+    if not store_enabled() or df is None or df.empty:
+        return
+    try:
+        get_store(store_path(cache_dir)).upsert_games(df, team_id=team_id)
+    except Exception as err:
+        logger.debug("Failed to update analytics store: %s", err)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .utils import streak_runs
+
+
+# Groupings understood by summarize(); unavailable ones (missing columns) are skipped
+GROUPINGS = ("all", "season", "home_away", "last_n")
+
+SUMMARY_COLUMNS = [
+    "grouping", "group", "Games", "Wins", "Losses", "Win Streak", "Loss Streak",
+    "FG%", "3P%", "Rebounds", "Avg Points",
+]
+
+
+def _grouping_labels(df: pd.DataFrame, grouping: str, last_n: int):
+    """Return (row positions, group labels) for one grouping, or None if it does not apply."""
+    n = len(df)
+    if grouping == "all":
+        return np.arange(n), np.full(n, "All", dtype=object)
+    if grouping == "season" and "SEASON_ID" in df.columns:
+        return np.arange(n), df["SEASON_ID"].astype(str).to_numpy(dtype=object)
+    if grouping == "home_away" and "MATCHUP" in df.columns:
+        away = df["MATCHUP"].astype(str).str.contains("@", regex=False).to_numpy()
+        return np.arange(n), np.where(away, "Away", "Home").astype(object)
+    if grouping == "last_n" and last_n > 0:
+        rows = np.arange(max(0, n - last_n), n)
+        return rows, np.full(len(rows), f"Last {last_n}", dtype=object)
+    return None
+
+
+def summarize(
+    df: pd.DataFrame, groupings: Sequence[str] = GROUPINGS, last_n: int = 10
+) -> pd.DataFrame:
+    """Compute every summary metric for every requested grouping in one grouped aggregation.
+
+    Rows for all groupings are stacked (ordered by GAME_DATE within each group) and aggregated
+    with a single ``groupby(["grouping", "group"])``; streaks come from one run-length pass over
+    the stacked W/L column. Returns a tidy frame with ``SUMMARY_COLUMNS``, one row per group.
+    """
+    ordered = df.sort_values("GAME_DATE", kind="stable") if "GAME_DATE" in df.columns else df
+    ordered = ordered.reset_index(drop=True)
+
+    positions: List[np.ndarray] = []
+    grouping_keys: List[np.ndarray] = []
+    group_keys: List[np.ndarray] = []
+    for grouping in groupings:
+        if grouping not in GROUPINGS:
+            expected = ", ".join(GROUPINGS)
+            raise ValueError(f"Unknown grouping: {grouping} (expected one of {expected})")
+        labelled = _grouping_labels(ordered, grouping, last_n)
+        if labelled is None:
+            continue
+        rows, labels = labelled
+        positions.append(rows)
+        grouping_keys.append(np.full(len(rows), grouping, dtype=object))
+        group_keys.append(labels)
+    if not positions:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    rows = np.concatenate(positions)
+    wl = ordered["WL"].to_numpy(dtype=object)[rows]
+    stacked = pd.DataFrame({
+        "grouping": np.concatenate(grouping_keys),
+        "group": np.concatenate(group_keys),
+        "_pos": np.arange(len(rows)),
+        "WL": wl,
+        "_W": wl == "W",
+        "_L": wl == "L",
+        "FG_PCT": ordered["FG_PCT"].to_numpy()[rows],
+        "FG3_PCT": ordered["FG3_PCT"].to_numpy()[rows],
+        "REB": ordered["REB"].to_numpy()[rows],
+        "PTS": ordered["PTS"].to_numpy()[rows],
+    })
+    # Keep each group's games contiguous and in date order so streaks are per group
+    stacked = stacked.sort_values(["grouping", "group", "_pos"], kind="stable")
+
+    out = stacked.groupby(["grouping", "group"], sort=False).agg(
+        Games=("WL", "size"),
+        Wins=("_W", "sum"),
+        Losses=("_L", "sum"),
+        FG=("FG_PCT", "mean"),
+        FG3=("FG3_PCT", "mean"),
+        Rebounds=("REB", "mean"),
+        Points=("PTS", "mean"),
+    )
+
+    grouping_col = stacked["grouping"].to_numpy(dtype=object)
+    group_id = grouping_col + "\x1f" + stacked["group"].to_numpy(dtype=object)
+    values, lengths, starts = streak_runs(stacked["WL"], groups=group_id)
+    runs = pd.DataFrame({
+        "grouping": stacked["grouping"].to_numpy()[starts],
+        "group": stacked["group"].to_numpy()[starts],
+        "WL": values,
+        "LENGTH": lengths,
+    })
+    decided = runs[runs["WL"].isin(["W", "L"])]
+    longest = decided.groupby(["grouping", "group", "WL"])["LENGTH"].max().unstack("WL")
+    longest = longest.reindex(index=out.index, columns=["W", "L"]).fillna(0).astype(int)
+
+    out = out.assign(**{
+        "Win Streak": longest["W"],
+        "Loss Streak": longest["L"],
+        "FG%": (out["FG"] * 100).round(2),
+        "3P%": (out["FG3"] * 100).round(2),
+        "Rebounds": out["Rebounds"].round(2),
+        "Avg Points": out["Points"].round(2),
+    })
+    out[["Wins", "Losses"]] = out[["Wins", "Losses"]].astype(int)
+    out = out.reset_index()
+    # Preserve the requested grouping order; groups within a grouping stay in label order
+    order = {g: i for i, g in enumerate(groupings)}
+    out = out.sort_values("grouping", key=lambda s: s.map(order), kind="stable")
+    return out[SUMMARY_COLUMNS].reset_index(drop=True)
+
+
+def overall_summary(breakdown: pd.DataFrame) -> Dict[str, float]:
+    """Extract the all-games row of a summarize() frame in the compute_summary() dict format.
+
+    Without games there is no "all" row: counts are 0 and averages NaN.
+    """
+    rows = breakdown[breakdown["grouping"] == "all"]
+    if rows.empty:
+        return {
+            "Wins": 0, "Losses": 0, "Win Streak": 0, "Loss Streak": 0,
+            "FG%": float("nan"), "3P%": float("nan"), "Rebounds": float("nan"),
+            "Avg Points": float("nan"),
+        }
+    row = rows.iloc[0]
+    return {
+        "Wins": int(row["Wins"]),
+        "Losses": int(row["Losses"]),
+        "Win Streak": int(row["Win Streak"]),
+        "Loss Streak": int(row["Loss Streak"]),
+        "FG%": float(row["FG%"]),
+        "3P%": float(row["3P%"]),
+        "Rebounds": float(row["Rebounds"]),
+        "Avg Points": float(row["Avg Points"]),
+    }
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import contextvars
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from .utils import logger
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not reported
+    resource = None  # type: ignore[assignment]
+
+
+_CURRENT: contextvars.ContextVar[Optional["RunTrace"]] = contextvars.ContextVar(
+    "nba_run_trace", default=None
+)
+
+# tracemalloc is process-wide: stages tracking memory in concurrent runs share one session, which is
+# stopped only when the last of them ends (and only if it was started here).
+_TRACEMALLOC_LOCK = threading.Lock()
+_TRACEMALLOC_USERS = 0
+_TRACEMALLOC_STARTED = False
+
+# cProfile sessions in concurrent threads conflict (Python 3.12+ refuses to start a second one)
+_PROFILE_LOCK = threading.Lock()
+
+
+def _start_alloc_tracking() -> None:
+    global _TRACEMALLOC_USERS, _TRACEMALLOC_STARTED
+    with _TRACEMALLOC_LOCK:
+        if _TRACEMALLOC_USERS == 0:
+            _TRACEMALLOC_STARTED = not tracemalloc.is_tracing()
+            if _TRACEMALLOC_STARTED:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        _TRACEMALLOC_USERS += 1
+
+
+def _stop_alloc_tracking() -> float:
+    """Peak traced allocation in MiB since tracking started, then release this stage's hold."""
+    global _TRACEMALLOC_USERS
+    with _TRACEMALLOC_LOCK:
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        _TRACEMALLOC_USERS -= 1
+        if _TRACEMALLOC_USERS == 0 and _TRACEMALLOC_STARTED:
+            tracemalloc.stop()
+    return round(peak, 1)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class RunTrace:
+    """Wall/CPU/memory timings for the stages of one pipeline run.
+
+    Stages are recorded with ``trace.stage(name)`` (or the module-level ``stage()`` while the trace
+    is active) and each one is logged as a ``trace ...`` key=value line. CPU time is that of the
+    calling thread; charts rendered in worker processes report their own timings via
+    ``record_chart``. Peak memory is the process's peak RSS so far, plus the peak Python allocation
+    within the stage when ``track_memory`` is on (tracemalloc; it slows allocation-heavy code, and
+    stages overlapping in concurrent runs share one session, so their peaks include each other).
+
+    Optional env vars:
+      - TRACE_MEMORY (trace Python allocations per stage, default 0)
+    """
+
+    def __init__(self, label: str, track_memory: Optional[bool] = None):
+        self.label = label
+        if track_memory is None:
+            track_memory = os.getenv("TRACE_MEMORY", "0") == "1"
+        self.track_memory = track_memory
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages: List[Dict[str, Any]] = []
+        self.charts: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, **extra: Any) -> Iterator[Dict[str, Any]]:
+        """Time the enclosed block; ``extra`` and keys set on the yielded dict are recorded."""
+        record: Dict[str, Any] = {"stage": name, **extra}
+        if self.track_memory:
+            _start_alloc_tracking()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = str(e) or e.__class__.__name__
+            raise
+        finally:
+            record["wall_s"] = round(time.perf_counter() - wall, 4)
+            record["cpu_s"] = round(time.thread_time() - cpu, 4)
+            if self.track_memory:
+                record["alloc_peak_mb"] = _stop_alloc_tracking()
+            record["peak_rss_mb"] = _peak_rss_mb()
+            self.stages.append(record)
+            fields = " ".join(f"{k}={v}" for k, v in record.items())
+            logger.info("trace run=%s %s", self.label, fields)
+
+    def record_chart(
+        self, name: str, wall_s: float, cpu_s: Optional[float] = None, cached: bool = False
+    ) -> None:
+        self.charts[name] = {
+            "wall_s": round(wall_s, 4),
+            "cpu_s": None if cpu_s is None else round(cpu_s, 4),
+            "cached": cached,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": self.label,
+            "started_at": self.started_at,
+            "total_wall_s": round(time.perf_counter() - self._started, 4),
+            "stages": self.stages,
+            "charts": self.charts,
+        }
+
+    def write(self, path: str) -> str:
+        """Write the JSON run report (e.g. ``reports/<ABBR>_run.json`` next to the PDF)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+        os.replace(tmp, path)
+        return path
+
+
+@contextmanager
+def activate(trace: RunTrace) -> Iterator[RunTrace]:
+    """Make ``trace`` the current trace for stage()/current() in this thread."""
+    token = _CURRENT.set(trace)
+    try:
+        yield trace
+    finally:
+        _CURRENT.reset(token)
+
+
+def current() -> Optional[RunTrace]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def stage(name: str, **extra: Any) -> Iterator[Optional[Dict[str, Any]]]:
+    """Record a stage on the current trace; a no-op when no trace is active."""
+    trace = _CURRENT.get()
+    if trace is None:
+        yield None
+        return
+    with trace.stage(name, **extra) as record:
+        yield record
+
+
+@contextmanager
+def profiled(out_stem: str, profiler: Optional[str] = None) -> Iterator[None]:
+    """Profile the enclosed block into ``<out_stem>.prof`` (cProfile) or ``.html`` (pyinstrument).
+
+    Only the calling thread is profiled, and one block at a time per process: concurrent callers
+    (e.g. profiled web jobs) wait for the running profile to finish.
+
+    Optional env vars:
+      - PROFILER (cprofile or pyinstrument; default cprofile, also used if pyinstrument is missing)
+    """
+    profiler = (profiler or os.getenv("PROFILER", "cprofile")).lower()
+    os.makedirs(os.path.dirname(out_stem) or ".", exist_ok=True)
+    with _PROFILE_LOCK:
+        if profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument is not installed; falling back to cProfile")
+            else:
+                prof = Profiler()
+                prof.start()
+                try:
+                    yield
+                finally:
+                    prof.stop()
+                    with open(f"{out_stem}.html", "w", encoding="utf-8") as fh:
+                        fh.write(prof.output_html())
+                    logger.info("Profile written to %s.html", out_stem)
+                return
+
+        import cProfile
+        import pstats
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(f"{out_stem}.prof")
+            summary = io.StringIO()
+            pstats.Stats(prof, stream=summary).sort_stats("cumulative").print_stats(15)
+            logger.info(
+                "Profile written to %s.prof; top functions by cumulative time:\n%s",
+                out_stem, summary.getvalue(),
+            )
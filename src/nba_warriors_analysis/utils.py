@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 import os
+import random
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -56,6 +57,7 @@ class Settings:
     data_dir: str = os.getenv("DATA_DIR", "data")
     plots_dir: str = os.getenv("PLOTS_DIR", "plots")
     reports_dir: str = os.getenv("REPORTS_DIR", "reports")
+    export_games_csv: bool = os.getenv("EXPORT_GAMES_CSV", "1") == "1"
 
     # Scheduling
     schedule_cron: Optional[str] = os.getenv("SCHEDULE_CRON")
@@ -71,20 +73,64 @@ class Settings:
         return []
 
 
+def backoff_delay(
+    attempt: int, base: float, cap: float, rng: Optional[random.Random] = None
+) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base ** attempt)]."""
+    return (rng or random).uniform(0, min(cap, base ** attempt))
+
+
+def streak_runs(wl_series, groups=None):
+    """Run-length encode a W/L sequence with NumPy.
+
+    Returns ``(values, lengths, starts)`` arrays: the W/L value of each streak, its length and the
+    positional index where it starts. When ``groups`` (same length, e.g. season ids) is given,
+    streaks also break wherever the group changes.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = np.asarray(wl_series, dtype=object)
+    n = len(values)
+    if n == 0:
+        return values, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    codes, _ = pd.factorize(values)
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    np.not_equal(codes[1:], codes[:-1], out=change[1:])
+    change[1:] |= codes[1:] == -1  # NaN never equals the previous result
+    if groups is not None:
+        group_codes, _ = pd.factorize(np.asarray(groups, dtype=object))
+        change[1:] |= group_codes[1:] != group_codes[:-1]
+    starts = np.flatnonzero(change)
+    lengths = np.diff(np.append(starts, n))
+    return values[starts], lengths, starts
+
+
 def compute_streaks(wl_series) -> list[tuple[str, int]]:
     """Compute consecutive win/loss streaks from a pandas Series of 'W'/'L'."""
-    streaks: list[tuple[str, int]] = []
-    count = 1
-    if len(wl_series) == 0:
-        return streaks
-    for i in range(1, len(wl_series)):
-        if wl_series.iloc[i] == wl_series.iloc[i - 1]:
-            count += 1
-        else:
-            streaks.append((wl_series.iloc[i - 1], count))
-            count = 1
-    streaks.append((wl_series.iloc[-1], count))
-    return streaks
+    values, lengths, _ = streak_runs(wl_series)
+    return list(zip(values.tolist(), lengths.tolist()))
+
+
+def longest_streaks(wl_series) -> dict[str, int]:
+    """Longest win and loss streaks, e.g. ``{"W": 7, "L": 3}`` (0 when a result never occurs)."""
+    values, lengths, _ = streak_runs(wl_series)
+    return {
+        result: int(lengths[values == result].max()) if (values == result).any() else 0
+        for result in ("W", "L")
+    }
+
+
+def current_streak(wl_series) -> tuple[Optional[str], int]:
+    """The streak still running at the end of the series, e.g. ``("W", 3)``.
+
+    ``(None, 0)`` if the series is empty.
+    """
+    values, lengths, _ = streak_runs(wl_series)
+    if len(values) == 0:
+        return None, 0
+    return values[-1], int(lengths[-1])
 
 
 def extract_opponent(matchup: str) -> Optional[str]:
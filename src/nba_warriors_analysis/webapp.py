@@ -1,113 +1,307 @@
 from __future__ import annotations
 
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash
-from dotenv import set_key
+import shutil
+from functools import lru_cache
+from typing import Optional
+from flask import (
+    Flask, abort, render_template, request, redirect, url_for, flash, jsonify, send_from_directory,
+)
+from markupsafe import Markup, escape
 import threading
 
-from .analysis import list_teams_sorted, find_team_context, fetch_games, compute_summary, persist_outputs
-from .plotting import generate_all_charts
-from .reporting import ReportBuilder
-from .emailer import send_summary_email
+from .jobs import JobQueue, JobQueueFull
+from .locks import run_once
+from .registry import get_registry
 from .utils import Settings, logger
 
 
-def create_app() -> Flask:
-    app = Flask(__name__)
-    app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret")
+def _run_pipeline(ctx, settings: Settings, send_email: bool, profile: bool = False):
+    # Imported on first use so workers start (and answer /healthz) without pandas, matplotlib
+    # or fpdf
+    from .pipeline import run_team_pipeline
+    from .tracing import profiled
+
+    # The web process outlives a request, so a stale cache can be served while it is refreshed.
+    # Concurrent jobs would race on .env, so the legacy LAST_TEAM_* keys are not updated.
+    swr = os.getenv("NBA_API_STALE_WHILE_REVALIDATE", "1") == "1"
+    if not profile:
+        return run_team_pipeline(
+            ctx, settings, send_email, update_env=False, stale_while_revalidate=swr
+        )
+    with profiled(os.path.join(settings.reports_dir, f"{ctx.abbr}_profile")):
+        return run_team_pipeline(
+            ctx, settings, send_email, update_env=False, stale_while_revalidate=swr
+        )
+
+
+@lru_cache(maxsize=1)
+def team_options_html() -> Markup:
+    """Pre-render the team <option> list once per process; the registry never changes at runtime."""
+    return Markup("\n").join(
+        Markup('<option value="{0}">{1} ({0})</option>').format(escape(c.abbr), escape(c.name))
+        for c in get_registry().contexts
+    )
+
+
+# Pid of the gunicorn master that preloaded the app (see preload() and gunicorn.conf.py)
+_PREFORK_MASTER_PID: Optional[int] = None
+_WARMER_PID: Optional[int] = None
+
+
+def preload() -> None:
+    """Import the scientific stack and build shared lookups once, before gunicorn forks.
+
+    Called from gunicorn.conf.py in the master when ``preload_app`` is on; workers then share
+    these modules copy-on-write instead of importing them separately.
+    """
+    global _PREFORK_MASTER_PID
+    _PREFORK_MASTER_PID = os.getpid()
+    from . import pipeline  # noqa: F401  (analysis, plotting, reporting and their dependencies)
+
+    team_options_html()
+
+
+def _in_prefork_master() -> bool:
+    return _PREFORK_MASTER_PID == os.getpid()
+
+
+def seed_data_dir(settings: Settings) -> None:
+    """Copy bundled seed caches into an empty DATA_DIR, once per deployment.
+
+    Optional env vars:
+      - SEED_DATA_DIR (default /app/data_seed)
+    """
+    seed_dir = os.getenv("SEED_DATA_DIR", "/app/data_seed")
+    if not os.path.isdir(seed_dir):
+        return
+
+    def _copy():
+        cache_exts = (".csv", ".parquet", ".feather")
+        if any(fname.endswith(cache_exts) for fname in os.listdir(settings.data_dir)):
+            return
+        for fname in os.listdir(seed_dir):
+            src = os.path.join(seed_dir, fname)
+            dst = os.path.join(settings.data_dir, fname)
+            try:
+                if os.path.isfile(src) and not os.path.exists(dst):
+                    tmp = f"{dst}.{os.getpid()}.tmp"
+                    shutil.copyfile(src, tmp)
+                    os.replace(tmp, dst)
+            except OSError as e:
+                logger.debug("Seed copy failed for %s: %s", fname, e)
+        logger.info("Seeded %s from %s", settings.data_dir, seed_dir)
 
-    # Seed data bootstrap: copy from /app/data_seed to DATA_DIR if empty
     try:
-        settings = Settings()
-        if os.path.isdir("/app/data_seed"):
+        os.makedirs(settings.data_dir, exist_ok=True)
+        run_once("seed-data", _copy, settings.data_dir)
+    except Exception as e:
+        logger.debug("Seed data bootstrap error: %s", e)
+
+
+def _warm_cache(settings: Settings) -> None:
+    from .analysis import fetch_league_games
+    from .asyncfetch import warm_teams
+
+    team_list = os.getenv("WARM_TEAM_ABBRS", settings.last_team_abbr)
+    abbrs = [a.strip() for a in team_list.split(",") if a.strip()]
+    registry = get_registry()
+    contexts = []
+    for abbr in abbrs:
+        ctx = registry.by_abbr(abbr)
+        if ctx is None:
+            logger.warning("Warm cache: unknown team abbr %s", abbr)
+            continue
+        contexts.append(ctx)
+
+    # Several teams: one league-wide fetch populates every cache entry in a single pass
+    if len(contexts) > 1:
+        try:
+            warmed = fetch_league_games(team_ids=[c.id for c in contexts])
+            contexts = [c for c in contexts if c.id not in warmed]
+        except Exception as e:
+            logger.warning("Warm cache: league-wide fetch failed, falling back per team: %s", e)
+
+    # Remaining teams are fetched concurrently under a shared rate limit
+    if contexts:
+        logger.info("Warming cache for %s", ", ".join(c.abbr for c in contexts))
+        timeout = float(os.getenv("WARM_TIMEOUT", "0")) or None
+        outcomes = warm_teams([c.id for c in contexts], deadline=timeout)
+        for ctx in contexts:
+            outcome = outcomes[ctx.id]
+            if outcome.status in ("failed", "cancelled"):
+                logger.warning("Warm cache %s for %s: %s", outcome.status, ctx.abbr, outcome.error)
+
+
+def start_cache_warmer(settings: Optional[Settings] = None) -> Optional[threading.Thread]:
+    """Start the background cache warmer when WARM_CACHE_ON_START=1.
+
+    At most one warmer thread per process, and the warming itself runs once per deployment
+    across all workers sharing DATA_DIR (the others wait for it and skip).
+    """
+    global _WARMER_PID
+    if os.getenv("WARM_CACHE_ON_START", "0") != "1" or _WARMER_PID == os.getpid():
+        return None
+    _WARMER_PID = os.getpid()
+    settings = settings or Settings()
+
+    def _run():
+        try:
             os.makedirs(settings.data_dir, exist_ok=True)
-            if not any(fname.endswith(".csv") for fname in os.listdir(settings.data_dir)):
-                for fname in os.listdir("/app/data_seed"):
-                    src = os.path.join("/app/data_seed", fname)
-                    dst = os.path.join(settings.data_dir, fname)
-                    try:
-                        if os.path.isfile(src) and not os.path.exists(dst):
-                            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
-                                fdst.write(fsrc.read())
-                    except Exception:
-                        pass
-    except Exception:
-        pass
+            run_once("warm-cache", lambda: _warm_cache(settings), settings.data_dir)
+        except Exception as e:
+            logger.debug("Warm cache init error: %s", e)
+
+    thread = threading.Thread(target=_run, name="cache-warmer", daemon=True)
+    thread.start()
+    return thread
+
+
+def create_app(settings: Optional[Settings] = None) -> Flask:
+    app = Flask(__name__)
+    app_settings = settings or Settings()
+    app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret")
+
+    # Seed data bootstrap: copy from SEED_DATA_DIR to DATA_DIR if empty
+    seed_data_dir(app_settings)
 
     # Health check endpoint for Render
     @app.route("/healthz", methods=["GET"])
     def healthz():
         return "ok", 200
 
-    # Optional background cache warmer (non-blocking)
-    if os.getenv("WARM_CACHE_ON_START", "0") == "1":
-        def _warm_cache_on_start():
-            try:
-                settings = Settings()
-                team_list = os.getenv("WARM_TEAM_ABBRS", settings.last_team_abbr)
-                abbrs = [a.strip() for a in team_list.split(",") if a.strip()]
-                teams_sorted = list_teams_sorted()
-                for abbr in abbrs:
-                    idx = next((i for i, t in enumerate(teams_sorted) if t["abbreviation"].lower() == abbr.lower()), None)
-                    if idx is None:
-                        logger.warning("Warm cache: unknown team abbr %s", abbr)
-                        continue
-                    ctx = find_team_context(idx)
-                    logger.info("Warming cache for %s (%s)", ctx.name, ctx.abbr)
-                    try:
-                        fetch_games(ctx.id)
-                    except Exception as e:
-                        logger.warning("Warm cache failed for %s: %s", abbr, e)
-            except Exception as e:
-                logger.debug("Warm cache init error: %s", e)
-
-        threading.Thread(target=_warm_cache_on_start, name="cache-warmer", daemon=True).start()
-
-    @app.route("/", methods=["GET"]) 
+    # Optional background cache warmer (non-blocking). A preloading gunicorn master starts it in
+    # each worker after the fork instead (threads do not survive fork).
+    if not _in_prefork_master():
+        start_cache_warmer(app_settings)
+
+    @app.route("/", methods=["GET"])
     def index():
-        teams = list_teams_sorted()
-        return render_template("index.html", teams=teams)
+        return render_template("index.html", team_options=team_options_html())
+
+    # Pipeline runs execute in a bounded background pool; /run only enqueues. Job records live in
+    # DATA_DIR so any gunicorn worker can answer a poll and duplicate runs are caught across
+    # workers.
+    job_queue = JobQueue(state_dir=app_settings.data_dir)
+    app.extensions["job_queue"] = job_queue
 
-    @app.route("/run", methods=["POST"]) 
+    def _wants_json() -> bool:
+        return request.is_json or request.accept_mimetypes.best == "application/json"
+
+    @app.route("/run", methods=["POST"])
     def run():
+        payload = request.get_json(silent=True) or request.form
+        team_abbr = (payload.get("team_abbr") or "").strip()
+        send_email = payload.get("send_email") in ("on", True, "1", "true")
+        # Profiling is opt-in per deployment (WEB_PROFILING=1), then per request with "profile"
+        profile = (
+            os.getenv("WEB_PROFILING", "0") == "1"
+            and payload.get("profile") in ("on", True, "1", "true")
+        )
+
+        ctx = get_registry().by_abbr(team_abbr)
+        if ctx is None:
+            if _wants_json():
+                return jsonify({"error": "Invalid team abbreviation."}), 400
+            flash("Invalid team abbreviation.", "error")
+            return redirect(url_for("index"))
+
         try:
-            team_abbr = request.form.get("team_abbr")
-            send_email = request.form.get("send_email") == "on"
-            settings = Settings()
-
-            teams_sorted = list_teams_sorted()
-            idx = next((i for i, t in enumerate(teams_sorted) if t["abbreviation"].lower() == team_abbr.lower()), None)
-            if idx is None:
-                flash("Invalid team abbreviation.", "error")
-                return redirect(url_for("index"))
-
-            ctx = find_team_context(idx)
-            logger.info("Web run: %s (%s)", ctx.name, ctx.abbr)
-
-            # Fetch and persist
-            df = fetch_games(ctx.id)
-            summary = compute_summary(df)
-            persist_outputs(df, summary, ctx.abbr, settings)
-
-            # Generate trend + extended charts
-            generate_all_charts(df, ctx.abbr, settings)
-
-            # Update .env context for downstream compatibility
-            set_key(".env", "LAST_TEAM_ABBR", ctx.abbr)
-            set_key(".env", "LAST_TEAM_NAME", ctx.name)
-
-            # Build PDF
-            ReportBuilder(settings).build_pdf(ctx.abbr, ctx.name)
-
-            # Optionally send email
-            if send_email:
-                send_summary_email(settings, ctx.abbr, ctx.name)
-                flash("Pipeline completed and email sent.", "success")
-            else:
-                flash("Pipeline completed.", "success")
-        except Exception as e:
-            logger.exception("Web run failed: %s", e)
+            job = job_queue.submit(
+                f"{ctx.abbr}:email={int(send_email)}", _run_pipeline, ctx, app_settings, send_email,
+                profile,
+            )
+        except JobQueueFull as e:
+            if _wants_json():
+                return jsonify({"error": str(e)}), 503
             flash(f"Error: {e}", "error")
+            return redirect(url_for("index"))
+
+        logger.info("Web run queued: %s (%s) as job %s", ctx.name, ctx.abbr, job.id)
+        if _wants_json():
+            body = job.to_dict()
+            body["status_url"] = url_for("job_status", job_id=job.id)
+            body["result_url"] = url_for("job_result", job_id=job.id)
+            return jsonify(body), 202
+        flash(f"Pipeline queued for {ctx.name} (job {job.id}).", "success")
         return redirect(url_for("index"))
 
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def job_status(job_id: str):
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({"error": "Unknown job."}), 404
+        return jsonify(job.to_dict()), 200
+
+    @app.route("/jobs/<job_id>/result", methods=["GET"])
+    def job_result(job_id: str):
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({"error": "Unknown job."}), 404
+        if not job.done:
+            return jsonify(job.to_dict()), 202
+        if job.status == "failed":
+            return jsonify(job.to_dict()), 500
+        body = job.to_dict()
+        # Jobs run by another worker come back from their record with the result as a dict
+        result = job.result.to_dict() if hasattr(job.result, "to_dict") else job.result
+        body["result"] = result
+        if isinstance(result, dict) and result.get("team_abbr"):
+            body["artifacts_url"] = url_for("artifacts", team_abbr=result["team_abbr"])
+        return jsonify(body), 200
+
+    # Artifact downloads: conditional GET (ETag / Last-Modified → 304) and Range requests are
+    # handled by send_from_directory; ARTIFACT_MAX_AGE (seconds, default 0 = always revalidate)
+    # sets Cache-Control for browsers and CDNs.
+    artifact_max_age = int(os.getenv("ARTIFACT_MAX_AGE", "0"))
+
+    def _team_or_404(team_abbr: str) -> str:
+        ctx = get_registry().by_abbr(team_abbr)
+        if ctx is None:
+            abort(404)
+        return ctx.abbr
+
+    def _send_artifact(directory: str, filename: str, mimetype: str):
+        directory = os.path.abspath(directory)
+        if not os.path.isfile(os.path.join(directory, filename)):
+            abort(404)
+        return send_from_directory(directory, filename, mimetype=mimetype, conditional=True,
+                                   etag=True, max_age=artifact_max_age)
+
+    @app.route("/artifacts/<team_abbr>", methods=["GET"])
+    def artifacts(team_abbr: str):
+        abbr = _team_or_404(team_abbr)
+        settings = app_settings
+        body = {"team_abbr": abbr, "report": None, "charts": []}
+        report = os.path.join(settings.reports_dir, f"{abbr}_report.pdf")
+        if os.path.isfile(report):
+            st = os.stat(report)
+            body["report"] = {
+                "url": url_for("report_pdf", team_abbr=abbr),
+                "bytes": st.st_size,
+                "modified": st.st_mtime,
+            }
+        if os.path.isdir(settings.plots_dir):
+            for fname in sorted(os.listdir(settings.plots_dir)):
+                if fname.startswith(f"{abbr}_") and fname.endswith(".png"):
+                    chart = fname[len(abbr) + 1:-len(".png")]
+                    st = os.stat(os.path.join(settings.plots_dir, fname))
+                    body["charts"].append({
+                        "name": chart,
+                        "url": url_for("chart_png", team_abbr=abbr, chart=chart),
+                        "bytes": st.st_size,
+                        "modified": st.st_mtime,
+                    })
+        return jsonify(body), 200
+
+    @app.route("/reports/<team_abbr>.pdf", methods=["GET"])
+    def report_pdf(team_abbr: str):
+        abbr = _team_or_404(team_abbr)
+        return _send_artifact(app_settings.reports_dir, f"{abbr}_report.pdf", "application/pdf")
+
+    @app.route("/charts/<team_abbr>/<chart>.png", methods=["GET"])
+    def chart_png(team_abbr: str, chart: str):
+        abbr = _team_or_404(team_abbr)
+        return _send_artifact(app_settings.plots_dir, f"{abbr}_{chart}.png", "image/png")
+
     return app
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from nba_warriors_analysis.registry import TeamContext
+
+
+@pytest.fixture()
+def gsw():
+    return TeamContext(id=1610612744, abbr="GSW", name="Golden State Warriors", nickname="Warriors")
+
+
+@pytest.fixture()
+def make_games():
+    """Factory for a team's game log in the fetch_games() layout.
+
+    ``make_games(n)`` gives ``n`` games two days apart, alternating home/away and cycling
+    W, L, W; pass ``team_id`` to add a TEAM_ID column.
+    """
+
+    def _make(n=12, team_id=None):
+        games = pd.DataFrame({
+            "GAME_ID": [f"00223{i:05d}" for i in range(1, n + 1)],
+            "GAME_DATE": pd.date_range("2023-10-24", periods=n, freq="2D"),
+            "SEASON_ID": ["22023"] * n,
+            "MATCHUP": (["GSW vs. LAL", "GSW @ BOS"] * n)[:n],
+            "WL": (["W", "L", "W"] * n)[:n],
+            "PTS": list(range(100, 100 + n)),
+            "REB": list(range(40, 40 + n)),
+            "FG_PCT": [0.45] * n,
+            "FG3_PCT": [0.36] * n,
+        })
+        if team_id is not None:
+            games.insert(0, "TEAM_ID", team_id)
+        return games
+
+    return _make
@@ -1,6 +1,7 @@
 import pandas as pd
 
 from nba_warriors_analysis.analysis import compute_summary
+from nba_warriors_analysis.summary import overall_summary, summarize
 
 
 def test_compute_summary_numbers():
@@ -15,3 +16,33 @@ def test_compute_summary_numbers():
     assert summary["Wins"] == 3
     assert summary["Losses"] == 2
     assert "FG%" in summary and "3P%" in summary
+
+
+def test_summarize_groupings_in_one_frame():
+    df = pd.DataFrame({
+        "SEASON_ID": ["22022", "22022", "22023", "22023", "22023"],
+        "GAME_DATE": pd.date_range("2023-01-01", periods=5),
+        "MATCHUP": ["GSW vs. LAL", "GSW @ BOS", "GSW @ PHX", "GSW vs. NYK", "GSW @ MIA"],
+        "WL": ["W", "L", "W", "W", "L"],
+        "FG_PCT": [0.5, 0.4, 0.6, 0.55, 0.45],
+        "FG3_PCT": [0.35, 0.3, 0.4, 0.38, 0.28],
+        "REB": [40, 38, 45, 42, 39],
+        "PTS": [110, 98, 115, 120, 101],
+    })
+    breakdown = summarize(df, last_n=2)
+    rows = {(r["grouping"], r["group"]): r for r in breakdown.to_dict("records")}
+
+    assert overall_summary(breakdown) == compute_summary(df)
+    assert rows[("season", "22023")]["Wins"] == 2
+    assert rows[("season", "22023")]["Win Streak"] == 2
+    assert rows[("home_away", "Away")]["Games"] == 3
+    assert rows[("home_away", "Home")]["Win Streak"] == 2
+    assert rows[("last_n", "Last 2")]["Losses"] == 1
+
+
+def test_compute_summary_without_games():
+    df = pd.DataFrame({c: pd.Series(dtype=float) for c in ("FG_PCT", "FG3_PCT", "REB", "PTS")})
+    summary = compute_summary(df.assign(WL=pd.Series(dtype=object)))
+    streaks = (summary["Wins"], summary["Losses"], summary["Win Streak"], summary["Loss Streak"])
+    assert streaks == (0, 0, 0, 0)
+    assert pd.isna(summary["FG%"]) and pd.isna(summary["Avg Points"])
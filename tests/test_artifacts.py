@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+
+from nba_warriors_analysis.emailer import _bundle_attachments
+from nba_warriors_analysis.pipeline import build_artifacts
+from nba_warriors_analysis.utils import Settings
+
+
+def _settings(tmp_path):
+    return Settings(data_dir=str(tmp_path / "data"), plots_dir=str(tmp_path / "plots"),
+                    reports_dir=str(tmp_path / "reports"))
+
+
+def test_build_artifacts_stays_in_memory_until_written(tmp_path, monkeypatch, gsw, make_games):
+    monkeypatch.setenv("EMAIL_CHARTS", "thumbnails")
+    settings = _settings(tmp_path)
+    bundle = build_artifacts(gsw, settings, make_games(), include_trend=True)
+
+    assert not os.path.exists(tmp_path / "data") and not os.path.exists(tmp_path / "reports")
+    assert bundle.summary["Wins"] == 8 and bundle.pdf.startswith(b"%PDF")
+    assert "GSW_trend.png" in bundle.chart_files()
+    assert all(buf.getvalue().startswith(b"\x89PNG") for buf in bundle.chart_buffers().values())
+
+    attachments = _bundle_attachments(bundle)
+    assert attachments[0].name == "GSW_report.pdf"
+    assert {a.name for a in attachments[1:]} == {f[:-4] + ".jpg" for f in bundle.chart_files()}
+
+    paths = bundle.write(settings)
+    assert open(paths["report"], "rb").read() == bundle.pdf
+    assert paths["trend"].endswith("GSW_trend.png")
+    assert pd.read_csv(paths["summary"], index_col=0).squeeze("columns")["Wins"] == 8
+    # Hidden files are the manifest lock
+    written = [f for f in os.listdir(tmp_path / "plots") if not f.startswith(".")]
+    assert sorted(written) == sorted(list(bundle.chart_files()) + ["GSW_charts.json"])
+
+
+def test_unchanged_bundle_reuses_the_written_report(tmp_path, gsw, make_games):
+    from nba_warriors_analysis.reporting import ReportBuilder
+
+    settings = _settings(tmp_path)
+    first = build_artifacts(gsw, settings, make_games())
+    report = first.write(settings)["report"]
+    assert ReportBuilder._read_report_meta(report)["inputs"] == first.pdf_inputs
+    mtime = os.stat(report).st_mtime_ns
+
+    # Same games: the PDF comes from disk and is not rewritten
+    again = build_artifacts(gsw, settings, make_games())
+    assert again.pdf_inputs == first.pdf_inputs and again.pdf == open(report, "rb").read()
+    again.write(settings)
+    assert os.stat(report).st_mtime_ns == mtime
+
+    # One more game: rebuilt, and the recorded digest follows the new file
+    changed = build_artifacts(gsw, settings, make_games(13))
+    assert changed.pdf_inputs != first.pdf_inputs
+    changed.write(settings)
+    assert ReportBuilder._read_report_meta(report)["inputs"] == changed.pdf_inputs
+    assert open(report, "rb").read() == changed.pdf
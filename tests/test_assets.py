@@ -0,0 +1,58 @@
+import os
+
+import pytest
+from PIL import Image
+
+from nba_warriors_analysis.assets import AssetProfile, optimize_image, optimized_path
+from nba_warriors_analysis.emailer import _gather_attachments
+from nba_warriors_analysis.utils import Settings
+
+
+def _chart(path, size=(1000, 500)):
+    img = Image.new("RGBA", size, (255, 255, 255, 255))
+    for x in range(0, size[0], 7):
+        for y in range(0, size[1], 50):
+            img.putpixel((x, y), (30, 90, 200, 255))
+    img.save(path)
+    return str(path)
+
+
+def test_optimize_image_downscales_and_reuses_output(tmp_path):
+    src = _chart(tmp_path / "GSW_trend.png")
+    profile = AssetProfile(name="pdf", fmt="png8", max_width=400)
+    out = optimize_image(src, profile)
+    assert out == optimized_path(src, profile) == str(tmp_path / "pdf" / "GSW_trend.png")
+    with Image.open(out) as img:
+        assert img.size == (400, 200) and img.mode == "P"
+
+    mtime = os.stat(out).st_mtime_ns
+    assert optimize_image(src, profile) == out
+    assert os.stat(out).st_mtime_ns == mtime
+
+    jpeg = optimize_image(src, AssetProfile(name="email", fmt="jpeg", max_width=200))
+    assert jpeg.endswith(os.path.join("email", "GSW_trend.jpg"))
+    assert optimize_image(src, AssetProfile(name="pdf", fmt="original")) == src
+
+
+def test_unknown_asset_format_is_rejected():
+    with pytest.raises(ValueError):
+        AssetProfile(name="pdf", fmt="webp")
+
+
+@pytest.mark.parametrize("mode, expected", [
+    ("none", ["GSW_report.pdf"]),
+    ("thumbnails", ["GSW_report.pdf", "GSW_trend.jpg"]),
+    ("full", ["GSW_report.pdf", "GSW_trend.png"]),
+])
+def test_email_attachments_follow_chart_mode(tmp_path, monkeypatch, mode, expected):
+    plots_dir = tmp_path / "plots"
+    reports_dir = tmp_path / "reports"
+    plots_dir.mkdir()
+    reports_dir.mkdir()
+    _chart(plots_dir / "GSW_trend.png")
+    (reports_dir / "GSW_report.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.setenv("PLOTS_DIR", str(plots_dir))
+    monkeypatch.setenv("REPORTS_DIR", str(reports_dir))
+    monkeypatch.setenv("EMAIL_CHARTS", mode)
+    settings = Settings(plots_dir=str(plots_dir), reports_dir=str(reports_dir))
+    assert [os.path.basename(p) for p in _gather_attachments("GSW", settings)] == expected
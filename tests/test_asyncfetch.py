@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+from nba_warriors_analysis import analysis, asyncfetch
+
+TEAM_IDS = [1610612737, 1610612738, 1610612744, 1610612747, 1610612751, 1610612752]
+
+
+def test_fetch_many_runs_concurrently_with_retries(tmp_path, monkeypatch, make_games):
+    attempts = {}
+    lock = threading.Lock()
+
+    def _slow_find(retries, backoff_base, timeout, **params):
+        team_id = params["team_id_nullable"]
+        with lock:
+            attempts[team_id] = attempts.get(team_id, 0) + 1
+            first = attempts[team_id] == 1
+        time.sleep(0.3)
+        if team_id == 1610612744 and first:
+            raise ConnectionError("reset by peer")
+        return make_games(1, team_id=team_id)
+
+    monkeypatch.setattr(analysis, "_find_games", _slow_find)
+    started = time.perf_counter()
+    outcomes = asyncio.run(asyncfetch.fetch_many(
+        TEAM_IDS, concurrency=6, rate=0, retries=3, backoff_base=1.1, max_backoff=0.05,
+        cache_dir=str(tmp_path), ttl=3600,
+    ))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 6 * 0.3  # concurrent, not sequential
+    assert {o.status for o in outcomes.values()} == {"fetched"}
+    assert outcomes[1610612744].attempts == 2
+    assert (tmp_path / "GSW_games.parquet").exists()
+
+    # Fresh cache entries are skipped without an upstream call
+    again = asyncio.run(asyncfetch.fetch_many(TEAM_IDS, rate=0, cache_dir=str(tmp_path), ttl=3600))
+    assert {o.status for o in again.values()} == {"fresh"}
+    assert sum(attempts.values()) == len(TEAM_IDS) + 1
+
+
+def test_token_bucket_limits_rate():
+    async def _take(n):
+        bucket = asyncfetch.TokenBucket(rate=20, burst=2)
+        started = time.perf_counter()
+        await asyncio.gather(*(bucket.acquire() for _ in range(n)))
+        return time.perf_counter() - started
+
+    # Two tokens are available immediately, the other four arrive at 20/s
+    assert asyncio.run(_take(6)) >= 4 / 20 - 0.02
+
+
+def test_fetch_many_cancels_at_deadline(tmp_path, monkeypatch, make_games):
+    release = threading.Event()
+
+    def _hanging_find(retries, backoff_base, timeout, **params):
+        release.wait(5)
+        return make_games(1, team_id=params["team_id_nullable"])
+
+    monkeypatch.setattr(analysis, "_find_games", _hanging_find)
+    try:
+        outcomes = asyncio.run(asyncfetch.fetch_many(
+            TEAM_IDS[:3], rate=0, retries=2, cache_dir=str(tmp_path), ttl=0, deadline=0.2,
+        ))
+    finally:
+        release.set()
+    assert {o.status for o in outcomes.values()} == {"cancelled"}
+
+    # The upstream calls still return, but the cancelled fetches must not write the cache
+    for thread in threading.enumerate():
+        if thread.name.startswith("async-fetch"):
+            thread.join(5)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from nba_warriors_analysis.batch import resolve_team_contexts
+
+
+def test_resolve_all_teams():
+    contexts = resolve_team_contexts("ALL")
+    assert len(contexts) == 30
+    assert len({c.id for c in contexts}) == 30
+
+
+def test_resolve_team_list_and_unknown():
+    contexts = resolve_team_contexts("gsw, LAL")
+    assert [c.abbr for c in contexts] == ["GSW", "LAL"]
+    with pytest.raises(SystemExit):
+        resolve_team_contexts("GSW,XXX")
+
+
+def test_run_batch_writes_manifest_and_league_table(tmp_path, monkeypatch, make_games):
+    import json
+
+    from nba_warriors_analysis import batch, pipeline
+    from nba_warriors_analysis.store import get_store
+    from nba_warriors_analysis.utils import Settings
+
+    gsw, lal, bos = resolve_team_contexts("GSW,LAL,BOS")
+    monkeypatch.setenv("NBA_STORE_PATH", str(tmp_path / "games.sqlite"))
+    store = get_store()
+
+    def _league_fetch(team_ids):
+        # Like fetch_league_games: every team goes to the store, only GSW comes back prefetched
+        frames = {ctx.id: make_games(team_id=ctx.id) for ctx in (gsw, lal, bos)}
+        for frame in frames.values():
+            store.upsert_games(frame)
+        return {gsw.id: frames[gsw.id]}
+
+    def _fetch(team_id, **kwargs):  # per-team fallback, run inside the workers
+        if team_id == lal.id:
+            raise ConnectionError("stats.nba.com unreachable")
+        if team_id == bos.id:
+            raise SystemExit("worker crashed")  # escapes _run_team like a dying worker
+        raise AssertionError("prefetched teams must not be fetched again")
+
+    monkeypatch.setattr(batch, "fetch_league_games", _league_fetch)
+    monkeypatch.setattr(pipeline, "fetch_games", _fetch)
+    settings = Settings(data_dir=str(tmp_path / "data"), plots_dir=str(tmp_path / "plots"),
+                        reports_dir=str(tmp_path / "reports"))
+
+    manifest = batch.run_batch([gsw, lal, bos], jobs=2, settings=settings)
+
+    assert (manifest["jobs"], manifest["succeeded"], manifest["failed"]) == (2, 1, 2)
+    teams = {e["team_abbr"]: e for e in manifest["teams"]}
+    assert teams["GSW"]["status"] == "ok" and os.path.isfile(teams["GSW"]["report_path"])
+    assert teams["GSW"]["report_path"].startswith(str(tmp_path / "reports"))
+    assert teams["LAL"]["status"] == "failed"
+    assert teams["LAL"]["error"] == "stats.nba.com unreachable"
+    assert teams["BOS"] == {"team_abbr": "BOS", "team_name": "Boston Celtics", "status": "failed",
+                            "error": "worker crashed"}
+    written = json.loads((tmp_path / "reports" / "batch_manifest.json").read_text())
+    assert written["teams"] == manifest["teams"]
+
+    table = pd.read_csv(manifest["league_table"])
+    assert sorted(table["TEAM_ID"]) == sorted(c.id for c in (gsw, lal, bos))
+    assert set(table["GAMES"]) == {12}
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from nba_warriors_analysis import analysis, breaker
+from nba_warriors_analysis.breaker import CircuitBreaker, CircuitOpen
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise ConnectionError("stats.nba.com timed out")
+
+
+def test_breaker_opens_then_lets_one_probe_through(tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / "breaker.json")
+    cb = CircuitBreaker(path, failure_threshold=2, cooldown=30, clock=clock)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cb.call(_fail)
+    assert cb.state()["state"] == "open"
+    with pytest.raises(CircuitOpen):
+        cb.call(lambda: "not called")
+
+    # After the cool-down exactly one caller probes; others keep failing fast meanwhile
+    clock.now += 31
+    cb.before_call()
+    other = CircuitBreaker(path, failure_threshold=2, cooldown=30, clock=clock)
+    with pytest.raises(CircuitOpen):
+        other.before_call()
+    cb.record_success()
+    assert cb.state() == {"state": "closed", "failures": 0}
+    assert other.call(lambda: "ok") == "ok"
+
+
+def test_failed_probe_reopens_the_circuit(tmp_path):
+    clock = _Clock()
+    cb = CircuitBreaker(
+        str(tmp_path / "breaker.json"), failure_threshold=1, cooldown=10, clock=clock
+    )
+    with pytest.raises(ConnectionError):
+        cb.call(_fail)
+    clock.now += 11
+    with pytest.raises(ConnectionError):
+        cb.call(_fail)
+    state = cb.state()
+    assert state["state"] == "open" and state["opened_at"] == clock.now
+
+
+def test_open_circuit_serves_cache_without_calling_upstream(tmp_path, monkeypatch):
+    calls = []
+
+    class _DownFinder:
+        def __init__(self, **params):
+            calls.append(params)
+            raise ConnectionError("stats.nba.com timed out")
+
+    monkeypatch.setattr(analysis.leaguegamefinder, "LeagueGameFinder", _DownFinder)
+    monkeypatch.setenv("NBA_API_BREAKER_STATE", str(tmp_path / "breaker.json"))
+    monkeypatch.setenv("NBA_API_BREAKER_THRESHOLD", "2")
+    pd.DataFrame({"GAME_ID": ["0022300001"], "GAME_DATE": ["2023-10-24"], "WL": ["W"]}).to_csv(
+        tmp_path / "GSW_games.csv", index=False)
+
+    kwargs = dict(retries=5, backoff_base=0.01, cache_dir=str(tmp_path), ttl=0)
+    first = analysis.fetch_games(1610612744, **kwargs)
+    assert len(calls) == 2  # the circuit opened mid-retry instead of exhausting all 5 attempts
+    second = analysis.fetch_games(1610612744, **kwargs)
+    assert len(calls) == 2
+    assert list(first["GAME_ID"]) == list(second["GAME_ID"]) == ["0022300001"]
+    assert breaker.get_breaker().state()["state"] == "open"
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from nba_warriors_analysis import cache
+
+
+def _games():
+    return pd.DataFrame({
+        "GAME_ID": ["0022300001", "0022300002"],
+        "GAME_DATE": ["2023-10-24", "2023-10-26"],
+        "WL": ["W", "L"],
+        "PTS": [120, 101],
+    })
+
+
+def test_parquet_roundtrip_keeps_types_and_projects(tmp_path):
+    path = str(tmp_path / "GSW_games.parquet")
+    cache.write_games(_games(), path)
+
+    df = cache.read_games(path, columns=["GAME_DATE", "PTS"])
+    assert list(df.columns) == ["GAME_DATE", "PTS"]
+    assert pd.api.types.is_datetime64_any_dtype(df["GAME_DATE"])
+
+
+def test_read_team_cache_falls_back_to_legacy_csv(tmp_path):
+    _games().to_csv(tmp_path / "GSW_games.csv", index=False)
+    paths = cache.team_cache_paths(1610612744, "GSW", str(tmp_path), fmt="parquet")
+
+    df, path = cache.read_team_cache(paths)
+    assert path.endswith("GSW_games.csv")
+    assert pd.api.types.is_datetime64_any_dtype(df["GAME_DATE"])
+    assert df["GAME_ID"].iloc[0] == "0022300001"
+
+
+def test_cache_is_stale_when_file_no_longer_matches_its_checksum(tmp_path):
+    paths = cache.team_cache_paths(1610612744, "GSW", str(tmp_path), fmt="csv")
+    cache.write_team_cache(_games(), paths)
+    assert cache.fresh_cache_path(paths, ttl=3600) == paths[0]
+
+    # Same row count, different contents: only the checksum catches it
+    _games().assign(PTS=[99, 98]).to_csv(paths[0], index=False)
+    assert cache.cache_age(paths[0], rows=2) == float("inf")
+    assert cache.fresh_cache_path(paths, ttl=3600) == paths[1]
@@ -0,0 +1,114 @@
+import io
+import socketserver
+import threading
+
+import pytest
+
+from nba_warriors_analysis.emailer import BatchMailer, EmailError, SummaryEmail, send_summary_email
+from nba_warriors_analysis.utils import Settings
+
+
+class _SMTPStub(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: refuses recipients containing "reject", can drop a DATA."""
+
+    connections = 0
+    messages = []
+    drop_next_data = False
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        _SMTPStub.connections += 1
+        self._reply("220 stub ready")
+        rcpts = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            verb = line.split(" ", 1)[0].upper()
+            if not line or verb == "QUIT":
+                self._reply("221 bye")
+                return
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 stub")
+            elif verb == "MAIL":
+                rcpts = []
+                self._reply("250 ok")
+            elif verb == "RCPT":
+                if "reject" in line:
+                    self._reply("550 no such user")
+                else:
+                    rcpts.append(line.split(":", 1)[1].strip(" <>"))
+                    self._reply("250 ok")
+            elif verb == "DATA":
+                if _SMTPStub.drop_next_data:
+                    _SMTPStub.drop_next_data = False
+                    return  # connection lost mid-transaction
+                self._reply("354 go ahead")
+                body = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    body.append(data)
+                _SMTPStub.messages.append((list(rcpts), b"".join(body)))
+                self._reply("250 queued")
+            else:  # RSET, NOOP
+                self._reply("250 ok")
+
+
+@pytest.fixture()
+def smtp_stub():
+    _SMTPStub.connections, _SMTPStub.messages, _SMTPStub.drop_next_data = 0, [], False
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPStub)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield {"host": "127.0.0.1", "port": server.server_address[1], "smtp_ssl": False,
+           "smtp_starttls": False, "smtp_skip_login": True}
+    server.shutdown()
+    server.server_close()
+
+
+def _email(abbr, recipients):
+    pdf = io.BytesIO(b"%PDF-1.4 stub")
+    pdf.name = f"{abbr}_report.pdf"
+    subject = f"{abbr} – Weekly Report"
+    return SummaryEmail(abbr, tuple(recipients), subject, "<p>summary</p>", (pdf,))
+
+
+def test_batch_mailer_reuses_connections_and_reports_per_recipient(smtp_stub):
+    emails = [
+        _email(abbr, ["coach@example.com", "reject@example.com"])
+        for abbr in ("GSW", "LAL", "BOS", "NYK", "MIA", "CHI")
+    ]
+    with BatchMailer(
+        "reports@example.com", None, workers=2, retries=2, backoff_base=0, smtp_options=smtp_stub
+    ) as mailer:
+        deliveries = mailer.send_all(emails)
+
+    assert len(_SMTPStub.messages) == 6
+    assert _SMTPStub.connections <= 2  # one login per worker, not per email
+    assert [(d.team_abbr, d.recipient, d.status) for d in deliveries[:2]] == [
+        ("GSW", "coach@example.com", "delivered"),
+        ("GSW", "reject@example.com", "failed"),
+    ]
+    assert deliveries[1].error.startswith("550")
+    assert sum(d.status == "delivered" for d in deliveries) == 6
+
+
+def test_batch_mailer_reconnects_and_retries_dropped_connections(smtp_stub):
+    _SMTPStub.drop_next_data = True
+    with BatchMailer(
+        "reports@example.com", None, workers=1, retries=3, backoff_base=0, smtp_options=smtp_stub
+    ) as mailer:
+        (delivery,) = mailer.send_all([_email("GSW", ["coach@example.com"])])
+
+    assert (delivery.status, delivery.attempts) == ("delivered", 2)
+    assert _SMTPStub.connections == 2
+    assert b"GSW_report.pdf" in _SMTPStub.messages[0][1]
+
+
+def test_send_summary_email_raises_email_error_instead_of_exiting(tmp_path):
+    with pytest.raises(EmailError, match="EMAIL_USER"):
+        send_summary_email(
+            Settings(email_user=None, email_pass=None), "GSW", "Golden State Warriors"
+        )
+    with pytest.raises(EmailError, match="Summary CSV"):
+        settings = Settings(email_user="me@x", email_pass="pw", data_dir=str(tmp_path))
+        send_summary_email(settings, "GSW", "Golden State Warriors")
@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+
+from nba_warriors_analysis import analysis, cache
+
+
+class _FakeFinder:
+    calls = []
+
+    def __init__(self, timeout=None, **params):
+        _FakeFinder.calls.append(params)
+
+    def get_data_frames(self):
+        return [pd.DataFrame({
+            "TEAM_ID": [1610612744, 1610612747, 1610612744, 999],
+            "GAME_ID": ["0022300001", "0022300001", "0022300002", "0022300003"],
+            "GAME_DATE": ["2023-10-24", "2023-10-24", "2023-10-26", "2023-10-26"],
+            "WL": ["W", "L", "L", "W"],
+        })]
+
+
+def test_fetch_league_games_extends_cached_histories_only(tmp_path, monkeypatch):
+    _FakeFinder.calls = []
+    monkeypatch.setattr(analysis.leaguegamefinder, "LeagueGameFinder", _FakeFinder)
+    gsw_paths = cache.team_cache_paths(1610612744, "GSW", str(tmp_path))
+    cache.write_team_cache(pd.DataFrame({
+        "TEAM_ID": [1610612744], "GAME_ID": ["0022300000"],
+        "GAME_DATE": pd.to_datetime(["2023-10-20"]), "WL": ["W"],
+    }), gsw_paths)
+
+    frames = analysis.fetch_league_games(team_ids=[1610612744, 1610612747], seasons=["2023-24"],
+                                         cache_dir=str(tmp_path))
+
+    assert [c["season_nullable"] for c in _FakeFinder.calls] == ["2023-24"]
+    # GSW's cached history is extended; LAL has none, so it is left to a per-team fetch
+    assert set(frames) == {1610612744}
+    assert len(frames[1610612744]) == 3 and len(cache.read_team_cache(gsw_paths)[0]) == 3
+    assert not (tmp_path / "LAL_games.parquet").exists()
+
+
+def test_recent_seasons_default_to_current_and_previous():
+    from datetime import date
+
+    assert analysis.recent_seasons(today=date(2026, 10, 17)) == ["2025-26", "2026-27"]
+    assert analysis.recent_seasons(today=date(2026, 3, 1)) == ["2024-25", "2025-26"]
+    assert analysis.recent_seasons(1, today=date(1999, 12, 1)) == ["1999-00"]
+
+
+def test_fetch_games_incremental_appends_new_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("NBA_API_CACHE_FORMAT", "csv")
+    pd.DataFrame({
+        "TEAM_ID": [1610612744, 1610612744],
+        "GAME_ID": ["0022300001", "0022300002"],
+        "GAME_DATE": ["2023-10-24", "2023-10-26"],
+        "WL": ["W", "L"],
+    }).to_csv(tmp_path / "GSW_games.csv", index=False)
+    requested = {}
+
+    class _DeltaFinder:
+        def __init__(self, timeout=None, **params):
+            requested.update(params)
+
+        def get_data_frames(self):
+            return [pd.DataFrame({
+                "TEAM_ID": [1610612744, 1610612744],
+                "GAME_ID": ["0022300002", "0022300003"],
+                "GAME_DATE": ["2023-10-26", "2023-10-28"],
+                "WL": ["L", "W"],
+            })]
+
+    monkeypatch.setattr(analysis.leaguegamefinder, "LeagueGameFinder", _DeltaFinder)
+    df = analysis.fetch_games(
+        1610612744, retries=1, cache_dir=str(tmp_path), incremental=True, ttl=0
+    )
+
+    assert requested["date_from_nullable"] == "10/26/2023"
+    assert list(df["WL"]) == ["W", "L", "W"]
+    assert len(pd.read_csv(tmp_path / "GSW_games.csv")) == 3
+    # The id-named cache did not exist yet, so it gets the full merged history
+    assert len(pd.read_csv(tmp_path / "games_1610612744.csv")) == 3
+
+
+def test_fetch_games_serves_fresh_cache_without_network(tmp_path, monkeypatch):
+    df = _FakeFinder().get_data_frames()[0]
+    paths = cache.team_cache_paths(1610612744, "GSW", str(tmp_path))
+    cache.write_team_cache(df[df["TEAM_ID"] == 1610612744], paths)
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("fresh cache should not hit the network")
+
+    monkeypatch.setattr(analysis.leaguegamefinder, "LeagueGameFinder", _no_network)
+    fresh = analysis.fetch_games(1610612744, cache_dir=str(tmp_path), ttl=3600)
+    assert len(fresh) == 2
+    assert pd.api.types.is_datetime64_any_dtype(fresh["GAME_DATE"])
+
+    refreshed = []
+    monkeypatch.setattr(
+        analysis, "_revalidate_in_background", lambda team_id, **kw: refreshed.append(team_id)
+    )
+    stale = analysis.fetch_games(
+        1610612744, cache_dir=str(tmp_path), ttl=1e-9, stale_while_revalidate=True
+    )
+    assert len(stale) == 2
+    assert refreshed == [1610612744]
+
+
+def test_fetch_games_refetches_stale_cache_synchronously_by_default(tmp_path, monkeypatch):
+    df = _FakeFinder().get_data_frames()[0]
+    paths = cache.team_cache_paths(1610612744, "GSW", str(tmp_path))
+    first_game = df[(df["TEAM_ID"] == 1610612744) & (df["GAME_ID"] == "0022300001")]
+    cache.write_team_cache(first_game, paths)
+
+    def _no_background(*args, **kwargs):
+        raise AssertionError("one-shot callers must not revalidate in the background")
+
+    monkeypatch.setattr(analysis, "_revalidate_in_background", _no_background)
+    monkeypatch.setattr(analysis.leaguegamefinder, "LeagueGameFinder", _FakeFinder)
+    games = analysis.fetch_games(1610612744, retries=1, cache_dir=str(tmp_path), ttl=1e-9)
+    # The caller gets the refetched rows and the cache is updated before fetch_games returns
+    assert len(games) == 4
+    assert len(cache.read_team_cache(paths)[0]) == 4
+
+
+def test_fetch_games_offline_without_cache_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        analysis.fetch_games(1610612744, cache_dir=str(tmp_path), offline=True)
@@ -0,0 +1,86 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nba_warriors_analysis import analysis, httpclient
+
+CSV = "GAME_ID,GAME_DATE,WL,PTS\n22300001,2023-10-24,W,110\n22300002,2023-10-26,L,99\n"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    seen = []
+
+    def do_GET(self):
+        _StubHandler.seen.append(
+            (self.path, self.client_address[1], self.headers.get("Accept-Encoding"))
+        )
+        if self.path != "/GSW_games.csv":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = CSV.encode()
+        gzipped = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server():
+    _StubHandler.seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    httpclient.reset_session()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    httpclient.reset_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connections_and_decodes_gzip(stub_server):
+    session = httpclient.get_session()
+    assert session is httpclient.get_session()
+    for _ in range(3):
+        resp = session.get(f"{stub_server}/GSW_games.csv", timeout=5)
+        assert resp.text == CSV
+
+    ports = {port for _, port, _ in _StubHandler.seen}
+    assert len(ports) == 1  # one TCP connection, kept alive
+    assert all(enc == "gzip, deflate" for _, _, enc in _StubHandler.seen)
+
+
+def test_session_is_shared_with_nba_api():
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    httpclient.reset_session()
+    session = httpclient.get_session()
+    assert NBAStatsHTTP.get_session() is session
+    assert httpclient.stats_headers()["Accept-Encoding"] == "gzip, deflate"
+
+
+def test_remote_cache_fallback_uses_pooled_session(stub_server, tmp_path, monkeypatch):
+    def _down(*args, **kwargs):
+        raise ConnectionError("stats.nba.com unreachable")
+
+    monkeypatch.setattr(analysis, "_find_games", _down)
+    monkeypatch.setenv("NBA_API_REMOTE_CACHE_BASEURL", stub_server)
+    df = analysis.fetch_games(
+        1610612744, retries=1, cache_dir=str(tmp_path), use_cache_on_failure=False, ttl=0
+    )
+
+    assert list(df["GAME_ID"]) == ["0022300001", "0022300002"]
+    assert [path for path, _, _ in _StubHandler.seen] == ["/GSW_games.csv"]
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("pandas", "matplotlib", "seaborn", "fpdf", "nba_api.stats.endpoints")
+
+# Cumulative import time allowed per entry module, in ms (override for slow CI machines)
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1000"))
+
+
+def _import_profile(module):
+    code = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    # -X importtime writes "import time: self | cumulative | name" lines (µs) to stderr
+    lines = [line for line in proc.stderr.splitlines() if line.startswith("import time:")]
+    cumulative = {
+        parts[2].strip(): int(parts[1])
+        for parts in (line.split("|") for line in lines)
+        if parts[1].strip().isdigit()
+    }
+    return proc.stdout.strip(), cumulative[module] / 1000
+
+
+@pytest.mark.parametrize(
+    "module", ["nba_warriors_analysis", "nba_warriors_analysis.cli", "nba_warriors_analysis.webapp"]
+)
+def test_entry_points_import_lazily_within_budget(module):
+    heavy, elapsed_ms = _import_profile(module)
+    assert heavy == "", f"{module} imports {heavy} eagerly"
+    assert elapsed_ms < BUDGET_MS, (
+        f"{module} took {elapsed_ms:.0f} ms to import (budget {BUDGET_MS:.0f} ms)"
+    )
+
+
+def test_lazy_public_names_resolve():
+    import nba_warriors_analysis as pkg
+
+    assert pkg.ReportBuilder.__name__ == "ReportBuilder"
+    assert "fetch_games" in dir(pkg)
+    with pytest.raises(AttributeError):
+        pkg.not_a_name
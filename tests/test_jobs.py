@@ -0,0 +1,101 @@
+import threading
+
+from nba_warriors_analysis.jobs import JobQueue
+
+
+def _wait(queue, job_id):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job.done:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_queue_dedupes_inflight_keys():
+    release = threading.Event()
+    calls = []
+
+    def work(x):
+        calls.append(x)
+        release.wait(5)
+        return x * 2
+
+    queue = JobQueue(max_workers=2)
+    first = queue.submit("GSW", work, 21)
+    second = queue.submit("GSW", work, 21)
+    assert first.id == second.id
+
+    release.set()
+    job = _wait(queue, first.id)
+    assert job.status == "succeeded"
+    assert job.result == 42
+    assert calls == [21]
+
+    # Once finished, the same key runs again as a fresh job
+    third = queue.submit("GSW", work, 1)
+    assert third.id != first.id
+    queue.shutdown()
+
+
+def test_job_queue_records_failures():
+    def boom():
+        raise ValueError("no games")
+
+    queue = JobQueue(max_workers=1)
+    job = _wait(queue, queue.submit("LAL", boom).id)
+    assert job.status == "failed"
+    assert job.error
+    queue.shutdown()
+
+
+def _worker_process(state_dir, started, release):
+    queue = JobQueue(max_workers=1, state_dir=state_dir)
+    job = queue.submit("GSW", lambda: (release.wait(10), {"team_abbr": "GSW"})[1])
+    started.put(job.id)
+    _wait(queue, job.id)
+    queue.shutdown()
+
+
+def test_job_records_are_shared_between_processes(tmp_path):
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("fork")
+    started, release = ctx.Queue(), ctx.Event()
+    other = ctx.Process(target=_worker_process, args=(str(tmp_path), started, release))
+    other.start()
+    try:
+        job_id = started.get(timeout=10)
+        queue = JobQueue(max_workers=1, state_dir=str(tmp_path))
+        # Another worker's in-flight job is visible here and deduplicates the same key
+        assert queue.get(job_id).status in ("queued", "running")
+        assert queue.submit("GSW", lambda: None).id == job_id
+        release.set()
+        other.join(10)
+        job = queue.get(job_id)
+        assert job.status == "succeeded" and job.result == {"team_abbr": "GSW"}
+        assert queue.get("../etc/passwd") is None
+        queue.shutdown()
+    finally:
+        release.set()
+        other.join(10)
+
+
+def test_pruning_keeps_records_of_running_jobs(tmp_path):
+    import os
+
+    release = threading.Event()
+    queue = JobQueue(max_workers=2, max_history=1, state_dir=str(tmp_path))
+    running = queue.submit("GSW", release.wait, 10)
+    record = tmp_path / "jobs" / f"{running.id}.json"
+    os.utime(record, (1, 1))  # the oldest record, first in line for pruning
+    try:
+        for key in ("LAL", "BOS"):
+            _wait(queue, queue.submit(key, lambda: None).id)
+        os.utime(record, (1, 1))
+        queue.submit("NYK", lambda: None)
+        assert record.exists()
+        assert JobQueue(state_dir=str(tmp_path)).get(running.id).status in ("queued", "running")
+    finally:
+        release.set()
+        queue.shutdown()
@@ -0,0 +1,51 @@
+import os
+
+from nba_warriors_analysis.plotting import CHART_BUILDERS, generate_all_charts, load_chart_manifest
+from nba_warriors_analysis.utils import Settings
+
+
+def test_generate_all_charts_serial_and_parallel_match(tmp_path, make_games):
+    settings = Settings(plots_dir=str(tmp_path))
+    serial = generate_all_charts(make_games(), "GSW", settings, workers=1, use_cache=False)
+    parallel = generate_all_charts(make_games(), "GSW", settings, workers=2, use_cache=False)
+
+    assert serial == parallel
+    expected = [f"GSW_{name}.png" for name, _ in CHART_BUILDERS]
+    assert [os.path.basename(p) for p in serial] == expected
+    assert all(os.path.getsize(p) > 0 for p in serial)
+
+
+def test_generate_all_charts_reuses_unchanged_pngs(tmp_path, make_games):
+    settings = Settings(plots_dir=str(tmp_path))
+    paths = generate_all_charts(make_games(), "GSW", settings, use_cache=True)
+    mtimes = [os.path.getmtime(p) for p in paths]
+
+    again = generate_all_charts(make_games(), "GSW", settings, use_cache=True)
+    manifest = load_chart_manifest(str(tmp_path), "GSW")
+    assert again == paths
+    assert [os.path.getmtime(p) for p in again] == mtimes
+    assert manifest["last_run"]["misses"] == []
+
+    changed = make_games()
+    changed.loc[0, "REB"] = 99
+    generate_all_charts(changed, "GSW", settings, use_cache=True)
+    manifest = load_chart_manifest(str(tmp_path), "GSW")
+    assert manifest["last_run"]["misses"] == ["box_reb_opp", "scatter_pts_reb"]
+
+
+def test_concurrent_manifest_updates_are_atomic(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from nba_warriors_analysis.plotting import save_charts
+
+    settings = Settings(plots_dir=str(tmp_path))
+
+    def _save(i):
+        entries = {f"c{i}": {"key": str(i), "hit": False}}
+        save_charts({f"c{i}": b"\x89PNG"}, entries, "GSW", settings)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_save, range(32)))
+    manifest = load_chart_manifest(str(tmp_path), "GSW")
+    assert sorted(manifest["charts"]) == sorted(f"c{i}" for i in range(32))
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
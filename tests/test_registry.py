@@ -0,0 +1,19 @@
+from nba_warriors_analysis.analysis import find_team_context, list_teams_sorted
+from nba_warriors_analysis.registry import get_registry
+
+
+def test_registry_lookups():
+    registry = get_registry()
+    gsw = registry.by_abbr("gsw")
+    assert gsw.name == "Golden State Warriors"
+    assert registry.by_id(gsw.id) is gsw
+    assert registry.by_nickname("Warriors") is gsw
+    assert registry.by_abbr("XXX") is None
+
+
+def test_registry_is_built_once_and_sorted():
+    assert get_registry() is get_registry()
+    names = [t["full_name"] for t in list_teams_sorted()]
+    assert names == sorted(names)
+    idx = next(i for i, t in enumerate(list_teams_sorted()) if t["abbreviation"] == "LAL")
+    assert find_team_context(idx).abbr == "LAL"
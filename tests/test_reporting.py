@@ -11,7 +11,9 @@ def test_report_builder_no_plots(tmp_path, monkeypatch):
     data_dir = tmp_path / "data"
     plots_dir = tmp_path / "plots"
     reports_dir = tmp_path / "reports"
-    data_dir.mkdir(); plots_dir.mkdir(); reports_dir.mkdir()
+    data_dir.mkdir()
+    plots_dir.mkdir()
+    reports_dir.mkdir()
 
     summary_path = data_dir / "GSW_summary.csv"
     pd.Series({"Wins": 1}).to_csv(summary_path)
@@ -25,3 +27,54 @@ def test_report_builder_no_plots(tmp_path, monkeypatch):
     # No plots: should return None and not crash
     rb = ReportBuilder(settings)
     assert rb.build_pdf(team_abbr="GSW", team_name="Golden State Warriors") is None
+
+
+def _report_inputs(tmp_path):
+    from PIL import Image
+
+    data_dir = tmp_path / "data"
+    plots_dir = tmp_path / "plots"
+    data_dir.mkdir()
+    plots_dir.mkdir()
+    summary_path = data_dir / "GSW_summary.csv"
+    pd.Series({"Wins": 3, "Losses": 1}).to_csv(summary_path)
+    for i, name in enumerate(["trend", "pts_dist", "fg_pct"]):
+        Image.new("RGB", (40, 30), (i * 60, 100, 200)).save(plots_dir / f"GSW_{name}.png")
+    return summary_path, plots_dir
+
+
+def test_report_skips_unchanged_builds(tmp_path):
+    summary_path, plots_dir = _report_inputs(tmp_path)
+    out = tmp_path / "reports" / "GSW_report.pdf"
+    kwargs = dict(
+        team_abbr="GSW", team_name="Golden State Warriors", summary_file=str(summary_path),
+        plots_dir=str(plots_dir), output_path=str(out),
+    )
+
+    assert ReportBuilder(Settings()).build_pdf(**kwargs) == str(out)
+    meta = ReportBuilder._read_report_meta(str(out))
+    assert meta["charts"] == 3
+
+    # Unchanged inputs: the existing PDF is returned without a rebuild
+    mtime = os.stat(out).st_mtime_ns
+    assert ReportBuilder(Settings()).build_pdf(**kwargs) == str(out)
+    assert os.stat(out).st_mtime_ns == mtime
+
+    # Any changed input rebuilds the whole document
+    pd.Series({"Wins": 4, "Losses": 1}).to_csv(summary_path)
+    assert ReportBuilder(Settings()).build_pdf(**kwargs) == str(out)
+    assert os.stat(out).st_mtime_ns != mtime
+    assert ReportBuilder._read_report_meta(str(out))["inputs"] != meta["inputs"]
+    assert out.read_bytes().startswith(b"%PDF")
+
+
+def test_report_cache_can_be_disabled(tmp_path):
+    summary_path, plots_dir = _report_inputs(tmp_path)
+    out = tmp_path / "GSW_report.pdf"
+    builder = ReportBuilder(Settings(), use_cache=False)
+    kwargs = dict(team_abbr="GSW", team_name="GSW", summary_file=str(summary_path),
+                  plots_dir=str(plots_dir), output_path=str(out))
+    builder.build_pdf(**kwargs)
+    out.write_bytes(b"stale")
+    builder.build_pdf(**kwargs)
+    assert out.read_bytes().startswith(b"%PDF")
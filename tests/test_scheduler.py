@@ -0,0 +1,105 @@
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from nba_warriors_analysis.scheduler import CronSchedule, Scheduler
+
+
+def test_cron_parsing_and_next_fire():
+    monday_9am = CronSchedule.parse("0 9 * * mon")
+    assert monday_9am.next_after(datetime(2024, 1, 1, 9, 0)) == datetime(2024, 1, 8, 9, 0)
+
+    every_15 = CronSchedule.parse("*/15 8-10 * * 1-5")
+    # Fri → Mon
+    assert every_15.next_after(datetime(2024, 1, 5, 10, 50)) == datetime(2024, 1, 8, 8, 0)
+
+    # Both day fields restricted: either may match (the 1st, or any Sunday)
+    either = CronSchedule.parse("0 0 1 * 0")
+    assert either.next_after(datetime(2024, 1, 2)) == datetime(2024, 1, 7)
+    assert CronSchedule.parse("@monthly").next_after(datetime(2024, 12, 15)) == datetime(2025, 1, 1)
+
+    for bad in ("* * *", "61 * * * *", "*/0 * * * *"):
+        with pytest.raises(ValueError):
+            CronSchedule.parse(bad)
+
+
+def test_scheduler_skips_overlaps_and_persists_state(tmp_path):
+    now = [datetime(2024, 1, 1, 8, 59)]
+    gate = threading.Event()
+    calls = []
+
+    def _job():
+        calls.append(now[0])
+        gate.wait(5)
+
+    state_path = str(tmp_path / "state.json")
+    sched = Scheduler(
+        CronSchedule.parse("* * * * *"), {"GSW": _job}, state_path, clock=lambda: now[0]
+    )
+    assert sched.tick() == []  # nothing due yet
+
+    now[0] = datetime(2024, 1, 1, 9, 0)
+    assert sched.tick() == ["GSW"]
+    now[0] = datetime(2024, 1, 1, 9, 1)
+    assert sched.tick() == []  # previous run still going
+    gate.set()
+    sched.wait()
+    sched.shutdown()
+
+    state = json.load(open(state_path))
+    assert state["last_fire"] == "2024-01-01T09:01:00"
+    assert state["jobs"]["GSW"]["status"] == "succeeded"
+    assert len(calls) == 1
+
+
+def test_restart_coalesces_recent_misfires_and_drops_old_ones(tmp_path):
+    state_path = tmp_path / "state.json"
+    state_path.write_text(json.dumps({"cron": "0 * * * *", "last_fire": "2024-01-01T06:00:00"}))
+    calls = []
+    schedule = CronSchedule.parse("0 * * * *")
+
+    # Three hourly fires missed; the latest is 10 minutes old → one catch-up run
+    recent = Scheduler(
+        schedule, {"GSW": lambda: calls.append(1)}, str(state_path), misfire_grace=900,
+        clock=lambda: datetime(2024, 1, 1, 9, 10),
+    )
+    assert recent.tick() == ["GSW"]
+    recent.wait()
+    recent.shutdown()
+
+    # Latest missed fire is 50 minutes old, beyond the grace period → skipped
+    late = Scheduler(schedule, {"GSW": lambda: calls.append(2)}, str(state_path), misfire_grace=900,
+                     clock=lambda: datetime(2024, 1, 1, 12, 50))
+    assert late.tick() == []
+    late.shutdown()
+    assert calls == [1]
+    assert json.load(open(state_path))["last_fire"] == "2024-01-01T12:00:00"
+
+
+def test_scheduled_runs_refetch_and_email_only_with_credentials(tmp_path, monkeypatch):
+    from nba_warriors_analysis import analysis, pipeline, scheduler
+    from nba_warriors_analysis.utils import Settings
+
+    monkeypatch.delenv("SCHEDULE_EMAIL", raising=False)
+    monkeypatch.setenv("SCHEDULE_STATE", str(tmp_path / "state.json"))
+    fetched, ran = [], []
+    monkeypatch.setattr(
+        analysis, "fetch_games", lambda team_id, **kw: fetched.append(kw) or "games"
+    )
+    monkeypatch.setattr(pipeline, "run_team_pipeline", lambda ctx, settings, **kw: ran.append(kw))
+
+    sched = scheduler.build_scheduler("@daily", "GSW", Settings(email_user=None, email_pass=None))
+    assert sched._on_shutdown is None  # no credentials → no mailer
+    sched.run_now()
+    sched.wait()
+    sched.shutdown()
+    assert fetched == [{"ttl": 0}]
+    assert ran[0]["games"] == "games" and ran[0]["send_email"] is False
+
+    with_creds = scheduler.build_scheduler(
+        "@daily", "GSW", Settings(email_user="me@x", email_pass="pw")
+    )
+    assert with_creds._on_shutdown is not None
+    with_creds.shutdown()
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from nba_warriors_analysis import analysis, cache
+from nba_warriors_analysis.singleflight import SingleFlight
+
+
+def test_single_flight_shares_result_and_errors():
+    flights = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def _slow(value):
+        calls.append(value)
+        gate.wait(2)
+        return value * 2
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flights.do, "k", _slow, 21) for _ in range(4)]
+        while not flights.in_flight("k"):
+            time.sleep(0.01)
+        time.sleep(0.1)
+        gate.set()
+        results = [f.result() for f in futures]
+    assert calls == [21]
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert {value for value, _ in results} == {42}
+
+    def _boom():
+        raise ValueError("upstream error")
+
+    with pytest.raises(ValueError):
+        flights.do("k", _boom)
+    assert not flights.in_flight("k")
+
+
+def test_concurrent_fetch_games_share_one_upstream_call(tmp_path, monkeypatch, make_games):
+    calls = []
+
+    def _slow_find(retries, backoff_base, timeout, **params):
+        calls.append(params)
+        time.sleep(0.3)
+        return make_games(1)
+
+    monkeypatch.setattr(analysis, "_find_games", _slow_find)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        frames = list(pool.map(
+            lambda _: analysis.fetch_games(1610612744, cache_dir=str(tmp_path), ttl=0), range(3)
+        ))
+
+    assert len(calls) == 1
+    assert all(f.equals(frames[0]) for f in frames)
+    assert len({id(f) for f in frames}) == 3  # followers get their own copy
+    leftovers = [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+    assert leftovers == [] and (tmp_path / "GSW_games.parquet").exists()
+
+
+def test_csv_append_replaces_file_atomically(tmp_path):
+    path = str(tmp_path / "GSW_games.csv")
+    existing = pd.DataFrame({"GAME_ID": ["0022300001"], "GAME_DATE": ["2023-10-24"], "WL": ["W"]})
+    existing.to_csv(path, index=False)
+    new_rows = pd.DataFrame({"GAME_ID": ["0022300002"], "GAME_DATE": ["2023-10-26"], "WL": ["L"]})
+    inode = os.stat(path).st_ino
+
+    cache.append_team_cache(new_rows, pd.concat([existing, new_rows]), existing, [path])
+
+    assert os.stat(path).st_ino != inode  # swapped in, not written in place
+    assert list(cache.read_games(path)["GAME_ID"]) == ["0022300001", "0022300002"]
+    assert cache.read_cache_meta(path)["rows"] == 2
@@ -0,0 +1,77 @@
+import pandas as pd
+
+from nba_warriors_analysis import analysis
+from nba_warriors_analysis.store import GameStore
+
+
+def _games(team_id, abbr, rows):
+    return pd.DataFrame([
+        {
+            "SEASON_ID": season, "TEAM_ID": team_id, "TEAM_ABBREVIATION": abbr, "GAME_ID": gid,
+            "GAME_DATE": pd.Timestamp(day), "MATCHUP": matchup, "WL": wl, "PTS": pts, "REB": 40,
+            "FG_PCT": 0.5,
+        }
+        for season, gid, day, matchup, wl, pts in rows
+    ])
+
+
+def test_store_upserts_and_answers_indexed_queries(tmp_path):
+    store = GameStore(str(tmp_path / "games.sqlite"))
+    gsw = _games(1610612744, "GSW", [
+        ("22022", "0022200001", "2022-10-18", "GSW vs. LAL", "W", 123),
+        ("22023", "0022300001", "2023-10-24", "GSW @ PHX", "L", 104),
+        ("22023", "0022300002", "2023-12-25", "GSW vs. LAL", "W", 120),
+    ])
+    lal = _games(1610612747, "LAL", [("22023", "0022300002", "2023-12-25", "LAL @ GSW", "L", 110)])
+    assert store.upsert_games(gsw) == 3
+    store.upsert_games(lal)
+    # Re-upserting the same game replaces it rather than duplicating
+    store.upsert_games(gsw.tail(1).assign(PTS=121))
+    assert store.count() == 4
+
+    h2h = store.head_to_head(1610612744, "lal", since="2023-01-01")
+    assert h2h["GAME_ID"].tolist() == ["0022300002"]
+    assert h2h["PTS"].tolist() == [121]
+    assert h2h["HOME"].tolist() == [1]
+    assert pd.api.types.is_datetime64_any_dtype(h2h["GAME_DATE"])
+
+    summary = store.season_summary([1610612744], season="22023").iloc[0]
+    assert (summary["GAMES"], summary["WINS"], summary["LOSSES"]) == (2, 1, 1)
+
+    league = store.league_averages().set_index("SEASON_ID")
+    assert league.loc["22023", "TEAMS"] == 2
+    assert league.loc["22023", "PTS"] == (104 + 121 + 110) / 3
+
+
+def test_fetch_games_populates_store(tmp_path, monkeypatch):
+    fetched = _games(1610612744, "GSW", [
+        ("22023", "0022300001", "2023-10-24", "GSW @ PHX", "L", 104),
+    ])
+    monkeypatch.setattr(analysis, "_find_games", lambda *a, **k: fetched.copy())
+    analysis.fetch_games(
+        1610612744, cache_dir=str(tmp_path), ttl=0, offline=False, incremental=False
+    )
+
+    stored = GameStore(str(tmp_path / "games.sqlite")).head_to_head(1610612744, "PHX")
+    assert stored["GAME_ID"].tolist() == ["0022300001"]
+
+
+def test_store_is_cached_per_process_and_builds_league_table(tmp_path):
+    from nba_warriors_analysis.store import get_store, league_table
+
+    store = get_store(str(tmp_path / "games.sqlite"))
+    assert get_store(str(tmp_path / "games.sqlite")) is store
+
+    store.upsert_games(_games(1610612744, "GSW", [
+        ("22023", "0022300001", "2023-10-24", "GSW @ PHX", "L", 104),
+        ("22024", "0022400001", "2024-10-23", "GSW vs. LAL", "W", 120),
+        ("42024", "0042400001", "2025-04-20", "GSW @ HOU", "W", 95),  # playoffs are not compared
+    ]))
+    store.upsert_games(_games(1610612747, "LAL", [
+        ("22024", "0022400001", "2024-10-23", "LAL @ GSW", "L", 110),
+        ("22024", "0022400002", "2024-10-25", "LAL vs. PHX", "W", 115),
+    ]))
+    table = league_table([1610612744, 1610612747], store=store)
+    assert table["SEASON_ID"].unique().tolist() == ["22024"]
+    assert table["TEAM_ABBREVIATION"].tolist() == ["GSW", "LAL"]
+    assert table["WIN_PCT"].tolist() == [1.0, 0.5]
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+
+import pytest
+
+from nba_warriors_analysis import tracing
+from nba_warriors_analysis.pipeline import run_team_pipeline
+from nba_warriors_analysis.utils import Settings
+
+
+def test_run_trace_records_stages_and_errors():
+    trace = tracing.RunTrace("GSW", track_memory=True)
+    with tracing.stage("outside"):  # no active trace: nothing recorded
+        pass
+    with tracing.activate(trace):
+        with tracing.stage("build", rows=3) as record:
+            record["items"] = len([0] * 100_000)
+        with pytest.raises(ValueError):
+            with tracing.stage("send"):
+                raise ValueError("smtp down")
+    assert tracing.current() is None
+
+    build, send = trace.stages
+    assert (build["stage"], build["rows"], build["items"]) == ("build", 3, 100_000)
+    assert build["wall_s"] >= 0 and build["cpu_s"] >= 0 and build["alloc_peak_mb"] > 0
+    assert send["error"] == "smtp down"
+
+
+def test_pipeline_writes_run_report_and_profile(tmp_path, monkeypatch, gsw, make_games):
+    monkeypatch.setenv("CHART_CACHE", "1")
+    settings = Settings(data_dir=str(tmp_path / "data"), plots_dir=str(tmp_path / "plots"),
+                        reports_dir=str(tmp_path / "reports"))
+    with tracing.profiled(str(tmp_path / "reports" / "GSW_profile")):
+        result = run_team_pipeline(
+            gsw, settings, include_trend=True, update_env=False, games=make_games(8), persist=True
+        )
+
+    assert os.path.dirname(result.run_report_path) == os.path.dirname(result.report_path)
+    report = json.load(open(result.run_report_path))
+    assert [s["stage"] for s in report["stages"]] == ["fetch", "summary", "charts", "pdf", "write"]
+    assert set(result.timings) == {"fetch", "summary", "charts", "pdf", "write"}
+    assert "trend" in report["charts"] and not report["charts"]["trend"]["cached"]
+    assert (tmp_path / "reports" / "GSW_profile.prof").exists()
+
+    # Second run: charts come from the cache and are reported as such
+    rerun = run_team_pipeline(
+        gsw, settings, include_trend=True, update_env=False, games=make_games(8), persist=True
+    )
+    assert all(c["cached"] for c in json.load(open(rerun.run_report_path))["charts"].values())
+
+
+def test_concurrent_runs_share_profiling_and_memory_tracking(tmp_path):
+    import threading
+    import tracemalloc
+    from concurrent.futures import ThreadPoolExecutor
+
+    inside, overlap = threading.Lock(), []
+
+    def _profiled_run(i):
+        with tracing.profiled(str(tmp_path / f"run{i}")):
+            acquired = inside.acquire(blocking=False)
+            overlap.append(acquired)
+            time.sleep(0.05)
+            if acquired:
+                inside.release()
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(_profiled_run, range(3)))
+    assert overlap == [True, True, True]  # one profile at a time
+    assert all((tmp_path / f"run{i}.prof").exists() for i in range(3))
+
+    # The run that started tracemalloc finishing first does not stop it under another run's stage
+    first_in, first_done = threading.Event(), threading.Event()
+
+    def _first():
+        with tracing.RunTrace("A", track_memory=True).stage("short"):
+            first_in.set()
+        first_done.set()
+
+    def _second():
+        first_in.wait(5)
+        with tracing.RunTrace("B", track_memory=True).stage("long"):
+            first_done.wait(5)
+            return tracemalloc.is_tracing()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        second = pool.submit(_second)
+        pool.submit(_first).result()
+        assert second.result()
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.parametrize("argv", [["--teams", "GSW,LAL", "--profile"], ["schedule", "--profile"]])
+def test_cli_rejects_profile_outside_single_team_runs(argv, monkeypatch, capsys):
+    from nba_warriors_analysis import cli
+
+    monkeypatch.setattr("sys.argv", ["nba-analysis", *argv])
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 2
+    assert "--profile only applies to single-team runs" in capsys.readouterr().err
@@ -1,6 +1,9 @@
+import numpy as np
 import pandas as pd
 
-from nba_warriors_analysis.utils import compute_streaks
+from nba_warriors_analysis.utils import (
+    backoff_delay, compute_streaks, current_streak, longest_streaks, streak_runs,
+)
 
 
 def test_compute_streaks_empty():
@@ -10,3 +13,38 @@ def test_compute_streaks_empty():
 def test_compute_streaks_basic():
     s = pd.Series(["W", "W", "L", "L", "L", "W"])
     assert compute_streaks(s) == [("W", 2), ("L", 3), ("W", 1)]
+
+
+def test_compute_streaks_matches_reference_loop():
+    s = pd.Series(np.random.default_rng(1).choice(["W", "L"], size=500), index=range(1000, 1500))
+    expected, count = [], 1
+    for i in range(1, len(s)):
+        if s.iloc[i] == s.iloc[i - 1]:
+            count += 1
+        else:
+            expected.append((s.iloc[i - 1], count))
+            count = 1
+    expected.append((s.iloc[-1], count))
+    assert compute_streaks(s) == expected
+
+
+def test_streak_helpers():
+    s = pd.Series(["W", "W", "L", "L", "L", "W"])
+    values, lengths, starts = streak_runs(s)
+    assert list(values) == ["W", "L", "W"]
+    assert list(lengths) == [2, 3, 1]
+    assert list(starts) == [0, 2, 5]
+    assert longest_streaks(s) == {"W": 2, "L": 3}
+    assert current_streak(s) == ("W", 1)
+    # Group boundaries split streaks
+    _, lengths, _ = streak_runs(s, groups=["a", "a", "a", "b", "b", "b"])
+    assert list(lengths) == [2, 1, 2, 1]
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    import random
+
+    rng = random.Random(7)
+    delays = [backoff_delay(5, 2.0, 3.0, rng) for _ in range(50)]
+    assert all(0 <= d <= 3.0 for d in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from nba_warriors_analysis.utils import Settings
+from nba_warriors_analysis.webapp import create_app
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    reports_dir = tmp_path / "reports"
+    plots_dir = tmp_path / "plots"
+    reports_dir.mkdir()
+    plots_dir.mkdir()
+    (reports_dir / "GSW_report.pdf").write_bytes(b"%PDF-1.4 " + b"x" * 1000)
+    (plots_dir / "GSW_trend.png").write_bytes(b"\x89PNG" + b"y" * 100)
+    monkeypatch.setenv("WARM_CACHE_ON_START", "0")
+    app = create_app(Settings(
+        reports_dir=str(reports_dir), plots_dir=str(plots_dir), data_dir=str(tmp_path / "data")
+    ))
+    app.config["TESTING"] = True
+    yield app.test_client()
+    app.extensions["job_queue"].shutdown()
+
+
+def test_report_download_supports_conditional_get_and_range(client):
+    resp = client.get("/reports/GSW.pdf")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/pdf"
+    assert resp.headers["ETag"] and resp.headers["Last-Modified"]
+    assert resp.headers["Accept-Ranges"] == "bytes"
+
+    cached = client.get("/reports/GSW.pdf", headers={"If-None-Match": resp.headers["ETag"]})
+    assert cached.status_code == 304 and cached.data == b""
+
+    partial = client.get("/reports/GSW.pdf", headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206 and partial.data == b"%PDF-1.4"
+
+
+def test_artifact_listing_and_missing_files(client):
+    listing = client.get("/artifacts/gsw").get_json()
+    assert listing["report"]["url"] == "/reports/GSW.pdf"
+    assert [c["name"] for c in listing["charts"]] == ["trend"]
+
+    chart = client.get(listing["charts"][0]["url"])
+    assert chart.status_code == 200 and chart.mimetype == "image/png"
+    assert client.get("/charts/GSW/missing.png").status_code == 404
+    assert client.get("/reports/LAL.pdf").status_code == 404
+    assert client.get("/reports/XXX.pdf").status_code == 404
+
+
+def test_seed_copy_and_warming_run_once_per_deployment(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from nba_warriors_analysis import webapp
+    from nba_warriors_analysis.locks import run_once
+
+    seed = tmp_path / "seed"
+    seed.mkdir()
+    (seed / "GSW_games.csv").write_text("GAME_ID,GAME_DATE\n")
+    data = tmp_path / "data"
+    monkeypatch.setenv("SEED_DATA_DIR", str(seed))
+    monkeypatch.setenv("DEPLOY_ID", "deploy-1")
+    settings = Settings(data_dir=str(data))
+    webapp.seed_data_dir(settings)
+    assert (data / "GSW_games.csv").exists()
+
+    calls = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        ran = list(pool.map(
+            lambda _: run_once("warm-cache", lambda: calls.append(1), str(data)), range(4)
+        ))
+    assert calls == [1] and sorted(ran) == [False, False, False, True]
+
+    monkeypatch.setenv("DEPLOY_ID", "deploy-2")
+    assert run_once("warm-cache", lambda: calls.append(2), str(data))
+    assert calls == [1, 2]
+
+
+def test_preloading_master_defers_the_warmer_to_workers(monkeypatch):
+    from nba_warriors_analysis import webapp
+
+    started = []
+    monkeypatch.setenv("WARM_CACHE_ON_START", "1")
+    monkeypatch.setattr(
+        webapp, "start_cache_warmer", lambda settings=None: started.append(settings)
+    )
+    monkeypatch.setattr(webapp, "_PREFORK_MASTER_PID", os.getpid())
+    webapp.create_app(Settings()).extensions["job_queue"].shutdown()
+    assert started == []
+
+    monkeypatch.setattr(webapp, "_PREFORK_MASTER_PID", None)
+    webapp.create_app(Settings()).extensions["job_queue"].shutdown()
+    assert len(started) == 1
+
+
+def test_run_writes_artifacts_to_the_app_settings(tmp_path, monkeypatch, make_games):
+    import time
+
+    from nba_warriors_analysis import pipeline
+
+    monkeypatch.setenv("WARM_CACHE_ON_START", "0")
+    monkeypatch.setattr(pipeline, "fetch_games", lambda team_id, **kw: make_games())
+    settings = Settings(data_dir=str(tmp_path / "data"), plots_dir=str(tmp_path / "plots"),
+                        reports_dir=str(tmp_path / "reports"))
+    app = create_app(settings)
+    client = app.test_client()
+    try:
+        job = client.post("/run", json={"team_abbr": "GSW"}).get_json()
+        deadline = time.monotonic() + 60
+        resp = client.get(job["result_url"])
+        while resp.status_code == 202 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            resp = client.get(job["result_url"])
+        assert resp.status_code == 200, resp.get_json()
+        listing = client.get(resp.get_json()["artifacts_url"]).get_json()
+    finally:
+        app.extensions["job_queue"].shutdown()
+
+    report = client.get(listing["report"]["url"])
+    assert report.status_code == 200 and report.data.startswith(b"%PDF")
+    assert (tmp_path / "reports" / "GSW_report.pdf").exists()